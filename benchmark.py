@@ -0,0 +1,102 @@
+"""
+Measures what routes cost to hold, build and run: bytes per action, the
+memory of the built routes and of their route data, and the time taken to
+build (load the route modules, construct and finalize) and to run them, and
+to construct an action.  Run it on two checkouts to compare them.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Iterator
+
+from route_planner import application
+from route_planner.action import Action, Buy, Equip, Kill, Loot
+from route_planner.route import Route, RouteData
+
+
+def _actions(steps: Any) -> Iterator[Action]:
+    for step in steps:
+        if isinstance(step, Action):
+            yield step
+        for name in ("steps", "else_steps"):
+            yield from _actions(getattr(step, name, ()))
+
+
+def _action_bytes(actions: list[Action]) -> float:
+    """the size of each action and what only it holds, on average"""
+    shared = Counter(id(action.notes) for action in actions)
+    total = 0.0
+    for action in actions:
+        total += sys.getsizeof(action)
+        if hasattr(action, "__dict__"):
+            total += sys.getsizeof(action.__dict__)
+        total += sys.getsizeof(action.notes) / shared[id(action.notes)]
+    return total / len(actions)
+
+
+def _best_seconds(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _load() -> list[Route]:
+    return [
+        route
+        for file in application.route_module_files()
+        for route in application.load_route_module(file)
+    ]
+
+
+def _traced_bytes(function: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _construct_actions() -> list[Action]:
+    return [
+        action
+        for index in range(1000)
+        for action in (
+            Loot(f"Soul {index}", souls=200),
+            Kill("Hollow", souls=20, detail="by the bonfire"),
+            Buy("Homeward Bone", count=5, souls=500),
+            Equip("Club", "Right Hand 1"),
+        )
+    ]
+
+
+def main(repeat: int = 20) -> int:
+    routes = _load()
+    enabled = [route for route in routes if route.segment.condition]
+    actions = [
+        action for route in routes for action in _actions(route.segment.steps)
+    ]
+    print(f"{len(routes)} routes, {len(actions)} actions")
+    print(f"bytes per action: {_action_bytes(actions):.0f}")
+    _, built = _traced_bytes(_load)
+    print(f"memory of the built routes: {built / len(routes) / 1024:.1f} KB")
+    data, ran = _traced_bytes(lambda: [route.run() for route in enabled])
+    assert all(isinstance(route_data, RouteData) for route_data in data)
+    print(f"memory of a route's data: {ran / len(enabled) / 1024:.1f} KB")
+    load = _best_seconds(_load, repeat) / len(routes)
+    print(f"build (load, construct and finalize): {load * 1000:.2f} ms/route")
+    run = _best_seconds(lambda: [route.run() for route in enabled], repeat)
+    print(f"run: {run / len(enabled) * 1000:.2f} ms/route")
+    construct = _best_seconds(_construct_actions, repeat) / 4000
+    print(f"construct an action: {construct * 1e6:.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
 from collections import Counter
-from copy import deepcopy
 from dataclasses import dataclass, field
-from itertools import chain
-from typing import Generator, Optional, Protocol
+from math import inf
+from types import MappingProxyType
+from typing import (
+    Any,
+    Container,
+    Generator,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    cast,
+)
+
+from .persistent import PersistentMap, SnapshotDict
+from .symbols import NOTHING, Symbol, symbol, symbol_name
 
 
 class Item:
@@ -14,6 +26,7 @@ class Item:
     DARKSIGN = "Darksign"
     TITANITE_SHARD = "Titanite Shard"
     TWINKLING_TITANITE = "Twinkling Titanite"
+    LORDVESSEL = "Lordvessel"
 
 
 @dataclass(kw_only=True)
@@ -22,11 +35,151 @@ class Metrics:
     item_souls: int = 0
     humanity: int = 0
     item_humanities: int = 0
-    region: str = ""
+    region: Symbol = NOTHING
     error_count: int = 0
     homeward_bones: int = 0
     titanite_shards: int = 0
     twinkling_titanite: int = 0
+    segment: str = ""
+    seconds: float = 0.0  # estimated time elapsed
+
+
+class TimeEstimator(Protocol):
+    def estimate(self, event: Event) -> float:
+        ...
+
+
+class TravelEstimator(Protocol):
+    def cost(self, source: Symbol, target: Symbol) -> float:
+        ...
+
+    def cheapest_warp(
+        self, target: Symbol, bonfires: Container[Symbol]
+    ) -> Optional[tuple[Symbol, float]]:
+        ...
+
+
+class OverdraftCounter(Counter[Symbol]):
+    """
+    A Counter that keeps track of which of its counts are negative as they
+    are set, so overdrafts don't need to be found by scanning every count.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.overdrafts: dict[Symbol, int] = {}
+        self.overdrafts_changed = False
+        super().__init__(*args, **kwargs)  # counted by update
+
+    def __setitem__(self, key: Symbol, value: int) -> None:
+        super().__setitem__(key, value)
+        if value < 0 or key in self.overdrafts:
+            self.overdrafts_changed = True
+            if value < 0:
+                self.overdrafts[key] = value
+            else:
+                del self.overdrafts[key]
+
+    def __delitem__(self, key: object) -> None:
+        super().__delitem__(key)
+        self._forget(key)
+
+    def _forget(self, key: object) -> None:
+        if isinstance(key, int) and key in self.overdrafts:
+            self.overdrafts_changed = True
+            del self.overdrafts[Symbol(key)]
+
+    def _recount(self) -> None:
+        overdrafts = {key: value for key, value in self.items() if value < 0}
+        if overdrafts != self.overdrafts:
+            self.overdrafts = overdrafts
+            self.overdrafts_changed = True
+
+    # Counter's and dict's own implementations of these can bypass
+    # __setitem__ and __delitem__, so they are routed through them or the
+    # overdrafts are found again after.
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._recount()
+
+    def subtract(self, *args: Any, **kwargs: Any) -> None:
+        super().subtract(*args, **kwargs)
+        self._recount()
+
+    def setdefault(self, key: Symbol, default: int = 0) -> int:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: Symbol, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._forget(key)
+        return value
+
+    def popitem(self) -> tuple[Symbol, int]:
+        key, value = super().popitem()
+        self._forget(key)
+        return key, value
+
+    def clear(self) -> None:
+        super().clear()
+        if self.overdrafts:
+            self.overdrafts = {}
+            self.overdrafts_changed = True
+
+
+class SnapshotCounter(SnapshotDict[Symbol, int], OverdraftCounter):
+    """An OverdraftCounter that can snapshot itself; see State.snapshots."""
+
+    def setdefault(self, key: Symbol, default: int = 0) -> int:
+        # a count by default, as for Counter, not SnapshotDict's None
+        return OverdraftCounter.setdefault(self, key, default)
+
+
+_BONE = symbol(Item.BONE)
+_DARKSIGN = symbol(Item.DARKSIGN)
+_DARKSIGN_RESETS = ("souls", "humanity")  # see UseMenu.apply
+_LORDVESSEL = symbol(Item.LORDVESSEL)
+_TITANITE_SHARD = symbol(Item.TITANITE_SHARD)
+_TWINKLING_TITANITE = symbol(Item.TWINKLING_TITANITE)
+
+# State fields that are checked for overdrafts, along with the inventory
+_OVERDRAFT_FIELDS = ("souls", "item_souls", "humanity", "item_humanities")
+# State fields snapshotted for every event when State.snapshots is set
+_SNAPSHOT_FIELDS = (
+    "inventory",
+    "equipment",
+    "bonfire_to_region",
+    "souls_lookup",
+    "humanities_lookup",
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class StateSnapshot:
+    """
+    The state as of an event.  The maps share structure with the snapshots
+    before and after them, so one per event costs little more than the
+    changes between them.
+    """
+
+    metrics: Metrics
+    bonfire: Symbol
+    location: Symbol
+    inventory: PersistentMap[Symbol, int]
+    equipment: PersistentMap[str, Symbol]
+    bonfire_to_region: PersistentMap[Symbol, Symbol] = field(repr=False)
+    souls_lookup: PersistentMap[Symbol, int] = field(repr=False)
+    humanities_lookup: PersistentMap[Symbol, int] = field(repr=False)
+
+    def count(self, item: str) -> int:
+        """how many of the named item were in the inventory."""
+        return self.inventory.get(symbol(item), 0)
+
+    def equipped(self) -> dict[str, str]:
+        """the name of the item in each equipment slot."""
+        return {
+            slot: symbol_name(item) for slot, item in self.equipment.items()
+        }
 
 
 @dataclass(kw_only=True)
@@ -35,17 +188,66 @@ class State:
     item_souls: int = 0
     humanity: int = 0
     item_humanities: int = 0
-    bonfire: str = ""
-    region: str = ""
+    bonfire: Symbol = NOTHING
+    location: Symbol = NOTHING  # the last place run, warped or sat at
+    region: Symbol = NOTHING
+    segment: str = ""
+    seconds: float = 0.0
     error_count: int = 0
-    inventory: Counter[str] = field(default_factory=Counter)
-    equipment: dict[str, str] = field(default_factory=dict)
-    bonfire_to_region: dict[str, str] = field(default_factory=dict, repr=False)
-    souls_lookup: dict[str, int] = field(default_factory=dict, repr=False)
-    humanities_lookup: dict[str, int] = field(default_factory=dict, repr=False)
+    # items, bonfires and regions are interned; see 'count' and 'symbols'
+    inventory: Counter[Symbol] = field(default_factory=OverdraftCounter)
+    equipment: dict[str, Symbol] = field(default_factory=dict)
+    bonfire_to_region: dict[Symbol, Symbol] = field(
+        default_factory=dict, repr=False
+    )
+    souls_lookup: dict[Symbol, int] = field(default_factory=dict, repr=False)
+    humanities_lookup: dict[Symbol, int] = field(
+        default_factory=dict, repr=False
+    )
     new_errors: list[str] = field(default_factory=list, repr=False)
     last_overdrafts: set[str] = field(default_factory=set, repr=False)
     notes: list[str] = field(default_factory=list, repr=False)
+    time_estimator: Optional[TimeEstimator] = field(default=None, repr=False)
+    travel_estimator: Optional[TravelEstimator] = field(
+        default=None, repr=False
+    )
+    # the overdrafts from scalar fields; the inventory tracks its own
+    _overdrafts: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _overdrafts_changed: bool = field(default=False, init=False, repr=False)
+    # if set, every event carries a StateSnapshot; see Route.run
+    snapshots: bool = field(default=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for name in _OVERDRAFT_FIELDS:  # set before tracking could start
+            setattr(self, name, getattr(self, name))
+        if self.snapshots:  # set before snapshotting could start
+            for name in _SNAPSHOT_FIELDS:
+                setattr(self, name, getattr(self, name))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _SNAPSHOT_FIELDS:
+            if self.__dict__.get("snapshots"):
+                if name == "inventory":
+                    if not isinstance(value, SnapshotCounter):
+                        value = SnapshotCounter(value)
+                elif not isinstance(value, SnapshotDict):
+                    value = SnapshotDict(value)
+            elif name == "inventory":
+                if not isinstance(value, OverdraftCounter):
+                    value = OverdraftCounter(value)
+        if name == "inventory":
+            # compared with the last overdrafts afresh, even if it has none
+            value.overdrafts_changed = True
+        super().__setattr__(name, value)
+        if name in _OVERDRAFT_FIELDS and "_overdrafts" in self.__dict__:
+            if value < 0 or name in self._overdrafts:
+                self._overdrafts_changed = True
+                if value < 0:
+                    self._overdrafts[name] = value
+                else:
+                    del self._overdrafts[name]
 
     def metrics(self) -> Metrics:
         return Metrics(
@@ -55,12 +257,32 @@ class State:
             item_humanities=self.item_humanities,
             region=self.region,
             error_count=self.error_count,
-            homeward_bones=self.inventory[Item.BONE],
-            titanite_shards=self.inventory[Item.TITANITE_SHARD],
-            twinkling_titanite=self.inventory[Item.TWINKLING_TITANITE],
+            homeward_bones=self.inventory[_BONE],
+            titanite_shards=self.inventory[_TITANITE_SHARD],
+            twinkling_titanite=self.inventory[_TWINKLING_TITANITE],
+            segment=self.segment,
+            seconds=self.seconds,
         )
 
-    def remove_equipment(self, item: str) -> str:
+    def count(self, item: str) -> int:
+        """how many of the named item are in the inventory."""
+        return self.inventory[symbol(item)]
+
+    def snapshot(self, metrics: Metrics) -> Optional[StateSnapshot]:
+        if not self.snapshots:
+            return None
+        maps: Mapping[str, Any] = {
+            name: cast(SnapshotDict[Any, Any], getattr(self, name)).snapshot()
+            for name in _SNAPSHOT_FIELDS  # see __setattr__
+        }
+        return StateSnapshot(
+            metrics=metrics,
+            bonfire=self.bonfire,
+            location=self.location,
+            **maps,
+        )
+
+    def remove_equipment(self, item: Symbol) -> str:
         """returns the slot the item was removed from, or an empty string."""
         for slot, piece in self.equipment.items():
             if piece == item:
@@ -72,28 +294,29 @@ class State:
         if slot in self.equipment:
             del self.equipment[slot]
 
-    def errors(self) -> list[str]:
-        overdrafts: set[str] = set(
-            [
-                f"{key}({value})"
-                for key, value in chain(
-                    self.inventory.items(),
-                    [
-                        ("souls", self.souls),
-                        ("item_souls", self.item_souls),
-                        ("humanity", self.humanity),
-                        ("item_humanities", self.item_humanities),
-                    ],
-                )
-                if value < 0
-            ]
-        )
-
-        if overdrafts and self.last_overdrafts != overdrafts:
-            self.new_errors.append(
-                "insufficent amount: " + " ".join(overdrafts)
+    def errors(self) -> Sequence[str]:
+        inventory = cast(OverdraftCounter, self.inventory)  # see __setattr__
+        if inventory.overdrafts_changed or self._overdrafts_changed:
+            inventory.overdrafts_changed = False
+            self._overdrafts_changed = False
+            overdrafts: set[str] = set(
+                [
+                    f"{symbol_name(key)}({value})"
+                    for key, value in inventory.overdrafts.items()
+                ]
+                + [
+                    f"{name}({self._overdrafts[name]})"
+                    for name in _OVERDRAFT_FIELDS
+                    if name in self._overdrafts
+                ]
             )
-        self.last_overdrafts = overdrafts
+            if overdrafts and self.last_overdrafts != overdrafts:
+                self.new_errors.append(
+                    "insufficent amount: " + " ".join(overdrafts)
+                )
+            self.last_overdrafts = overdrafts
+        if not self.new_errors:
+            return ()  # the common case; nothing new to report or allocate
         errors = self.new_errors
         self.new_errors = []
         self.error_count += len(errors)
@@ -105,160 +328,248 @@ class Step(Protocol):
         ...
 
 
-@dataclass
+# Actions are slotted, since routes and their many variants hold a lot of
+# them.  A route's actions are shared by every run of it, so they are never
+# changed as it runs; anything an action works out against the state goes on
+# its event instead, see 'apply'.  Slotted dataclasses are replaced by a new
+# class, so zero-argument super() calls don't work in them and name the class
+# instead.
+_NO_NOTES: Sequence[str] = ()  # shared by every action without any
+_NO_ITEMS: Mapping[str, int] = MappingProxyType({})
+
+
+@dataclass(slots=True)
 class Action:  # is a 'Step'
     target: str
     detail: str = field(default="", kw_only=True)
     optional: bool = field(default=False, kw_only=True)
     condition: bool = field(default=True, kw_only=True)
-    notes: list[str] = field(default_factory=list, kw_only=True)
-    output: bool = field(default=True, init=False)
+    notes: Sequence[str] = field(default=_NO_NOTES, kw_only=True)
+    seconds: Optional[float] = field(default=None, kw_only=True)  # estimate
+    symbol: Symbol = field(
+        default=NOTHING, init=False, repr=False, compare=False
+    )  # the interned target
 
     def __post_init__(self) -> None:
-        ...  # so code doesn't need changed if this is added later
+        self.symbol = symbol(self.target)
 
     @property
     def display(self) -> str:
-        return self.target
+        return self.describe(self.event())
+
+    @property
+    def kind(self) -> str:
+        """the type of action, e.g. Loot or Buy"""
+        return type(self).__name__
 
     @property
     def name(self) -> str:
-        return f"{'Optional' if self.optional else ''}{type(self).__name__}"
+        return f"{'Optional' if self.optional else ''}{self.kind}"
+
+    def describe(self, event: Event) -> str:
+        """the display text for the action as it was taken in the event."""
+        return event.target
+
+    def acquired(self, event: Event) -> Optional[tuple[str, int]]:
+        """the item the action got in the event and how many, if any."""
+        return None
+
+    def resets(self, event: Event) -> Sequence[str]:
+        """the State balances the action zeroes on purpose in the event."""
+        return ()
+
+    def event(self) -> Event:
+        """an event for the action as written, for apply to work out."""
+        return Event(
+            metrics=_PENDING_METRICS,
+            action=self,
+            target=self.target,
+            seconds=self.seconds,
+        )
 
-    def apply(self, state: State) -> None:
-        ...
+    def apply(self, state: State, event: Event) -> None:
+        """
+        Changes the state as the action does, and records on the event
+        anything about it that depends on the state.
+        """
 
     def generate_events(self, state: State) -> Generator[Event, None, None]:
         if self.condition:
-            action = deepcopy(self)  # so actions can modify themselves
-            action.apply(state)
+            event = self.event()
+            self.apply(state, event)
+            if state.time_estimator:
+                state.seconds += state.time_estimator.estimate(event)
             state.notes.extend(self.notes)
-            yield Event(metrics=state.metrics(), action=action)
+            yield event.record(state)
             for error in state.errors():
-                yield Event(metrics=state.metrics(), action=Error(error))
+                yield Error(error).event().record(state)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Event:
-    metrics: Metrics
+    """
+    An action as taken in one run of a route.  The action is the route's own,
+    and the rest is what it came to against the state at the time.
+    """
+
+    metrics: Metrics  # as of just after it
     action: Action
+    snapshot: Optional[StateSnapshot] = field(default=None, repr=False)
+    output: bool = True  # if it is a step to show
+    target: str = ""
+    count: int = 1
+    souls: int = 0
+    humanities: int = 0
+    replaces: str = ""  # the item that was in the slot equipped to
+    seconds: Optional[float] = None
+    hint: str = ""  # a suggestion for the runner
+
+    @property
+    def display(self) -> str:
+        return self.action.describe(self)
+
+    def record(self, state: State) -> Event:
+        """sets the metrics, and snapshot if any, to those of the state."""
+        self.metrics = state.metrics()
+        self.snapshot = state.snapshot(self.metrics)
+        return self
+
+
+_PENDING_METRICS = Metrics()  # for events until they are recorded
 
 
-@dataclass
+@dataclass(slots=True)
 class FallDamage(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Region(Action):
     detail: str = field(init=False)
 
     def __post_init__(self) -> None:
-        super().__post_init__()
-        self.output = False  # this is just for changing the state
+        super(Region, self).__post_init__()
+        self.detail = ""
 
-    def apply(self, state: State) -> None:
-        state.region = self.target
+    def apply(self, state: State, event: Event) -> None:
+        state.region = self.symbol
+        event.output = False  # just changes the state
 
 
-@dataclass
+@dataclass(slots=True)
 class BonfireSit(Action):
-    def apply(self, state: State) -> None:
-        known_region = state.bonfire_to_region.get(self.target)
+    def apply(self, state: State, event: Event) -> None:
+        known_region = state.bonfire_to_region.get(self.symbol)
         if known_region is not None and known_region != state.region:
             state.new_errors.append(
                 f'bonfire "{self.target}" was previously listed as being in'
-                f' region "{known_region}" but is currently indicated to be in'
-                f' region "{state.region}"'
+                f' region "{symbol_name(known_region)}" but is currently'
+                f' indicated to be in region "{symbol_name(state.region)}"'
             )
-        state.bonfire_to_region[self.target] = state.region
-        state.bonfire = self.target
+        state.bonfire_to_region[self.symbol] = state.region
+        state.bonfire = self.symbol
+        state.location = self.symbol
 
 
-@dataclass
+@dataclass(slots=True)
 class AutoBonfire(BonfireSit):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class __EquipCommon(Action):
     slot: str
-    replaces: str = field(default="", init=False)
     expected_to_replace: Optional[str] = field(default=None, kw_only=True)
 
-    def apply(self, state: State) -> None:
-        self.replaces = state.equipment.get(self.slot, "")
+    def apply(self, state: State, event: Event) -> None:
+        event.replaces = symbol_name(state.equipment.get(self.slot, NOTHING))
         if (
             self.expected_to_replace is not None
-            and self.expected_to_replace != self.replaces
+            and self.expected_to_replace != event.replaces
         ):
             state.new_errors.append(
                 f'expected to replace "{self.expected_to_replace}" in slot'
-                f' "{self.slot}" but found different item "{self.replaces}"'
+                f' "{self.slot}" but found different item "{event.replaces}"'
             )
 
 
-@dataclass
+@dataclass(slots=True)
 class Equip(__EquipCommon):
-    @property
-    def display(self) -> str:
-        output = self.target
-        if self.replaces and self.replaces != self.target:
-            output += f" replacing {self.replaces}"
+    def describe(self, event: Event) -> str:
+        output = event.target
+        if event.replaces and event.replaces != event.target:
+            output += f" replacing {event.replaces}"
         return output
 
-    def apply(self, state: State) -> None:
-        super().apply(state)
-        if state.inventory[self.target] <= 0:
+    def apply(self, state: State, event: Event) -> None:
+        super(Equip, self).apply(state, event)
+        if state.inventory[self.symbol] <= 0:
             state.new_errors.append(
                 f"Cannot equip item not in inventory: {self.target}"
             )
-        state.remove_equipment(self.target)
-        state.equipment[self.slot] = self.target
+        state.remove_equipment(self.symbol)
+        state.equipment[self.slot] = self.symbol
 
 
-@dataclass
+@dataclass(slots=True)
 class UnEquip(__EquipCommon):
     target: str = field(default="", init=False)
 
-    def apply(self, state: State) -> None:
-        self.target = state.equipment.get(self.slot, "")
-        super().apply(state)
+    def apply(self, state: State, event: Event) -> None:
+        event.target = symbol_name(state.equipment.get(self.slot, NOTHING))
+        super(UnEquip, self).apply(state, event)
         state.clear_equipment_slot(self.slot)
 
 
-@dataclass
+@dataclass(slots=True)
 class AutoEquip(Equip):
     ...
 
 
-@dataclass(kw_only=True)
+@dataclass(slots=True, kw_only=True)
 class __ItemCommon(Action):
     count: int = 1
 
-    @property
-    def display(self) -> str:
-        output = self.target
-        if self.count > 1:
-            output += f" (x{self.count})"
+    def describe(self, event: Event) -> str:
+        output = event.target
+        if event.count > 1:
+            output += f" (x{event.count})"
         return output
 
-    def apply(self, state: State) -> None:
-        if not self.count:
-            self.output = False
+    def event(self) -> Event:
+        return Event(
+            metrics=_PENDING_METRICS,
+            action=self,
+            target=self.target,
+            count=self.count,
+            seconds=self.seconds,
+        )
+
+    def apply(self, state: State, event: Event) -> None:
+        if not event.count:
+            event.output = False
 
 
-@dataclass(kw_only=True)
+@dataclass(slots=True, kw_only=True)
 class Loot(__ItemCommon):
     souls: int = 0
     humanities: int = 0
 
-    def apply(self, state: State) -> None:
+    def acquired(self, event: Event) -> Optional[tuple[str, int]]:
+        return event.target, event.count
+
+    def event(self) -> Event:
+        event = super(Loot, self).event()
+        event.souls = self.souls
+        event.humanities = self.humanities
+        return event
+
+    def apply(self, state: State, event: Event) -> None:
         if not self.souls:
-            self.souls = state.souls_lookup.get(self.target, 0)
+            event.souls = state.souls_lookup.get(self.symbol, 0)
         else:
             stored_souls = state.souls_lookup.setdefault(
-                self.target, self.souls
+                self.symbol, self.souls
             )
             if stored_souls != self.souls:
                 state.new_errors.append(
@@ -267,10 +578,10 @@ class Loot(__ItemCommon):
                     f" gives {self.souls} souls."
                 )
         if not self.humanities:
-            self.humanities = state.humanities_lookup.get(self.target, 0)
+            event.humanities = state.humanities_lookup.get(self.symbol, 0)
         else:
             stored_humanities = state.humanities_lookup.setdefault(
-                self.target, self.humanities
+                self.symbol, self.humanities
             )
             if stored_humanities != self.humanities:
                 state.new_errors.append(
@@ -278,172 +589,224 @@ class Loot(__ItemCommon):
                     f" {stored_humanities} humanities but now indicating it"
                     f" gives {self.humanities} humanities."
                 )
-        state.inventory[self.target] += self.count
-        state.item_souls += self.souls * self.count
-        state.item_humanities += self.humanities * self.count
+        state.inventory[self.symbol] += self.count
+        state.item_souls += event.souls * self.count
+        state.item_humanities += event.humanities * self.count
 
 
-@dataclass
+@dataclass(slots=True)
 class Receive(Loot):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class WarpTo(Action):
-    def apply(self, state: State) -> None:
+    def apply(self, state: State, event: Event) -> None:
         try:
-            state.region = state.bonfire_to_region[self.target]
+            state.region = state.bonfire_to_region[self.symbol]
         except KeyError:
             raise RuntimeError("Can't warp; bonfire region is unknown.")
+        state.location = self.symbol
 
 
-@dataclass(kw_only=True)
+@dataclass(slots=True, kw_only=True)
 class UseMenu(__ItemCommon):
     allow_partial: bool = False
     no_warp: bool = False
 
-    def apply(self, state: State) -> None:
-        actual_count = state.inventory[self.target]
+    def resets(self, event: Event) -> Sequence[str]:
+        return _DARKSIGN_RESETS if self.symbol == _DARKSIGN else ()
+
+    def apply(self, state: State, event: Event) -> None:
+        actual_count = state.inventory[self.symbol]
         if actual_count < self.count:
             if self.allow_partial:
-                self.count = actual_count
+                event.count = actual_count
             # NOTE: unneeded; this error is covered by 'State' overdraft checks
             # else:
             #    state.new_errors.append(
             #        f"Cannot use {self.count} of {self.target}, only have"
             #        f" {actual_count}"
             #    )
-        super().apply(state)
-        if not self.no_warp and self.target in (Item.BONE, Item.DARKSIGN):
-            WarpTo(state.bonfire).apply(state)
-        stored_souls = state.souls_lookup.get(self.target, 0)
+        super(UseMenu, self).apply(state, event)
+        if not self.no_warp and self.symbol in (_BONE, _DARKSIGN):
+            warp = WarpTo(symbol_name(state.bonfire))
+            warp.apply(state, warp.event())
+        stored_souls = state.souls_lookup.get(self.symbol, 0)
         if stored_souls:
-            delta = stored_souls * self.count
+            delta = stored_souls * event.count
             state.souls += delta
             state.item_souls -= delta
-        stored_humanities = state.humanities_lookup.get(self.target, 0)
+        stored_humanities = state.humanities_lookup.get(self.symbol, 0)
         if stored_humanities:
-            delta = stored_humanities * self.count
+            delta = stored_humanities * event.count
             state.humanity += delta
             state.item_humanities -= delta
-        if self.target == Item.DARKSIGN:
+        if self.symbol == _DARKSIGN:
             # loses souls and humanity, but the item isn't consumed
             state.souls = 0
             state.humanity = 0
         else:
-            state.inventory[self.target] -= self.count  # consume the item
+            state.inventory[self.symbol] -= event.count  # consume the item
         # unequip it if you used the last one
-        if not state.inventory[self.target]:
-            state.remove_equipment(self.target)
+        if not state.inventory[self.symbol]:
+            state.remove_equipment(self.symbol)
 
 
-@dataclass
+@dataclass(slots=True)
 class Use(UseMenu):
-    def apply(self, state: State) -> None:
-        if self.target not in state.equipment.values():
+    def apply(self, state: State, event: Event) -> None:
+        if self.symbol not in state.equipment.values():
             state.new_errors.append(
                 f"Cannot use unequipped item: {self.target}"
             )
-        super().apply(state)
+        super(Use, self).apply(state, event)
 
 
-@dataclass(kw_only=True)
+@dataclass(slots=True, kw_only=True)
 class Kill(__ItemCommon):
     souls: int
 
-    def apply(self, state: State) -> None:
-        state.souls += self.souls * self.count
+    def event(self) -> Event:
+        event = super(Kill, self).event()
+        event.souls = self.souls
+        return event
+
+    def apply(self, state: State, event: Event) -> None:
+        state.souls += self.souls * event.count
 
 
-@dataclass
+@dataclass(slots=True)
 class AutoKill(Kill):
     ...
 
 
-@dataclass(kw_only=True)
+@dataclass(slots=True, kw_only=True)
 class Buy(Kill):
     always: bool = False  # if set, make sure you have count, buy as needed
 
     def __post_init__(self) -> None:
-        super().__post_init__()
-        self.souls *= -1
+        super(Buy, self).__post_init__()
+        self.souls = -self.souls
 
-    def apply(self, state: State) -> None:
+    def apply(self, state: State, event: Event) -> None:
         if not self.always:
-            self.count = max(self.count - state.inventory[self.target], 0)
-            if not self.count:
-                self.output = False  # no need to buy anything
-        super().apply(state)
-        state.inventory[self.target] += self.count
+            event.count = max(self.count - state.inventory[self.symbol], 0)
+            if not event.count:
+                event.output = False  # nothing to buy
+        super(Buy, self).apply(state, event)
+        state.inventory[self.symbol] += event.count
+
+    def acquired(self, event: Event) -> Optional[tuple[str, int]]:
+        return event.target, event.count
 
 
-@dataclass
+@dataclass(slots=True)
 class UpgradeItem(Kill):
     new_item: str
-    items: Counter[str] = field(default_factory=Counter, repr=False)
+    items: Mapping[str, int] = field(
+        default_factory=lambda: _NO_ITEMS, repr=False
+    )
+    new_symbol: Symbol = field(
+        default=NOTHING, init=False, repr=False, compare=False
+    )
 
-    @property
-    def display(self) -> str:
-        return f"{super().display} to {self.new_item}"
+    def describe(self, event: Event) -> str:
+        described = super(UpgradeItem, self).describe(event)
+        return f"{described} to {self.new_item}"
+
+    def acquired(self, event: Event) -> Optional[tuple[str, int]]:
+        return self.new_item, 1
 
     def __post_init__(self) -> None:
-        super().__post_init__()
-        self.souls *= -1
+        super(UpgradeItem, self).__post_init__()
+        self.souls = -self.souls
+        self.new_symbol = symbol(self.new_item)
 
-    def apply(self, state: State) -> None:
-        super().apply(state)
+    def apply(self, state: State, event: Event) -> None:
+        super(UpgradeItem, self).apply(state, event)
         for item, count in self.items.items():
-            UseMenu(item, count=(count * self.count), no_warp=True).apply(
-                state
-            )
-        state.inventory[self.target] -= 1
-        state.inventory[self.new_item] += 1
+            use = UseMenu(item, count=(count * self.count), no_warp=True)
+            use.apply(state, use.event())
+        state.inventory[self.symbol] -= 1
+        state.inventory[self.new_symbol] += 1
         # replace equipped item
-        slot = state.remove_equipment(self.target)
+        slot = state.remove_equipment(self.symbol)
         if slot:
-            state.equipment[slot] = self.new_item
+            state.equipment[slot] = self.new_symbol
 
 
-@dataclass
+@dataclass(slots=True)
 class DowngradeItem(UpgradeItem):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Heal(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Error(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class RunTo(Action):
-    ...
+    def apply(self, state: State, event: Event) -> None:
+        travel = state.travel_estimator
+        if travel and state.location:
+            seconds = travel.cost(state.location, self.symbol)
+            if seconds != inf:
+                if self.seconds is None:
+                    event.seconds = seconds
+                event.hint = self._cheaper_warp_hint(state, travel, seconds)
+        state.location = self.symbol
+
+    def _cheaper_warp_hint(
+        self, state: State, travel: TravelEstimator, run_seconds: float
+    ) -> str:
+        options: list[tuple[float, str]] = []
+        if state.inventory[_LORDVESSEL] > 0:
+            warp = travel.cheapest_warp(self.symbol, state.bonfire_to_region)
+            if warp:
+                options.append((warp[1], f"warping to {symbol_name(warp[0])}"))
+        if state.inventory[_BONE] > 0 and state.bonfire:
+            bone = travel.cheapest_warp(self.symbol, (state.bonfire,))
+            if bone:
+                options.append(
+                    (bone[1], f"a {Item.BONE} to {symbol_name(bone[0])}")
+                )
+        if options:
+            seconds, how = min(options)
+            if seconds < run_seconds:
+                return (
+                    f"{how} (~{seconds:.0f}s) is faster than running"
+                    f" (~{run_seconds:.0f}s)"
+                )
+        return ""
 
 
-@dataclass
+@dataclass(slots=True)
 class WaitFor(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Perform(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Jump(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Activate(Action):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class TalkTo(Action):
     ...
@@ -1,15 +1,46 @@
 from __future__ import annotations
 
+import argparse
 import importlib.util
 import shutil
 import sys
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol, cast, runtime_checkable
+from typing import (
+    Callable,
+    Optional,
+    Protocol,
+    Sequence,
+    cast,
+    runtime_checkable,
+)
 
-from . import report
-from .route import Route
+from . import (
+    cache,
+    compress,
+    pagination,
+    provenance,
+    report,
+    routefile,
+    search,
+    server,
+    summary,
+    watch,
+)
+from .action import Event
+from .export import EventExporter, ExportFormat
+from .route import Route, RouteData
 
 CURRENT_FILE_DIRECTORY = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIRECTORY = CURRENT_FILE_DIRECTORY.parent / "docs"
+# simulation results kept next to the pages, so they can be re-rendered
+CACHE_SUBDIRECTORY = ".route_data"
+# compiled route files, kept across builds; see routefile.load_route_file
+ROUTE_FILE_CACHE_SUBDIRECTORY = ".route_files"
+DASHBOARD_FILENAME = "dashboard.html"
+SEARCH_INDEX_FILENAME = "search.json"  # also named in scripts/search.js
+ITEMS_INDEX_FILENAME = "items.json"
 
 
 @runtime_checkable
@@ -22,35 +53,61 @@ def sanitize_filename(value: str) -> str:
     return "".join(ch for ch in value if ch.isalnum())
 
 
-def load_routes() -> list[Route]:
-    routes_subdirectory = Path("routes")
-    routes: list[Route] = []
-    files: list[Path] = [
+def route_filename(route: Route) -> str:
+    return f"{sanitize_filename(route.name)}.html"
+
+
+ROUTES_SUBDIRECTORY = Path("routes")
+
+
+def route_module_files() -> list[Path]:
+    return [
         entry
-        for entry in (CURRENT_FILE_DIRECTORY / routes_subdirectory).iterdir()
+        for entry in (CURRENT_FILE_DIRECTORY / ROUTES_SUBDIRECTORY).iterdir()
         if entry.is_file()
-        and entry.suffix.lower() == ".py"
+        and entry.suffix.lower() in (".py", routefile.SUFFIX)
         and not entry.stem.startswith("_")
     ]
-    for file in files:
-        module_name = (
-            f"{__package__}.{'.'.join(routes_subdirectory.parts)}.{file.stem}"
-        )
-        spec = importlib.util.spec_from_file_location(module_name, file)
-        if not spec:
-            raise RuntimeError(f"No spec could be loaded for {file}")
-        module = importlib.util.module_from_spec(spec)
-        if not module:
-            raise RuntimeError(f"No module could be loaded for {file}")
-        if not spec.loader:
-            raise RuntimeError(f"Spec has no loader for {file}")
-        sys.modules[module_name] = module  # so dataclasses and such are happy
-        spec.loader.exec_module(module)
-        if not isinstance(module, RouteExporter):
-            raise RuntimeError(
-                f"Module does not contain any exported routes: {file}"
+
+
+def load_route_module(
+    file: Path, *, cache_directory: Optional[Path] = None
+) -> list[Route]:
+    """
+    (Re-)executes a single route module, returning its exported routes; a
+    route file is compiled through the cache directory, if any.
+    """
+    if file.suffix.lower() == routefile.SUFFIX:
+        return [
+            route.finalize()
+            for route in routefile.load_route_file(
+                file, cache_directory=cache_directory
             )
-        routes.extend(cast(RouteExporter, module).exported_routes())
+        ]
+    module_name = (
+        f"{__package__}.{'.'.join(ROUTES_SUBDIRECTORY.parts)}.{file.stem}"
+    )
+    spec = importlib.util.spec_from_file_location(module_name, file)
+    if not spec:
+        raise RuntimeError(f"No spec could be loaded for {file}")
+    module = importlib.util.module_from_spec(spec)
+    if not module:
+        raise RuntimeError(f"No module could be loaded for {file}")
+    if not spec.loader:
+        raise RuntimeError(f"Spec has no loader for {file}")
+    sys.modules[module_name] = module  # so dataclasses and such are happy
+    spec.loader.exec_module(module)
+    if not isinstance(module, RouteExporter):
+        raise RuntimeError(
+            f"Module does not contain any exported routes: {file}"
+        )
+    return [
+        route.finalize()
+        for route in cast(RouteExporter, module).exported_routes()
+    ]
+
+
+def check_route_names(routes: Sequence[Route]) -> None:
     route_names: set[str] = set()
     for route in routes:
         if route.name in route_names:
@@ -58,27 +115,608 @@ def load_routes() -> list[Route]:
                 f"Multiple routes with the same name: {route.name}"
             )
         route_names.add(route.name)
+
+
+def load_routes(*, cache_directory: Optional[Path] = None) -> list[Route]:
+    routes: list[Route] = []
+    for file in route_module_files():
+        routes.extend(load_route_module(file, cache_directory=cache_directory))
+    check_route_names(routes)
     routes.sort(key=lambda route: route.name)
     return routes
 
 
-def main() -> int:
-    output_directory = CURRENT_FILE_DIRECTORY.parent / "docs"
+def write_route_page(
+    output_directory: Path,
+    route: Route,
+    route_data: Optional[RouteData],
+    *,
+    virtualize: bool = False,
+) -> Path:
+    path = output_directory / route_filename(route)
+    with open(path, "w") as route_file:
+        route_file.write(
+            report.page(
+                report.route(
+                    route, route_data=route_data, virtualize=virtualize
+                ),
+                title=route.name,
+                script_names=["steps"] if virtualize else [],
+            )
+        )
+    return path
+
+
+def route_cache_path(output_directory: Path, route: Route) -> Path:
+    return (
+        output_directory
+        / CACHE_SUBDIRECTORY
+        / f"{sanitize_filename(route.name)}{cache.SUFFIX}"
+    )
+
+
+def write_route_cache(
+    output_directory: Path, route: Route, route_data: Optional[RouteData]
+) -> Path:
+    path = route_cache_path(output_directory, route)
+    cache.write_route_cache(path, route, route_data)
+    return path
+
+
+def region_page_writer(
+    output_directory: Path,
+    route: Route,
+    *,
+    on_page: Optional[Callable[[Path], None]] = None,
+) -> pagination.RegionPageWriter:
+    return pagination.RegionPageWriter(
+        output_directory, route, sanitize_filename(route.name), on_page=on_page
+    )
+
+
+def write_index(
+    output_directory: Path,
+    routes: Sequence[Route],
+    *,
+    route_links: Optional[dict[str, list[tuple[str, str]]]] = None,
+    searchable: bool = False,
+) -> Path:
+    """
+    route_links maps route names to the label and filename of other pages
+    to link next to them, and searchable adds a search box using the index
+    from write_search_index.
+    """
+    path = output_directory / "index.html"
+    with open(path, "w") as index:
+        index.write("<h1>Route Index</h1>")
+        index.write(f'<p><a href="{DASHBOARD_FILENAME}">Dashboard</a></p><ul>')
+        for route in routes:
+            filename = route_filename(route)
+            links = "".join(
+                f' (<a href="{link_filename}">{label}</a>)'
+                for label, link_filename in (route_links or {}).get(
+                    route.name, []
+                )
+            )
+            index.write(
+                f'<li><a href="{filename}">{route.name}</a>{links}</li>\n'
+            )
+        index.write("</ul>")
+        if searchable:
+            index.write(
+                '<input class="search" type="search"'
+                ' placeholder="Search all routes"/>'
+                '<ul class="search-results"></ul>'
+            )
+            index.write(report.script("search"))
+    return path
+
+
+def items_filename(route: Route) -> str:
+    return f"{sanitize_filename(route.name)}-items.html"
+
+
+def write_items_page(
+    output_directory: Path,
+    route: Route,
+    acquisitions: Sequence[provenance.Acquisition],
+) -> Path:
+    path = output_directory / items_filename(route)
+    with open(path, "w") as items_file:
+        items_file.write(
+            report.page(
+                report.items_page(route, acquisitions, route_filename(route)),
+                title=f"{route.name}: Items",
+            )
+        )
+    return path
+
+
+def write_items_index(
+    output_directory: Path, items_index: provenance.ProvenanceIndex
+) -> Path:
+    path = output_directory / ITEMS_INDEX_FILENAME
+    with open(path, "w") as stream:
+        items_index.write(stream)
+    return path
+
+
+def query_items(
+    output_directory: Path, item: str, *, route: Optional[str] = None
+) -> int:
+    path = output_directory / ITEMS_INDEX_FILENAME
+    if not path.is_file():
+        raise RuntimeError(f"No item index, so build first: {path}")
+    with open(path) as stream:
+        items_index = provenance.ProvenanceIndex.read(stream)
+    for acquisition in items_index.query(item, route=route):
+        print(
+            f"{acquisition.route}: step {acquisition.step}"
+            f" {acquisition.action} {acquisition.item}"
+            f" (x{acquisition.count}) in {acquisition.region}"
+        )
+    return 0
+
+
+def suggest_upgrades(*, route: Optional[str] = None) -> int:
+    """prints where each route could do the upgrades it has goals for."""
+    name = route.casefold() if route else ""
+    for candidate in load_routes():
+        if (
+            not candidate.upgrade_goals
+            or not candidate.segment.condition
+            or name not in candidate.name.casefold()
+        ):
+            continue
+        events = candidate.run().events
+        print(candidate.name)
+        for goal in candidate.upgrade_goals:
+            for line in goal.suggestions(events):
+                print(f"  {line}")
+    return 0
+
+
+def write_search_index(
+    output_directory: Path, search_index: search.SearchIndex
+) -> Path:
+    path = output_directory / SEARCH_INDEX_FILENAME
+    with open(path, "w") as stream:
+        search_index.write(stream)
+    return path
+
+
+def write_route_npy(
+    output_directory: Path, route: Route, route_data: RouteData
+) -> Path:
+    path = output_directory / f"{sanitize_filename(route.name)}.npy"
+    with open(path, "wb") as npy:
+        route_data.columns.write_npy(npy)
+    return path
+
+
+def route_summarizer(route: Route) -> summary.RouteSummarizer:
+    return summary.RouteSummarizer(route.name, route_filename(route))
+
+
+def write_dashboard(
+    output_directory: Path, summaries: Sequence[summary.RouteSummary]
+) -> Path:
+    path = output_directory / DASHBOARD_FILENAME
+    with open(path, "w") as dashboard:
+        dashboard.write(
+            report.page(
+                report.dashboard(summaries),
+                title="Route Dashboard",
+                script_names=["sortable"],
+            )
+        )
+    return path
+
+
+def clean_output_directory(
+    output_directory: Path, *, keep: Sequence[Path] = ()
+) -> None:
     output_directory.mkdir(exist_ok=True)
     for item in output_directory.iterdir():
+        if item in keep:
+            continue
         if item.is_dir():
             shutil.rmtree(item)
         else:
             item.unlink()
-    routes = load_routes()
-    with open(f"{output_directory}/index.html", "w") as index:
-        index.write("<h1>Route Index</h1><ul>")
-        for route in routes:
-            filename = f"{sanitize_filename(route.name)}.html"
-            with open(f"{output_directory}/{filename}", "w") as route_file:
-                route_file.write(
-                    report.page(report.route(route), title=route.name)
+
+
+@dataclass(kw_only=True)
+class RouteOutput:
+    """What writing a route left for the pages covering every route."""
+
+    route_data: Optional[RouteData]
+    summary: summary.RouteSummary
+    search_index: search.SearchIndex  # of just this route
+    items_index: provenance.ProvenanceIndex  # of just this route
+    links: list[tuple[str, str]] = field(default_factory=list)
+    paths: list[Path] = field(default_factory=list)  # everything written
+
+
+def write_route(
+    output_directory: Path,
+    route: Route,
+    *,
+    route_data: Optional[RouteData] = None,
+    render_only: bool = False,
+    listeners: Sequence[Callable[[Event], None]] = (),
+    virtualize: bool = False,
+    paginate: bool = False,
+    export_npy: bool = False,
+    on_page: Optional[Callable[[Path], None]] = None,
+) -> RouteOutput:
+    """
+    Writes the pages and files of a route, simulating it unless rendering
+    only, in which case its events are replayed from the route data given.
+    """
+    summarizer = route_summarizer(route)
+    search_index = search.SearchIndex()
+    items_index = provenance.ProvenanceIndex()
+    paths: list[Path] = []
+
+    def add_page(page: Path) -> None:
+        paths.append(page)
+        if on_page:
+            on_page(page)
+
+    indexer = search_index.route_indexer(route.name, route_filename(route))
+    all_listeners: list[Callable[[Event], None]] = [
+        summarizer,
+        indexer,
+        items_index.route_indexer(route.name),
+        *listeners,
+    ]
+    page_writer: Optional[pagination.RegionPageWriter] = None
+    if paginate and route.segment.condition:
+        page_writer = region_page_writer(
+            output_directory, route, on_page=add_page
+        )
+        all_listeners.append(page_writer)
+    if render_only:
+        for event in route_data.events if route_data else []:
+            for listener in all_listeners:
+                listener(event)
+    else:
+        route_data = None
+        if route.segment.condition:
+            route_data = route.run(listeners=all_listeners)
+        paths.append(write_route_cache(output_directory, route, route_data))
+    indexer.finish(route_data.notes if route_data else [])
+    links: list[tuple[str, str]] = []
+    if page_writer:
+        page_writer.finish(route_filename(route))
+        links.append(("by region", page_writer.overview_filename))
+    if route_data:
+        add_page(
+            write_items_page(
+                output_directory,
+                route,
+                items_index.route_acquisitions(route.name),
+            )
+        )
+        links.append(("items", items_filename(route)))
+    add_page(
+        write_route_page(
+            output_directory, route, route_data, virtualize=virtualize
+        )
+    )
+    if export_npy and route_data:
+        paths.append(write_route_npy(output_directory, route, route_data))
+    return RouteOutput(
+        route_data=route_data,
+        summary=summarizer.summary,
+        search_index=search_index,
+        items_index=items_index,
+        links=links,
+        paths=paths,
+    )
+
+
+def write_site_pages(
+    output_directory: Path,
+    routes: Sequence[Route],
+    outputs: Sequence[RouteOutput],
+) -> list[Path]:
+    """
+    Writes the index, dashboard and the search and items indexes covering
+    every route, from what writing each route left, returning their paths
+    so they are bundled and compressed along with the route pages.
+    """
+    return [
+        write_search_index(
+            output_directory,
+            search.SearchIndex.merged(
+                output.search_index for output in outputs
+            ),
+        ),
+        write_items_index(
+            output_directory,
+            provenance.ProvenanceIndex.merged(
+                output.items_index for output in outputs
+            ),
+        ),
+        write_index(
+            output_directory,
+            routes,
+            route_links={
+                route.name: output.links
+                for route, output in zip(routes, outputs)
+            },
+            searchable=True,
+        ),
+        write_dashboard(
+            output_directory, [output.summary for output in outputs]
+        ),
+    ]
+
+
+def build(
+    output_directory: Path,
+    *,
+    export_formats: Sequence[ExportFormat] = (),
+    render_only: bool = False,
+    export_npy: bool = False,
+    gzip_level: Optional[int] = None,
+    bundle_path: Optional[Path] = None,
+    virtualize: bool = False,
+    paginate: bool = False,
+) -> int:
+    cache_directory = output_directory / CACHE_SUBDIRECTORY
+    route_file_cache_directory = (
+        output_directory / ROUTE_FILE_CACHE_SUBDIRECTORY
+    )
+    cached_route_data: dict[str, Optional[RouteData]] = {}
+    if render_only:
+        if not cache_directory.is_dir():
+            raise RuntimeError(
+                f"No cached route data to render from: {cache_directory}"
+            )
+        routes: list[Route] = []
+        for path in cache_directory.glob(f"*{cache.SUFFIX}"):
+            route, cached = cache.read_route_cache(path)
+            routes.append(route)
+            cached_route_data[route.name] = cached
+        routes.sort(key=lambda route: route.name)
+        clean_output_directory(
+            output_directory,
+            keep=[cache_directory, route_file_cache_directory],
+        )
+    else:
+        routes = load_routes(cache_directory=route_file_cache_directory)
+        clean_output_directory(
+            output_directory, keep=[route_file_cache_directory]
+        )
+        cache_directory.mkdir()
+    pages: list[Path] = []
+    with ExitStack() as stack:
+        gzip_pool: Optional[compress.GzipPool] = None
+        if gzip_level is not None:
+            gzip_pool = stack.enter_context(
+                compress.GzipPool(level=gzip_level)
+            )
+
+        def add_page(page: Path) -> None:
+            pages.append(page)
+            if gzip_pool:
+                gzip_pool.submit(page)
+
+        exporters: list[EventExporter] = []
+        for export_format in dict.fromkeys(export_formats):  # deduplicated
+            stream = stack.enter_context(
+                open(
+                    output_directory / f"events.{export_format}",
+                    "w",
+                    newline="",
+                    buffering=1 << 16,
                 )
-            index.write(f'<li><a href="{filename}">{route.name}</a></li>\n')
-        index.write("</ul>")
+            )
+            exporters.append(
+                stack.enter_context(EventExporter(stream, export_format))
+            )
+        outputs = [
+            write_route(
+                output_directory,
+                route,
+                route_data=cached_route_data.get(route.name),
+                render_only=render_only,
+                listeners=[
+                    exporter.route_listener(route.name)
+                    for exporter in exporters
+                ],
+                virtualize=virtualize,
+                paginate=paginate,
+                export_npy=export_npy,
+                on_page=add_page,
+            )
+            for route in routes
+        ]
+        for page in write_site_pages(output_directory, routes, outputs):
+            add_page(page)
+    if bundle_path:
+        compress.write_zip_bundle(bundle_path, output_directory, pages)
     return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="route-planner", description="Generates route pages."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    build_parser = subparsers.add_parser(
+        "build", help="simulate all routes and write their pages (default)"
+    )
+    build_parser.add_argument(
+        "--output-directory",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIRECTORY,
+        help="directory to write pages to; its contents are replaced",
+    )
+    build_parser.add_argument(
+        "--export",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        action="append",
+        default=[],
+        dest="export_formats",
+        help=(
+            "also write the events of every route to events.<format> in the"
+            " output directory; may be given more than once"
+        ),
+    )
+    build_parser.add_argument(
+        "--render-only",
+        action="store_true",
+        help=(
+            "render pages from the route data cached by a previous build"
+            " instead of loading and simulating the routes"
+        ),
+    )
+    build_parser.add_argument(
+        "--export-npy",
+        action="store_true",
+        help=(
+            "also write the metrics after every step of each route to a"
+            " NumPy .npy file named after its page"
+        ),
+    )
+    build_parser.add_argument(
+        "--virtualize",
+        action="store_true",
+        help=(
+            "embed the steps of each route as data that a script renders as"
+            " they scroll into view, rather than as a full table; much"
+            " lighter for phones to display"
+        ),
+    )
+    build_parser.add_argument(
+        "--paginate",
+        action="store_true",
+        help=(
+            "also write each region of a route to its own page, as soon as"
+            " the simulation has passed it, with an overview linking them"
+        ),
+    )
+    build_parser.add_argument(
+        "--gzip",
+        type=int,
+        nargs="?",
+        const=9,
+        choices=range(10),
+        metavar="LEVEL",
+        dest="gzip_level",
+        help=(
+            "also write a gzipped copy of every page next to it, as"
+            " <page>.html.gz, at the given compression level (default: 9)"
+        ),
+    )
+    build_parser.add_argument(
+        "--bundle",
+        type=Path,
+        metavar="ZIP",
+        dest="bundle_path",
+        help="also write every page, including the index, to this zip file",
+    )
+    serve_parser = subparsers.add_parser(
+        "serve", help="serve route pages over HTTP, rendering on demand"
+    )
+    serve_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address to listen on; use 0.0.0.0 to share with others",
+    )
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=64,
+        help="maximum number of rendered pages to keep in memory",
+    )
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="build, then keep pages up to date as route sources change",
+    )
+    watch_parser.add_argument(
+        "--output-directory",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIRECTORY,
+        help="directory to write pages to; its contents are replaced",
+    )
+    watch_parser.add_argument(
+        "--virtualize",
+        action="store_true",
+        help="render steps tables as build --virtualize does",
+    )
+    watch_parser.add_argument(
+        "--paginate",
+        action="store_true",
+        help="also write region pages as build --paginate does",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="seconds between checks for changes",
+    )
+    items_parser = subparsers.add_parser(
+        "items",
+        help="list where routes get items, from the index a build wrote",
+    )
+    items_parser.add_argument(
+        "item", help="text to look for in item names, ignoring case"
+    )
+    items_parser.add_argument(
+        "--route", help="only list routes with this text in their name"
+    )
+    items_parser.add_argument(
+        "--output-directory",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIRECTORY,
+        help="directory a build wrote pages to",
+    )
+    upgrades_parser = subparsers.add_parser(
+        "upgrades",
+        help="suggest where routes could buy and do their weapon upgrades",
+    )
+    upgrades_parser.add_argument(
+        "--route", help="only routes with this text in their name"
+    )
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["build"])
+    if args.command == "serve":
+        server.serve(
+            {route_filename(route): route for route in load_routes()},
+            host=args.host,
+            port=args.port,
+            cache_size=args.cache_size,
+        )
+        return 0
+    if args.command == "items":
+        return query_items(args.output_directory, args.item, route=args.route)
+    if args.command == "upgrades":
+        return suggest_upgrades(route=args.route)
+    if args.command == "watch":
+        try:
+            watch.RouteWatcher(
+                args.output_directory,
+                virtualize=args.virtualize,
+                paginate=args.paginate,
+            ).run(interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return build(
+        args.output_directory,
+        export_formats=args.export_formats,
+        render_only=args.render_only,
+        export_npy=args.export_npy,
+        gzip_level=args.gzip_level,
+        bundle_path=args.bundle_path,
+        virtualize=args.virtualize,
+        paginate=args.paginate,
+    )
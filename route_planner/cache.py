@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from .action import Action, Error, Event, Metrics
+from .columns import MetricsColumns
+from .route import DamageTable, Enemy, Hit, HitType, Route, RouteData, Segment
+from .symbols import symbol, symbol_name
+
+# Layout of a route data cache file (all integers little-endian):
+#   header: magic, version, string count, note count, event count, meta size
+#   string table: (string count + 1) u32 offsets, then the utf-8 bytes
+#   notes: note count u32 string indices
+#   events: event count fixed-size records (see _EVENT_RECORD)
+#   meta: utf-8 JSON describing the route (name, damage tables, hits)
+MAGIC = b"RPDC"
+VERSION = 5
+SUFFIX = ".rpd"
+
+_HEADER = struct.Struct("<4sHIIII")
+_METRICS_FIELDS = [(entry.name, str(entry.type)) for entry in fields(Metrics)]
+# strings and symbols are stored as string indices and numbers as-is
+_FORMAT_BY_KIND = {"str": "I", "Symbol": "I", "int": "i", "float": "d"}
+# name, display, detail, hint, kind, acquired item and resets string
+# indices, the acquired count and flags, followed by each metrics field.
+_EVENT_RECORD = struct.Struct(
+    "<IIIIIIIiB"
+    + "".join(_FORMAT_BY_KIND[kind] for _, kind in _METRICS_FIELDS)
+)
+_FLAG_OUTPUT = 1
+_FLAG_OPTIONAL = 2
+_FLAG_ERROR = 4
+_FLAG_ACQUIRED = 8  # the event acquired an item; see Action.acquired
+
+
+@dataclass(slots=True)
+class CachedAction(Action):
+    """Stands in for an action that was read back from a cache file."""
+
+    cached_name: str = field(default="", kw_only=True)
+    cached_kind: str = field(default="", kw_only=True)
+    cached_acquired: Optional[tuple[str, int]] = field(
+        default=None, kw_only=True
+    )
+    cached_resets: tuple[str, ...] = field(default=(), kw_only=True)
+
+    @property
+    def kind(self) -> str:
+        return self.cached_kind
+
+    @property
+    def name(self) -> str:
+        return self.cached_name
+
+    def acquired(self, event: Event) -> Optional[tuple[str, int]]:
+        return self.cached_acquired
+
+    def resets(self, event: Event) -> Sequence[str]:
+        return self.cached_resets
+
+
+@dataclass(slots=True)
+class CachedError(CachedAction, Error):
+    ...
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def pack(self) -> bytes:
+        encoded = [value.encode() for value in self.strings]
+        offsets = [0]
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+def _route_meta(route: Route) -> dict[str, Any]:
+    hit_lookup = route.hit_lookup or {}
+    weapons = dict.fromkeys(table.weapon for table in route.damage_tables)
+    return {
+        "name": route.name,
+        "enabled": route.segment.condition,
+        "damage_tables": [
+            {
+                "weapon": table.weapon,
+                "enemies": [enemy.name for enemy in table.enemies],
+                "hit_types": [hit_type.name for hit_type in table.hit_types],
+            }
+            for table in route.damage_tables
+        ],
+        "hit_lookup": {
+            weapon: {
+                enemy.name: {
+                    hit_type.name: [hit.damage, hit.with_rtsr]
+                    for hit_type, hit in hits.items()
+                }
+                for enemy, hits in hit_lookup[weapon].items()
+            }
+            for weapon in weapons
+            if weapon in hit_lookup
+        },
+    }
+
+
+def _route_from_meta(meta: dict[str, Any]) -> Route:
+    return Route(
+        meta["name"],
+        Segment(condition=meta["enabled"]),
+        damage_tables=[
+            DamageTable(
+                weapon=table["weapon"],
+                enemies=[Enemy[name] for name in table["enemies"]],
+                hit_types=[HitType[name] for name in table["hit_types"]],
+            )
+            for table in meta["damage_tables"]
+        ],
+        hit_lookup={
+            weapon: {
+                Enemy[enemy]: {
+                    HitType[hit_type]: Hit(damage, with_rtsr=with_rtsr)
+                    for hit_type, (damage, with_rtsr) in hits.items()
+                }
+                for enemy, hits in enemies.items()
+            }
+            for weapon, enemies in meta["hit_lookup"].items()
+        },
+    )
+
+
+def _pack_metric(strings: _StringTable, kind: str, value: Any) -> Any:
+    if kind == "Symbol":
+        return strings.intern(symbol_name(value))
+    if kind == "str":
+        return strings.intern(value)
+    return value
+
+
+def _unpack_metric(strings: list[str], kind: str, value: Any) -> Any:
+    if kind == "Symbol":
+        return symbol(strings[value])
+    if kind == "str":
+        return strings[value]
+    return value
+
+
+def write_route_cache(
+    path: Path, route: Route, route_data: Optional[RouteData]
+) -> None:
+    if route_data is None:
+        route_data = RouteData()
+    strings = _StringTable()
+    note_indices = [strings.intern(note) for note in route_data.notes]
+    records: list[bytes] = []
+    for event in route_data.events:
+        action = event.action
+        acquired = action.acquired(event)
+        acquired_item, acquired_count = acquired or ("", 0)
+        flags = (
+            (_FLAG_OUTPUT if event.output else 0)
+            | (_FLAG_OPTIONAL if action.optional else 0)
+            | (_FLAG_ERROR if isinstance(action, Error) else 0)
+            | (_FLAG_ACQUIRED if acquired else 0)
+        )
+        metrics_values = [
+            _pack_metric(strings, kind, getattr(event.metrics, name))
+            for name, kind in _METRICS_FIELDS
+        ]
+        records.append(
+            _EVENT_RECORD.pack(
+                strings.intern(action.name),
+                strings.intern(event.display),
+                strings.intern(action.detail),
+                strings.intern(event.hint),
+                strings.intern(action.kind),
+                strings.intern(acquired_item),
+                strings.intern(" ".join(action.resets(event))),
+                acquired_count,
+                flags,
+                *metrics_values,
+            )
+        )
+    meta = json.dumps(_route_meta(route), separators=(",", ":")).encode()
+    with open(path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(strings.strings),
+                len(note_indices),
+                len(records),
+                len(meta),
+            )
+        )
+        file.write(strings.pack())
+        file.write(struct.pack(f"<{len(note_indices)}I", *note_indices))
+        file.write(b"".join(records))
+        file.write(meta)
+
+
+def read_route_cache(path: Path) -> tuple[Route, Optional[RouteData]]:
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer, memoryview(buffer) as view:
+        (
+            magic,
+            version,
+            string_count,
+            note_count,
+            event_count,
+            meta_size,
+        ) = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise RuntimeError(f"Not a route data cache (v{VERSION}): {path}")
+        offset = _HEADER.size
+        string_offsets = struct.unpack_from(
+            f"<{string_count + 1}I", view, offset
+        )
+        offset += 4 * (string_count + 1)
+        strings = [
+            str(view[offset + start : offset + end], "utf-8")
+            for start, end in zip(string_offsets, string_offsets[1:])
+        ]
+        offset += string_offsets[-1]
+        notes = [
+            strings[index]
+            for index in struct.unpack_from(f"<{note_count}I", view, offset)
+        ]
+        offset += 4 * note_count
+        events_size = _EVENT_RECORD.size * event_count
+        events: list[Event] = []
+        for values in _EVENT_RECORD.iter_unpack(
+            view[offset : offset + events_size]
+        ):
+            (
+                name_index,
+                display_index,
+                detail_index,
+                hint_index,
+                kind_index,
+                acquired_index,
+                resets_index,
+                acquired_count,
+                flags,
+            ) = values[:9]
+            action_type = CachedError if flags & _FLAG_ERROR else CachedAction
+            action = action_type(
+                strings[display_index],
+                detail=strings[detail_index],
+                optional=bool(flags & _FLAG_OPTIONAL),
+                cached_name=strings[name_index],
+                cached_kind=strings[kind_index],
+                cached_acquired=(
+                    (strings[acquired_index], acquired_count)
+                    if flags & _FLAG_ACQUIRED
+                    else None
+                ),
+                cached_resets=tuple(strings[resets_index].split()),
+            )
+            metrics = Metrics(
+                **{
+                    name: _unpack_metric(strings, kind, value)
+                    for (name, kind), value in zip(_METRICS_FIELDS, values[9:])
+                }
+            )
+            events.append(
+                Event(
+                    metrics=metrics,
+                    action=action,
+                    output=bool(flags & _FLAG_OUTPUT),
+                    target=action.target,
+                    hint=strings[hint_index],
+                )
+            )
+        offset += events_size
+        meta = json.loads(str(view[offset : offset + meta_size], "utf-8"))
+    route = _route_from_meta(meta)
+    if not route.segment.condition:
+        return route, None
+    return route, RouteData(
+        events=events, notes=notes, columns=MetricsColumns.from_events(events)
+    )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import struct
+from array import array
+from dataclasses import fields
+from typing import BinaryIO, Iterable
+
+from .action import Event, Metrics
+from .symbols import Symbol, symbol, symbol_name
+
+_FIELD_KINDS = {entry.name: str(entry.type) for entry in fields(Metrics)}
+# text fields are kept as interned symbols, so every column is numeric
+_TYPECODE_BY_KIND = {"int": "i", "Symbol": "i", "str": "i", "float": "d"}
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_ALIGNMENT = 64
+
+
+class MetricsColumns:
+    """
+    The metrics after every event of a route, stored column-wise with one
+    array per Metrics field, so that a whole field can be read (or written
+    out) at once without touching the events.
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict[str, array[int] | array[float]] = {
+            name: array(_TYPECODE_BY_KIND[kind])
+            for name, kind in _FIELD_KINDS.items()
+        }
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> MetricsColumns:
+        columns = cls()
+        for event in events:
+            columns.append(event.metrics)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.columns["souls"])
+
+    def __call__(self, event: Event) -> None:  # usable as a listener
+        self.append(event.metrics)
+
+    def append(self, metrics: Metrics) -> None:
+        for name, kind in _FIELD_KINDS.items():
+            value = getattr(metrics, name)
+            self.columns[name].append(
+                symbol(value) if kind == "str" else value
+            )
+
+    def names(self, name: str) -> list[str]:
+        """The values of a text field, mapped back from their symbols."""
+        return [
+            symbol_name(Symbol(int(value))) for value in self.columns[name]
+        ]
+
+    def write_npy(self, stream: BinaryIO) -> None:
+        """
+        Writes the columns as a NumPy .npy file holding a 1-d structured
+        array with a record per event, so they load with numpy.load.
+        """
+        formats: list[str] = []
+        descr: list[tuple[str, str]] = []
+        text: dict[str, list[bytes]] = {}
+        for name, kind in _FIELD_KINDS.items():
+            if kind in ("str", "Symbol"):
+                values = self.names(name)
+                width = max(map(len, values), default=0) or 1
+                text[name] = [value.encode("utf-32-le") for value in values]
+                formats.append(f"{width * 4}s")
+                descr.append((name, f"<U{width}"))
+            elif kind == "float":
+                formats.append("d")
+                descr.append((name, "<f8"))
+            else:
+                formats.append("i")
+                descr.append((name, "<i4"))
+        header = repr(
+            {"descr": descr, "fortran_order": False, "shape": (len(self),)}
+        )
+        padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % _NPY_ALIGNMENT
+        header += " " * padding + "\n"
+        stream.write(_NPY_MAGIC + struct.pack("<H", len(header)))
+        stream.write(header.encode("latin1"))
+        record = struct.Struct("<" + "".join(formats))
+        rows = zip(
+            *(
+                text[name] if name in text else self.columns[name]
+                for name in _FIELD_KINDS
+            )
+        )
+        stream.write(b"".join(record.pack(*row) for row in rows))
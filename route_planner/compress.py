@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import gzip
+import shutil
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+# Everything that could vary between builds of the same content is fixed, so
+# unchanged pages compress to byte-identical output.
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)  # the earliest a zip can represent
+_ZIP_PERMISSIONS = 0o644 << 16
+_CHUNK_SIZE = 1 << 16
+
+
+def gzip_file(path: Path, *, level: int = 9) -> Path:
+    """Writes a deterministic gzip of the file next to it, adding '.gz'."""
+    gzip_path = path.with_name(f"{path.name}.gz")
+    with open(path, "rb") as source, open(gzip_path, "wb") as raw:
+        with gzip.GzipFile(
+            filename="", mode="wb", compresslevel=level, fileobj=raw, mtime=0
+        ) as target:
+            shutil.copyfileobj(source, target, _CHUNK_SIZE)
+    return gzip_path
+
+
+class GzipPool:
+    """
+    Gzips files on worker threads as they are handed over, so compression
+    overlaps with the rest of the build; zlib releases the GIL while it
+    works.  Leaving the context waits for everything, re-raising any error.
+    """
+
+    def __init__(
+        self, *, level: int = 9, max_workers: Optional[int] = None
+    ) -> None:
+        self.level = level
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures: list[Future[Path]] = []
+
+    def __enter__(self) -> GzipPool:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._executor.shutdown()
+        for future in self._futures:
+            future.result()
+
+    def submit(self, path: Path) -> None:
+        self._futures.append(
+            self._executor.submit(gzip_file, path, level=self.level)
+        )
+
+
+def write_zip_bundle(
+    bundle_path: Path, root: Path, files: Sequence[Path]
+) -> None:
+    """
+    Streams the files into a deterministic zip, named relative to root and
+    stored in sorted order.
+    """
+    with zipfile.ZipFile(bundle_path, "w") as bundle:
+        for file in sorted(files, key=lambda file: file.relative_to(root)):
+            info = zipfile.ZipInfo(
+                file.relative_to(root).as_posix(), date_time=_ZIP_DATE_TIME
+            )
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3  # unix, whatever platform built it
+            info.external_attr = _ZIP_PERMISSIONS
+            with open(file, "rb") as source, bundle.open(info, "w") as target:
+                shutil.copyfileobj(source, target, _CHUNK_SIZE)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import tomllib
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+from .route import Enemy, Hit, HitType
+
+HitLookup = dict[str, dict[Enemy, dict[HitType, Hit]]]
+
+
+def defended(attack: float, defense: float) -> float:
+    """
+    The damage an attack deals through a defense.  The share that gets
+    through grows with the ratio of the two, from a tenth to nine tenths,
+    along a curve that is steepest where they are about equal.
+    """
+    if defense <= 0:
+        return 0.9 * attack
+    ratio = attack / defense
+    if ratio < 0.125:
+        share = 0.1
+    elif ratio < 1:
+        share = 19.2 / 49 * (ratio - 0.125) ** 2 + 0.1
+    elif ratio < 2.5:
+        share = -0.4 / 3 * (ratio - 2.5) ** 2 + 0.7
+    elif ratio < 8:
+        share = -0.8 / 121 * (ratio - 8) ** 2 + 0.9
+    else:
+        share = 0.9
+    return attack * share
+
+
+@dataclass(frozen=True, kw_only=True)
+class Weapon:
+    name: str
+    attack: tuple[float, ...]  # by upgrade level, from +0
+    motion: Mapping[HitType, float] = field(default_factory=dict)
+
+    def level_name(self, level: int) -> str:
+        return f"{self.name} +{level}"
+
+
+@dataclass(frozen=True, kw_only=True)
+class Disagreement:
+    weapon: str
+    enemy: Enemy
+    hit_type: HitType
+    modelled: Hit
+    measured: Hit
+
+
+@dataclass(frozen=True, kw_only=True)
+class DamageModel:
+    """
+    Hits worked out from weapon attack ratings, enemy defenses and motion
+    values, for weapons and levels nobody has measured.  No numbers come
+    with it; they need to come from the game's own weapon, upgrade and enemy
+    data, not be fitted to the measured hits they would be checked against.
+    """
+
+    weapons: tuple[Weapon, ...]
+    defenses: Mapping[Enemy, float]
+    motion: Mapping[HitType, float]  # percent of attack
+    rtsr_multiplier: float
+
+    @classmethod
+    def from_toml(cls, text: str) -> DamageModel:
+        values = tomllib.loads(text)
+
+        def motion(table: Mapping[str, Any]) -> dict[HitType, float]:
+            return {HitType[name]: value for name, value in table.items()}
+
+        return cls(
+            weapons=tuple(
+                Weapon(
+                    name=name,
+                    attack=tuple(weapon["attack"]),
+                    motion=motion(weapon.get("motion", {})),
+                )
+                for name, weapon in values["weapons"].items()
+            ),
+            defenses={
+                Enemy[name]: defense
+                for name, defense in values["defense"].items()
+            },
+            motion=motion(values["motion"]),
+            rtsr_multiplier=values["rtsr_multiplier"],
+        )
+
+    def hit_lookup(self) -> HitLookup:
+        """Every hit of every weapon level against every enemy."""
+        lookup: HitLookup = {}
+        for weapon in self.weapons:
+            motions = {**self.motion, **weapon.motion}
+            for level, attack in enumerate(weapon.attack):
+                enemies = lookup[weapon.level_name(level)] = {}
+                for enemy, defense in self.defenses.items():
+                    hits = enemies[enemy] = {}
+                    for hit_type, motion in motions.items():
+                        hit_attack = attack * motion / 100
+                        hits[hit_type] = Hit(
+                            round(defended(hit_attack, defense)),
+                            with_rtsr=round(
+                                defended(
+                                    hit_attack * self.rtsr_multiplier, defense
+                                )
+                            ),
+                        )
+        return lookup
+
+
+def _disagrees(modelled: int, measured: int, tolerance: float) -> bool:
+    return bool(measured) and abs(modelled - measured) > tolerance * measured
+
+
+def layered(
+    modelled: HitLookup, measured: HitLookup, *, tolerance: float = 0.1
+) -> tuple[HitLookup, list[Disagreement]]:
+    """
+    The modelled hits with every measured one in their place, along with
+    where a measurement is further than the tolerance from the model.  A
+    measured damage of 0 is unknown, so the model's is kept.
+    """
+    lookup = {
+        weapon: {enemy: dict(hits) for enemy, hits in enemies.items()}
+        for weapon, enemies in modelled.items()
+    }
+    disagreements: list[Disagreement] = []
+    for weapon, enemies in measured.items():
+        for enemy, hits in enemies.items():
+            known = lookup.setdefault(weapon, {}).setdefault(enemy, {})
+            for hit_type, hit in hits.items():
+                model = known.get(hit_type)
+                if model is None:
+                    known[hit_type] = hit
+                    continue
+                known[hit_type] = Hit(
+                    hit.damage or model.damage,
+                    with_rtsr=hit.with_rtsr or model.with_rtsr,
+                )
+                if _disagrees(
+                    model.damage, hit.damage, tolerance
+                ) or _disagrees(model.with_rtsr, hit.with_rtsr, tolerance):
+                    disagreements.append(
+                        Disagreement(
+                            weapon=weapon,
+                            enemy=enemy,
+                            hit_type=hit_type,
+                            modelled=model,
+                            measured=hit,
+                        )
+                    )
+    return lookup, disagreements
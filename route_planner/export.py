@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import fields
+from enum import StrEnum, unique
+from typing import IO, Any, Callable
+
+from .action import Event, Metrics
+from .symbols import symbol_name
+
+METRICS_FIELDS = [metrics_field.name for metrics_field in fields(Metrics)]
+# interned fields are exported by name
+_SYMBOL_FIELDS = {
+    metrics_field.name
+    for metrics_field in fields(Metrics)
+    if str(metrics_field.type) == "Symbol"
+}
+COLUMNS = ["route", "step", "type", "name", "display", "detail"] + (
+    METRICS_FIELDS
+)
+
+
+@unique
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class EventExporter:
+    """
+    Writes route events as NDJSON or CSV rows.  Rows are encoded as they
+    arrive and buffered until batch_size of them are pending, at which point
+    they are written to the stream in a single call; memory use is bounded by
+    the batch size rather than by the length of the routes being exported.
+    """
+
+    def __init__(
+        self,
+        stream: IO[str],
+        export_format: ExportFormat,
+        *,
+        batch_size: int = 1024,
+    ) -> None:
+        self._stream = stream
+        self._export_format = export_format
+        self._batch_size = batch_size
+        self._pending: list[str] = []
+        # csv.writer needs a file to write to, so rows are encoded into this
+        # and then moved into the pending batch.
+        self._csv_buffer = io.StringIO()
+        self._csv_writer = csv.writer(self._csv_buffer, lineterminator="\n")
+        if export_format == ExportFormat.CSV:
+            self._csv_writer.writerow(COLUMNS)
+            self._take_csv_buffer()
+
+    def __enter__(self) -> EventExporter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
+
+    def _take_csv_buffer(self) -> None:
+        self._pending.append(self._csv_buffer.getvalue())
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+
+    def add_event(self, route_name: str, step: int, event: Event) -> None:
+        metrics = event.metrics
+        values: list[Any] = [
+            route_name,
+            step,
+            type(event.action).__name__,
+            event.action.name,
+            event.display,
+            event.action.detail,
+        ] + [
+            (
+                symbol_name(getattr(metrics, name))
+                if name in _SYMBOL_FIELDS
+                else getattr(metrics, name)
+            )
+            for name in METRICS_FIELDS
+        ]
+        if self._export_format == ExportFormat.NDJSON:
+            self._pending.append(
+                json.dumps(dict(zip(COLUMNS, values)), ensure_ascii=False)
+                + "\n"
+            )
+        else:
+            self._csv_writer.writerow(values)
+            self._take_csv_buffer()
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def route_listener(self, route_name: str) -> Callable[[Event], None]:
+        """Returns a listener for Route.run that numbers events as it goes."""
+        step = 0
+
+        def listener(event: Event) -> None:
+            nonlocal step
+            self.add_event(route_name, step, event)
+            step += 1
+
+        return listener
+
+    def flush(self) -> None:
+        if self._pending:
+            self._stream.write("".join(self._pending))
+            self._pending.clear()
+        self._stream.flush()
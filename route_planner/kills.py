@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import StrEnum, unique
+from itertools import combinations_with_replacement
+from typing import Iterable, Mapping, Optional, Sequence
+
+from .route import DamageTable, Enemy, Hit, HitType
+
+HitLookup = Mapping[str, Mapping[Enemy, Mapping[HitType, Hit]]]
+
+# Rough guesses, in seconds, at how long each kind of hit takes to land,
+# recovery included, until they are measured.  Until then, plans for the
+# fastest kill aren't shown, and these only break ties between plans taking
+# as few hits.
+HIT_SECONDS: dict[HitType, float] = {
+    HitType.WEAK_1H: 1.0,
+    HitType.HEAVY_1H: 1.4,
+    HitType.JUMPING_1H: 1.6,
+    HitType.WEAK_2H: 1.2,
+    HitType.HEAVY_2H: 1.7,
+    HitType.JUMPING_2H: 1.8,
+    HitType.BACKSTAB_1H: 3.5,
+    HitType.BACKSTAB_2H: 3.5,
+    HitType.RIPOSTE_1H: 3.0,
+    HitType.RIPOSTE_2H: 3.0,
+    HitType.MAGIC: 1.5,
+}
+
+_RIPOSTES = (HitType.RIPOSTE_1H, HitType.RIPOSTE_2H)
+_BACKSTABS = (HitType.BACKSTAB_1H, HitType.BACKSTAB_2H)
+
+
+@unique
+class Objective(StrEnum):
+    FEWEST_HITS = "fewest hits"
+    FASTEST = "fastest"
+
+
+@dataclass(frozen=True, kw_only=True)
+class KillLimits:
+    """How many hits of the kinds that need an opening a kill can count on."""
+
+    ripostes: int = 3
+    backstabs: int = 1
+
+
+@dataclass(frozen=True, kw_only=True)
+class KillPlan:
+    hits: tuple[tuple[HitType, int], ...]  # most damaging first
+    damage: int
+    seconds: float
+
+    @property
+    def hit_count(self) -> int:
+        return sum(count for _, count in self.hits)
+
+    def describe(self) -> str:
+        """e.g. '3 Riposte(2H) + 1 Weak(1H)'"""
+        return " + ".join(
+            f"{count} {hit_type.info.display_name}"
+            for hit_type, count in self.hits
+        )
+
+
+# The cost of a plan is a single int, so that costs compare in C: the hits
+# and milliseconds it takes, packed so that the objective's measure counts
+# first.  In a table, it is shifted past the index of the plan's first hit,
+# so the smallest entry also says which hit that is.
+_SCALE = 1 << 40
+_IMPOSSIBLE = 1 << 128
+_INDEX_BITS = 4
+_NO_HIT = (1 << _INDEX_BITS) - 1
+
+
+def _cost(objective: Objective, seconds: float) -> int:
+    milliseconds = round(seconds * 1000)
+    if objective is Objective.FEWEST_HITS:
+        return _SCALE + milliseconds
+    return milliseconds * _SCALE + 1
+
+
+@dataclass
+class _HealthTable:
+    """
+    The cheapest way to deal at least each amount of damage, up to the most
+    asked for, using only hits that can be repeated at will: costs[h] and
+    the first hit of it, choices[h], from which the rest follows.
+    """
+
+    costs: list[int] = field(default_factory=lambda: [0])
+    choices: list[int] = field(default_factory=lambda: [_NO_HIT])
+
+
+class KillPlanner:
+    """
+    Finds the cheapest mix of hits that kills each enemy form, with limits
+    on ripostes and backstabs.  Repeatable hits are planned by a DP over
+    health, kept for every weapon, enemy, RTSR setting, objective and set of
+    allowed hits it is asked about, so an enemy's forms share one table;
+    ripostes and backstabs, being few, are tried in every combination on
+    top.
+    """
+
+    def __init__(
+        self,
+        hit_lookup: HitLookup,
+        *,
+        limits: KillLimits = KillLimits(),
+        hit_seconds: Mapping[HitType, float] = HIT_SECONDS,
+    ) -> None:
+        self.hit_lookup = hit_lookup
+        self.limits = limits
+        self.hit_seconds = hit_seconds
+        self._tables: dict[
+            tuple[str, Enemy, bool, Objective, frozenset[HitType]],
+            _HealthTable,
+        ] = {}
+
+    def precompute(
+        self,
+        tables: Sequence[DamageTable] = (),
+        *,
+        objective: Objective = Objective.FEWEST_HITS,
+    ) -> None:
+        """
+        Fills the tables for the weapon, enemies and hits of each damage
+        table, or for every weapon and enemy in the lookup with any hits if
+        none are given, so planning for their forms only looks them up.
+        """
+        if not tables:
+            tables = [
+                DamageTable(weapon=weapon, enemies=list(enemies))
+                for weapon, enemies in self.hit_lookup.items()
+            ]
+        for table in tables:
+            for enemy in table.enemies:
+                for rtsr in (False, True):
+                    self.plan(
+                        table.weapon,
+                        enemy,
+                        max(enemy.info.form_health_lookup.values()),
+                        rtsr=rtsr,
+                        objective=objective,
+                        hit_types=table.hit_types,
+                    )
+
+    def _damage(
+        self, weapon: str, enemy: Enemy, hit_type: HitType, rtsr: bool
+    ) -> int:
+        hit = self.hit_lookup.get(weapon, {}).get(enemy, {}).get(hit_type)
+        if hit is None:
+            return 0
+        return hit.with_rtsr if rtsr else hit.damage
+
+    def _table(
+        self,
+        key: tuple[str, Enemy, bool, Objective, frozenset[HitType]],
+        repeatable: Sequence[tuple[HitType, int]],
+        health: int,
+    ) -> _HealthTable:
+        table = self._tables.setdefault(key, _HealthTable())
+        objective = key[3]
+        costs, choices = table.costs, table.choices
+        hit_costs = [
+            (index, damage, _cost(objective, self.hit_seconds[hit_type]))
+            for index, (hit_type, damage) in enumerate(repeatable)
+        ]
+        hit_costs = [  # a hit dealing less for as much is never worth it
+            (index, damage, cost)
+            for index, damage, cost in hit_costs
+            if not any(
+                (other_damage, -other_cost) > (damage, -cost)
+                and other_damage >= damage
+                and other_cost <= cost
+                for _, other_damage, other_cost in hit_costs
+            )
+        ]
+        if not hit_costs:
+            costs.extend([_IMPOSSIBLE] * (health + 1 - len(costs)))
+            choices.extend([_NO_HIT] * (health + 1 - len(choices)))
+            return table
+        # every amount in a block below the smallest hit only depends on
+        # amounts before the block, so a block is filled a column at a time
+        block = min(damage for _, damage, _ in hit_costs)
+        for start in range(len(costs), health + 1, block):
+            stop = min(start + block, health + 1)
+            impossible = _IMPOSSIBLE << _INDEX_BITS | _NO_HIT
+            columns = [[impossible] * (stop - start)]
+            for index, damage, cost in hit_costs:
+                first, last = max(start - damage, 0), max(stop - damage, 0)
+                killed = cost << _INDEX_BITS | index
+                columns.append(
+                    [killed] * (stop - start - (last - first))
+                    + [
+                        (rest + cost) << _INDEX_BITS | index
+                        for rest in costs[first:last]
+                    ]
+                )
+            cheapest = list(map(min, *columns))
+            costs.extend(entry >> _INDEX_BITS for entry in cheapest)
+            choices.extend(entry & _NO_HIT for entry in cheapest)
+        return table
+
+    def plan(
+        self,
+        weapon: str,
+        enemy: Enemy,
+        health: int,
+        *,
+        rtsr: bool = False,
+        objective: Objective = Objective.FEWEST_HITS,
+        hit_types: Optional[Iterable[HitType]] = None,
+    ) -> Optional[KillPlan]:
+        """the cheapest plan dealing at least the health, if there is one."""
+        allowed = frozenset(hit_types if hit_types is not None else HitType)
+        damages = {  # in definition order, which breaks ties the same way
+            hit_type: self._damage(weapon, enemy, hit_type, rtsr)
+            for hit_type in HitType
+            if hit_type in allowed
+        }
+        damages = {
+            hit_type: damage for hit_type, damage in damages.items() if damage
+        }
+        repeatable = sorted(
+            (
+                (hit_type, damage)
+                for hit_type, damage in damages.items()
+                if hit_type not in _RIPOSTES + _BACKSTABS
+            ),
+            key=lambda entry: -entry[1],
+        )
+        table = self._table(
+            (weapon, enemy, rtsr, objective, allowed), repeatable, health
+        )
+        best: tuple[int, tuple[HitType, ...]] = (_IMPOSSIBLE, ())
+        for limited in self._limited_combinations(damages):
+            damage = sum(damages[hit_type] for hit_type in limited)
+            cost = table.costs[max(health - damage, 0)] + sum(
+                _cost(objective, self.hit_seconds[hit_type])
+                for hit_type in limited
+            )
+            if cost < best[0]:
+                best = (cost, limited)
+        if best[0] >= _IMPOSSIBLE:
+            return None
+        hits = list(best[1])
+        remaining = max(health - sum(damages[h] for h in hits), 0)
+        while remaining > 0:
+            choice = table.choices[remaining]
+            assert choice != _NO_HIT  # the cost would be impossible
+            hit_type, damage = repeatable[choice]
+            hits.append(hit_type)
+            remaining = max(remaining - damage, 0)
+        counts: dict[HitType, int] = {}
+        for hit_type in sorted(hits, key=lambda hit: -damages[hit]):
+            counts[hit_type] = counts.get(hit_type, 0) + 1
+        return KillPlan(
+            hits=tuple(counts.items()),
+            damage=sum(damages[hit_type] for hit_type in hits),
+            seconds=sum(self.hit_seconds[hit_type] for hit_type in hits),
+        )
+
+    def _limited_combinations(
+        self, damages: Mapping[HitType, int]
+    ) -> list[tuple[HitType, ...]]:
+        ripostes = [hit for hit in _RIPOSTES if hit in damages]
+        backstabs = [hit for hit in _BACKSTABS if hit in damages]
+        riposte_sets = [
+            combination
+            for count in range(self.limits.ripostes + 1 if ripostes else 1)
+            for combination in combinations_with_replacement(ripostes, count)
+        ]
+        backstab_sets = [
+            combination
+            for count in range(self.limits.backstabs + 1 if backstabs else 1)
+            for combination in combinations_with_replacement(backstabs, count)
+        ]
+        return [r + b for r in riposte_sets for b in backstab_sets]
+
+
+_PLANNERS: dict[int, KillPlanner] = {}
+_MAX_PLANNERS = 8
+
+
+def planner_for(
+    hit_lookup: HitLookup, tables: Sequence[DamageTable] = ()
+) -> KillPlanner:
+    """
+    A planner shared by every route using the same lookup.  A new one is
+    precomputed for the damage tables, as in KillPlanner.precompute.
+    """
+    planner = _PLANNERS.pop(id(hit_lookup), None)
+    if planner is None or planner.hit_lookup is not hit_lookup:
+        planner = KillPlanner(hit_lookup)
+        planner.precompute(tables)
+    _PLANNERS[id(hit_lookup)] = planner  # most recently used last
+    while len(_PLANNERS) > _MAX_PLANNERS:
+        del _PLANNERS[next(iter(_PLANNERS))]
+    return planner
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, is_dataclass
+from typing import Any, Generic, Hashable, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+# the names leading from a root object to a value, e.g. ("options", "notes")
+FieldPath = tuple[str, ...]
+# every path read, in the order first read, with the value it had
+Reads = dict[FieldPath, Any]
+
+
+class RecordingProxy:
+    """
+    Stands in for an options object while something is built from it,
+    noting the path to and value of every field read through it.  Nested
+    dataclasses are wrapped in turn, so only the leaves they lead to count.
+    """
+
+    __slots__ = ("_target", "_path", "_reads")
+
+    def __init__(self, target: Any, path: FieldPath, reads: Reads) -> None:
+        self._target = target
+        self._path = path
+        self._reads = reads
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        path = self._path + (name,)
+        if is_dataclass(value) and not isinstance(value, type):
+            return RecordingProxy(value, path, self._reads)
+        self._reads.setdefault(path, value)
+        return value
+
+
+def read_path(roots: Mapping[str, Any], path: FieldPath) -> Any:
+    value = roots[path[0]]
+    for name in path[1:]:
+        value = getattr(value, name)
+    return value
+
+
+@dataclass
+class _Branch:
+    path: FieldPath
+    # by value where it can be hashed, and otherwise searched through
+    children: dict[Any, _Branch | _Built[Any]] = field(default_factory=dict)
+    unhashable_children: list[tuple[Any, _Branch | _Built[Any]]] = field(
+        default_factory=list
+    )
+
+    def child(self, value: Any) -> Optional[_Branch | _Built[Any]]:
+        try:
+            return self.children.get(value)
+        except TypeError:
+            for known, child in self.unhashable_children:
+                if known == value:
+                    return child
+            return None
+
+    def add_child(self, value: Any, child: _Branch | _Built[Any]) -> None:
+        try:
+            self.children[value] = child
+        except TypeError:
+            self.unhashable_children.append((value, child))
+
+
+@dataclass
+class _Built(Generic[T]):
+    built: T
+
+
+class ConstructionCache(Generic[T]):
+    """
+    What was built for each key, along with the option values that were
+    read to build it, so it can be reused for any options that agree on
+    just those values.
+
+    Building is deterministic, so which field is read next only depends on
+    the values read before it, and each key's builds form a tree branching
+    on those values; finding a build takes one step per field it read, not
+    a scan of every build.
+    """
+
+    def __init__(self) -> None:
+        self._roots: dict[Hashable, _Branch | _Built[T]] = {}
+
+    def get(self, key: Hashable, roots: Mapping[str, Any]) -> Optional[T]:
+        node = self._roots.get(key)
+        while isinstance(node, _Branch):
+            node = node.child(read_path(roots, node.path))
+        return node.built if node else None
+
+    def add(self, key: Hashable, reads: Reads, built: T) -> None:
+        leaf: _Built[T] = _Built(built)
+        if key not in self._roots:
+            self._roots[key] = self._chain(list(reads.items()), leaf)
+            return
+        node = self._roots[key]
+        items = list(reads.items())
+        for index, (path, value) in enumerate(items):
+            if not isinstance(node, _Branch) or node.path != path:
+                return  # built differently for the same values; don't keep
+            child = node.child(value)
+            if child is None:
+                node.add_child(value, self._chain(items[index + 1 :], leaf))
+                return
+            node = child
+
+    @staticmethod
+    def _chain(
+        items: list[tuple[FieldPath, Any]], leaf: _Built[T]
+    ) -> _Branch | _Built[T]:
+        node: _Branch | _Built[T] = leaf
+        for path, value in reversed(items):
+            branch = _Branch(path)
+            branch.add_child(value, node)
+            node = branch
+        return node
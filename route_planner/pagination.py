@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional
+
+from . import report
+from .action import Event, Metrics
+from .route import Route, RouteData
+from .summary import RegionPage
+
+
+class RegionPageWriter:
+    """
+    A listener for Route.run that writes each region of a route to its own
+    page as soon as the simulation moves on to the next one, and then an
+    overview linking them all once the route has finished.  Each page holds
+    the same steps as that region's group in the full steps table.
+    """
+
+    def __init__(
+        self,
+        output_directory: Path,
+        route: Route,
+        basename: str,
+        *,
+        on_page: Optional[Callable[[Path], None]] = None,
+    ) -> None:
+        self.output_directory = output_directory
+        self.route = route
+        self.basename = basename
+        self.pages: list[RegionPage] = []
+        self._on_page = on_page
+        self._events: list[Event] = []
+        self._start = Metrics()
+        self._number = 0  # as numbered in the steps table
+
+    @property
+    def overview_filename(self) -> str:
+        return f"{self.basename}-regions.html"
+
+    def _filename(self, number: int) -> str:
+        return f"{self.basename}-{number:02}.html"
+
+    def _write(self, filename: str, html: str) -> None:
+        path = self.output_directory / filename
+        with open(path, "w") as page:
+            page.write(html)
+        if self._on_page:
+            self._on_page(path)
+
+    def _write_region(self, *, last: bool) -> None:
+        events = self._events
+        self._events = []
+        start = self._start
+        self._start = events[-1].metrics
+        number = self._number
+        self._number += 1
+        if number == 0 and not any(event.output for event in events):
+            return  # nothing before the first region
+        if not last:
+            # the step that moved on belongs here, but the next region doesn't
+            boundary = events[-1]
+            events[-1] = replace(
+                boundary,
+                metrics=replace(boundary.metrics, region=start.region),
+            )
+        page = RegionPage(
+            number=number,
+            region=start.region,
+            filename=self._filename(number),
+            start=start,
+            end=events[-1].metrics,
+        )
+        souls = start.souls
+        for event in events:
+            page.totals.add(event, souls)
+            souls = event.metrics.souls
+        previous_filename = self.pages[-1].filename if self.pages else None
+        self.pages.append(page)
+        self._write(
+            page.filename,
+            report.page(
+                report.region_page(
+                    self.route,
+                    page,
+                    RouteData(events=events),
+                    overview_filename=self.overview_filename,
+                    previous_filename=previous_filename,
+                    next_filename=None if last else self._filename(number + 1),
+                ),
+                title=f"{self.route.name}: {report.region_title(page)}",
+            ),
+        )
+
+    def __call__(self, event: Event) -> None:
+        self._events.append(event)
+        if event.metrics.region != self._start.region:
+            self._write_region(last=False)
+
+    def finish(self, route_filename: str) -> None:
+        """Writes the last region and the overview, linking the full page."""
+        if self._events:
+            self._write_region(last=True)
+        self._write(
+            self.overview_filename,
+            report.page(
+                report.region_overview(self.route, self.pages, route_filename),
+                title=f"{self.route.name}: Regions",
+            ),
+        )
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Generic,
+    Hashable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    TypeVar,
+    cast,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# A hash trie: each node is a tuple of _WIDTH entries, each empty (None), a
+# leaf or a child node indexed by the next _BITS bits of the key's hash.
+# Nodes are never modified; a change copies only the nodes on the path to
+# it, sharing the rest with the map it was made from.  Keys whose hashes are
+# entirely equal end up in a plain tuple of leaves at _MAX_SHIFT.
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_BITS = 64
+_MAX_SHIFT = _HASH_BITS - _HASH_BITS % _BITS + _BITS
+_EMPTY: tuple[Any, ...] = (None,) * _WIDTH
+
+
+class _Leaf(NamedTuple):
+    key: Any
+    value: Any
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+def _set(
+    node: tuple[Any, ...], shift: int, key_hash: int, key: Any, value: Any
+) -> tuple[tuple[Any, ...], int]:
+    """returns the new node and how many keys were added."""
+    if shift >= _MAX_SHIFT:
+        leaves = tuple(leaf for leaf in node if leaf.key != key)
+        return leaves + (_Leaf(key, value),), int(len(leaves) == len(node))
+    index = (key_hash >> shift) & _MASK
+    entry = node[index]
+    added = 0
+    if entry is None:
+        entry, added = _Leaf(key, value), 1
+    elif type(entry) is _Leaf:
+        if entry.key == key:
+            entry = _Leaf(key, value)
+        else:  # push the existing leaf down a level, next to the new one
+            child = _EMPTY if shift + _BITS < _MAX_SHIFT else ()
+            child, _ = _set(
+                child, shift + _BITS, _hash(entry.key), entry.key, entry.value
+            )
+            entry, added = _set(child, shift + _BITS, key_hash, key, value)
+    else:
+        entry, added = _set(entry, shift + _BITS, key_hash, key, value)
+    return node[:index] + (entry,) + node[index + 1 :], added
+
+
+def _delete(
+    node: tuple[Any, ...], shift: int, key_hash: int, key: Any
+) -> tuple[Any, ...]:
+    """returns the node without the key, which must be present."""
+    if shift >= _MAX_SHIFT:
+        return tuple(leaf for leaf in node if leaf.key != key)
+    index = (key_hash >> shift) & _MASK
+    entry = node[index]
+    if type(entry) is _Leaf:
+        entry = None
+    else:
+        entry = _delete(entry, shift + _BITS, key_hash, key)
+        if not any(entry):
+            entry = None
+    return node[:index] + (entry,) + node[index + 1 :]
+
+
+def _leaves(node: tuple[Any, ...], shift: int) -> Iterator[_Leaf]:
+    if shift >= _MAX_SHIFT:
+        yield from node
+        return
+    for entry in node:
+        if entry is None:
+            continue
+        if type(entry) is _Leaf:
+            yield entry
+        else:
+            yield from _leaves(entry, shift + _BITS)
+
+
+class PersistentMap(Mapping[K, V]):
+    """
+    An immutable mapping where set and delete return a new map sharing all
+    but O(log n) of its structure with the old one, so keeping every
+    version of a changing map costs memory in proportion to the changes.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self) -> None:
+        self._root = _EMPTY
+        self._size = 0
+
+    @classmethod
+    def _make(cls, root: tuple[Any, ...], size: int) -> PersistentMap[K, V]:
+        new = cls.__new__(cls)
+        new._root = root
+        new._size = size
+        return new
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[K]:
+        for leaf in _leaves(self._root, 0):
+            yield leaf.key
+
+    def __getitem__(self, key: K) -> V:
+        key_hash = _hash(key)
+        node = self._root
+        shift = 0
+        while shift < _MAX_SHIFT:
+            entry = node[(key_hash >> shift) & _MASK]
+            if entry is None:
+                raise KeyError(key)
+            if type(entry) is _Leaf:
+                if entry.key == key:
+                    return cast(V, entry.value)
+                raise KeyError(key)
+            node = entry
+            shift += _BITS
+        for leaf in node:
+            if leaf.key == key:
+                return cast(V, leaf.value)
+        raise KeyError(key)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def set(self, key: K, value: V) -> PersistentMap[K, V]:
+        root, added = _set(self._root, 0, _hash(key), key, value)
+        return self._make(root, self._size + added)
+
+    def delete(self, key: K) -> PersistentMap[K, V]:
+        if key not in self:
+            return self
+        return self._make(
+            _delete(self._root, 0, _hash(key), key), self._size - 1
+        )
+
+
+class SnapshotDict(dict[K, V], Generic[K, V]):
+    """
+    A dict that keeps a PersistentMap of its contents up to date as it is
+    changed, so snapshot() can hand out an immutable copy in O(1).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._snapshot: PersistentMap[K, V] = PersistentMap()
+        super().__init__(*args, **kwargs)
+        self._resnapshot()
+
+    def _resnapshot(self) -> None:
+        snapshot: PersistentMap[K, V] = PersistentMap()
+        for key, value in self.items():
+            snapshot = snapshot.set(key, value)
+        self._snapshot = snapshot
+
+    def snapshot(self) -> PersistentMap[K, V]:
+        return self._snapshot
+
+    def __setitem__(self, key: K, value: V) -> None:
+        super().__setitem__(key, value)
+        self._snapshot = self._snapshot.set(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._snapshot = self._snapshot.delete(key)
+
+    # dict's own implementations of these don't go through __setitem__ and
+    # __delitem__, so they are routed through them or resnapshot after.
+    def setdefault(self, key: K, default: Any = None) -> V:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: K, *default: Any) -> Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self) -> tuple[K, V]:
+        key, value = super().popitem()
+        self._snapshot = self._snapshot.delete(key)
+        return key, value
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._resnapshot()
+
+    def clear(self) -> None:
+        super().clear()
+        self._snapshot = PersistentMap()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import IO, Iterable, Optional
+
+from .action import Event
+from .symbols import symbol_name
+
+
+@dataclass(frozen=True, kw_only=True)
+class Acquisition:
+    item: str
+    route: str
+    step: int  # numbered from 1 as rows of the steps table are
+    action: str  # the type of action, e.g. Loot or Buy
+    count: int
+    region: str
+
+
+class RouteItemIndexer:
+    """A listener for Route.run recording where a route gets each item."""
+
+    def __init__(self, index: ProvenanceIndex, route_name: str) -> None:
+        self._index = index
+        self._route_name = route_name
+        self._step = 0
+
+    def __call__(self, event: Event) -> None:
+        if not event.output:
+            return
+        self._step += 1
+        acquired = event.action.acquired(event)
+        if acquired is None:
+            return
+        item, count = acquired
+        self._index.acquisitions.append(
+            Acquisition(
+                item=item,
+                route=self._route_name,
+                step=self._step,
+                action=event.action.kind,
+                count=count,
+                region=symbol_name(event.metrics.region),
+            )
+        )
+
+
+class ProvenanceIndex:
+    """Every item acquired by every route, in route and step order."""
+
+    def __init__(
+        self, acquisitions: Optional[list[Acquisition]] = None
+    ) -> None:
+        self.acquisitions = acquisitions or []
+
+    def route_indexer(self, route_name: str) -> RouteItemIndexer:
+        return RouteItemIndexer(self, route_name)
+
+    @classmethod
+    def merged(cls, indexes: Iterable[ProvenanceIndex]) -> ProvenanceIndex:
+        return cls(
+            [
+                acquisition
+                for index in indexes
+                for acquisition in index.acquisitions
+            ]
+        )
+
+    def route_acquisitions(self, route_name: str) -> list[Acquisition]:
+        return [
+            acquisition
+            for acquisition in self.acquisitions
+            if acquisition.route == route_name
+        ]
+
+    def query(
+        self, item: str, *, route: Optional[str] = None
+    ) -> list[Acquisition]:
+        """acquisitions of items containing the text, ignoring case."""
+        item = item.casefold()
+        route = route.casefold() if route else None
+        return [
+            acquisition
+            for acquisition in self.acquisitions
+            if item in acquisition.item.casefold()
+            and (not route or route in acquisition.route.casefold())
+        ]
+
+    def write(self, stream: IO[str]) -> None:
+        json.dump(
+            [asdict(acquisition) for acquisition in self.acquisitions],
+            stream,
+            ensure_ascii=False,
+            indent=0,
+        )
+
+    @classmethod
+    def read(cls, stream: IO[str]) -> ProvenanceIndex:
+        return cls([Acquisition(**entry) for entry in json.load(stream)])
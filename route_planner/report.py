@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import json
 from html.parser import HTMLParser
 from importlib.resources import open_text as open_text_resource
 from math import ceil
 from os import linesep
-from typing import Optional
+from typing import Any, Optional, Sequence
 
-from . import styles
+from . import scripts, styles
 from .action import Error, Metrics
+from .kills import KillPlan, Objective, planner_for
+from .provenance import Acquisition
 from .route import DamageTable, Enemy, Hit, HitType, Route, RouteData
+from .slack import Slack, route_slack
+from .summary import RegionPage, RouteSummary
+from .symbols import NOTHING, symbol_name
+from .timing import Timeline
 
 
 class ConvertMinifiedToPrettyHtmlParser(HTMLParser):
@@ -86,12 +93,24 @@ def convert_minified_to_pretty_html(content: str) -> str:
     return parser.pretty_html()
 
 
-def page(body: str, *, title: str = "", style: str = "light") -> str:
+def script(name: str) -> str:
+    with open_text_resource(scripts, f"{name}.js") as source:
+        return f"<script>{source.read()}</script>"
+
+
+def page(
+    body: str,
+    *,
+    title: str = "",
+    style: str = "light",
+    script_names: Sequence[str] = (),
+) -> str:
     if title:
         title = f"<title>{title}</title>"
     if style:
         with open_text_resource(styles, f"{style}.css") as css:
             style = f"<style>{css.read()}</style>"
+    body += "".join(script(script_name) for script_name in script_names)
     content = f"<html><head>{title}{style}</head><body>{body}</body></html>"
     return convert_minified_to_pretty_html(content)
 
@@ -147,6 +166,54 @@ def damage_table(
     return "".join(html)
 
 
+def _kill_plan_cell(plan: Optional[KillPlan], *, classes: str) -> str:
+    if plan is None:
+        return f'<td class="{classes}"></td>'
+    title = f"{plan.damage} damage"
+    return f'<td class="{classes}" title="{title}">{plan.describe()}</td>'
+
+
+def kill_plans_table(
+    table: DamageTable,
+    *,
+    hit_lookup: Optional[dict[str, dict[Enemy, dict[HitType, Hit]]]],
+) -> str:
+    if not hit_lookup:
+        return ""
+    planner = planner_for(hit_lookup)
+    objective = Objective.FEWEST_HITS  # the fastest waits on hit timings
+    html: list[str] = []
+    html.append('<table class="route"><thead><tr>')
+    for rtsr in (False, True):
+        suffix = " with RTSR" if rtsr else ""
+        html.append(f"<th>{objective.capitalize()}{suffix}</th>")
+    html.append('<th title="Enemy">Enemy</th></tr></thead><tbody>')
+
+    for enemy in table.enemies:
+        for form_name, health in enemy.info.form_health_lookup.items():
+            html.append("<tr>")
+            for rtsr in (False, True):
+                plan = planner.plan(
+                    table.weapon,
+                    enemy,
+                    health,
+                    rtsr=rtsr,
+                    objective=objective,
+                    hit_types=table.hit_types,
+                )
+                html.append(
+                    _kill_plan_cell(
+                        plan, classes="kill rtsr" if rtsr else "kill"
+                    )
+                )
+            html.append(
+                f'<td class="enemy" title="{health} total hp">'
+                f"{form_name}</td></tr>"
+            )
+    html.append("</tbody></table>")
+    return "".join(html)
+
+
 def notes_list(route_data: RouteData) -> str:
     if not route_data.notes:
         return ""
@@ -169,29 +236,189 @@ def _value_cell(name: str, old_value: int, new_value: int) -> str:
     return html
 
 
-def steps_table(route_data: RouteData) -> str:
-    region_count = 0
-    last_metrics = Metrics()
-    region = ""
-    columns = [
-        ("Souls", "Souls"),
-        ("Item Souls", "☄️"),
-        ("Homeward Bones", "🦴"),
-        ("Titanite Shards", "🌑"),
-        ("Twinkling Titanite", "💎"),
-        ("Item Humanities", "👤"),
-        ("Humanity", "👨"),
-        ("Action", "Action"),
-    ]
+def duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes}:{seconds:02}"
+
+
+def _time_cell(old_seconds: float, new_seconds: float) -> str:
+    html = f'<td class="time" title="{duration(new_seconds)} elapsed">'
+    if new_seconds != old_seconds:
+        html += f'<span class="add">+{duration(new_seconds - old_seconds)}'
+        html += f"</span><br/>{duration(new_seconds)}"
+    html += "</td>"
+    return html
+
 
+def is_timed(route_data: RouteData) -> bool:
+    return (
+        bool(route_data.events) and route_data.events[-1].metrics.seconds > 0
+    )
+
+
+def time_table(route_data: RouteData) -> str:
+    timeline = Timeline(route_data.events)
     html: list[str] = []
-    html.append('<table class="route"><thead><tr>')
-    html.extend(
-        [f'<th title="{column[0]}">{column[1]}</th>' for column in columns]
+    html.append(
+        '<table class="route"><thead><tr><th title="Segment">Segment</th>'
+        '<th title="Time">⏱️</th><th title="Elapsed">Elapsed</th>'
+        "</tr></thead><tbody>"
     )
-    html.append("</tr></thead><tbody>")
-    for event in route_data.events:
-        if event.action.output:  # only output rows that should be
+    for span in timeline.segment_spans:
+        html.append(
+            f'<tr><td class="action">{span.name}</td>'
+            f'<td class="time">{duration(timeline.span(span))}</td>'
+            f'<td class="time">{duration(timeline.elapsed(span.end - 1))}'
+            "</td></tr>"
+        )
+    html.append("</tbody></table>")
+    return "".join(html)
+
+
+def sparkline(
+    values: Sequence[float],
+    boundaries: Sequence[tuple[int, str]] = (),
+    *,
+    width: int = 600,
+    height: int = 40,
+) -> str:
+    """An inline SVG line of the values, marking the named boundaries."""
+    low, high = min(values, default=0), max(values, default=0)
+    x_scale = width / max(len(values) - 1, 1)
+    y_scale = (height - 2) / ((high - low) or 1)
+    points = " ".join(
+        f"{index * x_scale:.1f},{height - 1 - (value - low) * y_scale:.1f}"
+        for index, value in enumerate(values)
+    )
+    html = (
+        f'<svg class="sparkline" width="{width}" height="{height}"'
+        f' viewBox="0 0 {width} {height}">'
+    )
+    for index, name in boundaries:
+        x = f"{index * x_scale:.1f}"
+        html += (
+            f'<line class="boundary" x1="{x}" y1="0" x2="{x}"'
+            f' y2="{height}"><title>{name}</title></line>'
+        )
+    return html + f'<polyline points="{points}"></polyline></svg>'
+
+
+def trends_table(route_data: RouteData) -> str:
+    columns = route_data.columns.columns
+    regions = route_data.columns.names("region")
+    boundaries = [
+        (index, region)
+        for index, region in enumerate(regions)
+        if region and (index == 0 or region != regions[index - 1])
+    ]
+    html: list[str] = []
+    html.append(
+        '<table class="route trends"><thead><tr><th title="Metric">Metric'
+        '</th><th title="Lowest">Low</th><th title="Highest">High</th>'
+        '<th title="Over the route">Trend</th></tr></thead><tbody>'
+    )
+    for name, label in [
+        ("souls", "Souls"),
+        ("item_souls", "Item Souls"),
+        ("humanity", "Humanity"),
+    ]:
+        values = columns[name]
+        html.append(
+            f'<tr><td class="action">{label}</td>'
+            f"<td>{min(values, default=0)}</td>"
+            f"<td>{max(values, default=0)}</td>"
+            f"<td>{sparkline(values, boundaries)}</td></tr>"
+        )
+    html.append("</tbody></table>")
+    return "".join(html)
+
+
+# (title, header, Metrics field) of each value column in the steps table
+_STEP_VALUES = [
+    ("Souls", "Souls", "souls"),
+    ("Item Souls", "☄️", "item_souls"),
+    ("Homeward Bones", "🦴", "homeward_bones"),
+    ("Titanite Shards", "🌑", "titanite_shards"),
+    ("Twinkling Titanite", "💎", "twinkling_titanite"),
+    ("Item Humanities", "👤", "item_humanities"),
+    ("Humanity", "👨", "humanity"),
+]
+# flags of rows in the virtualized steps table's data
+_ROW_OPTIONAL = 1
+_ROW_ERROR = 2
+_ROW_REGION = 4
+
+
+def _steps_table_head(timed: bool, *, slack: bool = False) -> tuple[str, int]:
+    """returns the opening of a steps table and its number of columns."""
+    columns = [(title, header) for title, header, _ in _STEP_VALUES]
+    if timed:
+        columns.append(("Time", "⏱️"))
+    if slack:
+        columns.append(("Slack", "Slack"))
+    columns.append(("Action", "Action"))
+    return (
+        '<table class="route"><thead><tr>'
+        + "".join(
+            [f'<th title="{column[0]}">{column[1]}</th>' for column in columns]
+        )
+        + "</tr></thead>"
+    ), len(columns)
+
+
+def _slack_text(slack: Optional[Slack]) -> str:
+    if slack is None:
+        return ""
+    return (
+        f"{slack.souls} souls, {slack.item_souls} item souls and"
+        f" {slack.humanity} humanity to spare"
+    )
+
+
+def _slack_cell(slack: Optional[Slack]) -> str:
+    if slack is None:
+        return '<td class="slack"></td>'
+    return f'<td class="slack" title="{_slack_text(slack)}">{slack.souls}</td>'
+
+
+def _error_warning(
+    route_data: RouteData, initial_metrics: Optional[Metrics] = None
+) -> str:
+    if not route_data.events:
+        return ""
+    error_count = route_data.events[-1].metrics.error_count
+    if initial_metrics:
+        error_count -= initial_metrics.error_count
+    if not error_count:
+        return ""
+    return f'<span class="warning">{error_count} errors present.</span>'
+
+
+def steps_table(
+    route_data: RouteData,
+    *,
+    initial_metrics: Optional[Metrics] = None,
+    region_count: int = 0,
+    slack: Optional[Sequence[Optional[Slack]]] = None,
+) -> str:
+    """
+    initial_metrics and region_count are as of just before the first event,
+    for tables showing only part of a route.  With the slack at each event,
+    it gets a column of its own.
+    """
+    last_metrics = initial_metrics or Metrics()
+    region = last_metrics.region
+    timed = is_timed(route_data)
+    head, column_count = _steps_table_head(timed, slack=slack is not None)
+
+    html: list[str] = []
+    html.append(head)
+    html.append("<tbody>")
+    for index, event in enumerate(route_data.events):
+        if event.output:  # only output rows that should be
             rowclass = ""
             if isinstance(event.action, Error):
                 rowclass = "error"
@@ -228,33 +455,119 @@ def steps_table(route_data: RouteData) -> str:
                 + _value_cell(
                     "Humanity", last_metrics.humanity, event.metrics.humanity
                 )
+                + (
+                    _time_cell(last_metrics.seconds, event.metrics.seconds)
+                    if timed
+                    else ""
+                )
+                + (_slack_cell(slack[index]) if slack is not None else "")
                 + '<td class="action">'
                 f'<span class="name">{event.action.name}</span>'
-                f' <span class="display">{event.action.display}</span>'
-                f'<br/><span class="detail">{event.action.detail}'
-                "</span></td></tr>"
+                f' <span class="display">{event.display}</span>'
+                f'<br/><span class="detail">{event.action.detail}</span>'
+                + (
+                    f'<br/><span class="hint">{event.hint}</span>'
+                    if event.hint
+                    else ""
+                )
+                + "</td></tr>"
             )
         if event.metrics.region != region:
             region = event.metrics.region
             region_count += 1
             html.append(
                 "</tbody><tbody><tr>"
-                f'<td colspan="{len(columns)}" class="region">'
-                f"{region_count:02}. {region}</td></tr>"
+                f'<td colspan="{column_count}" class="region">'
+                f"{region_count:02}. {symbol_name(region)}</td></tr>"
                 "</tbody><tbody>"
             )
         last_metrics = event.metrics
     html.append("</tbody></table>")
+    return _error_warning(route_data, initial_metrics) + "".join(html)
 
-    if event.metrics.error_count:
-        html.insert(  # prepend
-            0,
-            (
-                f'<span class="warning">{event.metrics.error_count}'
-                " errors present.</span>"
-            ),
-        )
-    return "".join(html)
+
+def steps_data(
+    route_data: RouteData, *, slack: Optional[Sequence[Optional[Slack]]] = None
+) -> dict[str, Any]:
+    """
+    The steps table as compact data for the virtualized table script.  Each
+    row is its flags, then the change in every value since the previous row,
+    then string table indices of the action's name, display, detail and hint.
+    With slack, that is followed by null or the souls to spare and the string
+    index of the slack's description.  A row whose shown changes differ from
+    that (due to a hidden step) also carries the values to show changes from.
+    Region rows are just their flags and the region's string index.
+    """
+    timed = is_timed(route_data)
+    names = [name for _, _, name in _STEP_VALUES]
+    if timed:
+        names.append("seconds")
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    rows: list[list[Any]] = []
+    row_values = [0] * len(names)  # as of the previous row
+    last_values = row_values
+    region = NOTHING
+    for index, event in enumerate(route_data.events):
+        values = [getattr(event.metrics, name) for name in names]
+        action = event.action
+        if event.output:
+            flags = 0
+            if isinstance(action, Error):
+                flags = _ROW_ERROR
+            elif action.optional:
+                flags = _ROW_OPTIONAL
+            row: list[Any] = [flags]
+            row.extend(new - old for new, old in zip(values, row_values))
+            row.extend(
+                intern(text)
+                for text in (
+                    action.name,
+                    event.display,
+                    action.detail,
+                    event.hint,
+                )
+            )
+            if slack is not None:
+                entry = slack[index]
+                row.append(
+                    [entry.souls, intern(_slack_text(entry))]
+                    if entry
+                    else None
+                )
+            if last_values != row_values:
+                row.append(last_values)
+            rows.append(row)
+            row_values = values
+        if event.metrics.region != region:
+            region = event.metrics.region
+            rows.append([_ROW_REGION, intern(symbol_name(region))])
+        last_values = values
+    return {"timed": timed, "strings": list(strings), "rows": rows}
+
+
+def virtual_steps_table(
+    route_data: RouteData, *, slack: Optional[Sequence[Optional[Slack]]] = None
+) -> str:
+    """
+    A steps table that the "steps" script fills in from embedded data,
+    rendering only the rows near the screen.
+    """
+    head, _ = _steps_table_head(is_timed(route_data), slack=slack is not None)
+    data = json.dumps(
+        steps_data(route_data, slack=slack),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).replace("</", "<\\/")
+    return (
+        _error_warning(route_data)
+        + head.replace('class="route"', 'class="route virtual"', 1)
+        + "</table>"
+        + f'<script type="application/json" class="steps">{data}</script>'
+    )
 
 
 def route(
@@ -262,6 +575,8 @@ def route(
     *,
     damage_tables: Optional[list[DamageTable]] = None,
     hit_lookup: Optional[dict[str, dict[Enemy, dict[HitType, Hit]]]] = None,
+    route_data: Optional[RouteData] = None,
+    virtualize: bool = False,
 ) -> str:
     html: list[str] = []
     if route.name:
@@ -269,7 +584,8 @@ def route(
     if not route.segment.condition:
         html.append('<span class="warning">Route Segment is DISABLED</span>')
     else:
-        route_data = route.run()
+        if route_data is None:
+            route_data = route.run()
         if route_data.notes:
             html.append('<span class="route section">Notes</span>')
             html.append(notes_list(route_data))
@@ -279,6 +595,198 @@ def route(
                 f'<span class="route section">Hits ({table.weapon})</span>'
             )
             html.append(damage_table(table, hit_lookup=route.hit_lookup))
+        if route.hit_lookup:
+            planner_for(route.hit_lookup, route.damage_tables)
+        for table in route.damage_tables if route.hit_lookup else []:
+            html.append(
+                '<span class="route section">'
+                f"Kill plans ({table.weapon})</span>"
+            )
+            html.append(kill_plans_table(table, hit_lookup=route.hit_lookup))
+        if is_timed(route_data):
+            html.append('<span class="route section">Time</span>')
+            html.append(time_table(route_data))
+        if route_data.events:
+            html.append('<span class="route section">Trends</span>')
+            html.append(trends_table(route_data))
         html.append('<span class="route section">Steps</span>')
-        html.append(steps_table(route_data))
+        slack = route_slack(route_data.events)
+        if virtualize:
+            html.append(virtual_steps_table(route_data, slack=slack))
+        else:
+            html.append(steps_table(route_data, slack=slack))
+    return "".join(html)
+
+
+def _summary_cell(value: int, *, title: str = "") -> str:
+    title = f' title="{title}"' if title else ""
+    return f'<td data-value="{value}"{title}>{value}</td>'
+
+
+def dashboard(summaries: Sequence[RouteSummary]) -> str:
+    regions = list(
+        dict.fromkeys(
+            region for summary in summaries for region in summary.regions
+        )
+    )
+    columns = [
+        ("Route", "Route"),
+        ("Souls", "Souls"),
+        ("Humanity", "👨"),
+        ("Homeward Bones", "🦴"),
+        ("Errors", "Errors"),
+        ("Steps", "Steps"),
+        ("Optional Steps", "Optional"),
+    ] + [
+        (
+            (f"Steps in {symbol_name(region)}", symbol_name(region))
+            if region != NOTHING
+            else ("Steps before any region", "(none)")
+        )
+        for region in regions
+    ]
+    html: list[str] = []
+    html.append('<span class="route display_name">Route Dashboard</span>')
+    html.append('<table class="route sortable"><thead><tr>')
+    html.extend(
+        [f'<th title="{column[0]}">{column[1]}</th>' for column in columns]
+    )
+    html.append("</tr></thead><tbody>")
+    for summary in summaries:
+        html.append(
+            ('<tr class="error">' if summary.error_count else "<tr>")
+            + f'<td class="action"><a href="{summary.filename}">'
+            f"{summary.name}</a></td>"
+        )
+        if not summary.ran:
+            html.append(f'<td colspan="{len(columns) - 1}">disabled</td>')
+        else:
+            html.append(
+                _summary_cell(summary.souls)
+                + _summary_cell(summary.humanity)
+                + _summary_cell(summary.homeward_bones)
+                + _summary_cell(summary.error_count)
+                + _summary_cell(summary.steps)
+                + _summary_cell(summary.optional_steps)
+            )
+            for region in regions:
+                totals = summary.regions.get(region)
+                if totals is None:
+                    html.append('<td data-value="-1"></td>')
+                    continue
+                html.append(
+                    _summary_cell(
+                        totals.steps,
+                        title=(
+                            f"{totals.steps} steps,"
+                            f" {totals.optional_steps} optional,"
+                            f" {totals.error_count} errors,"
+                            f" {totals.souls:+} souls"
+                        ),
+                    )
+                )
+        html.append("</tr>")
+    html.append("</tbody></table>")
+    return "".join(html)
+
+
+def region_title(page: RegionPage) -> str:
+    name = symbol_name(page.region) if page.region else "(before any region)"
+    return f"{page.number:02}. {name}"
+
+
+def region_page(
+    route: Route,
+    page: RegionPage,
+    route_data: RouteData,
+    *,
+    overview_filename: str,
+    previous_filename: Optional[str] = None,
+    next_filename: Optional[str] = None,
+) -> str:
+    links = [
+        f'<a href="{filename}">{label}</a>'
+        for filename, label in [
+            (previous_filename, "Previous"),
+            (overview_filename, "Regions"),
+            (next_filename, "Next"),
+        ]
+        if filename
+    ]
+    return (
+        f'<span class="route display_name">{route.name}</span>'
+        f'<span class="route section">{region_title(page)}</span>'
+        f'<p class="route">{" | ".join(links)}</p>'
+        + steps_table(
+            route_data, initial_metrics=page.start, region_count=page.number
+        )
+    )
+
+
+def region_overview(
+    route: Route, pages: Sequence[RegionPage], route_filename: str
+) -> str:
+    timed = any(page.end.seconds for page in pages)
+    columns = [
+        ("Region", "Region"),
+        ("Steps", "Steps"),
+        ("Optional Steps", "Optional"),
+        ("Errors", "Errors"),
+        ("Souls gained", "Souls"),
+        ("Souls at the end", "Souls after"),
+        ("Humanity at the end", "👨"),
+    ]
+    if timed:
+        columns.append(("Time", "⏱️"))
+    html: list[str] = []
+    html.append(
+        f'<span class="route display_name">{route.name}</span>'
+        f'<p class="route"><a href="{route_filename}">All steps</a></p>'
+        '<table class="route"><thead><tr>'
+    )
+    html.extend(
+        [f'<th title="{column[0]}">{column[1]}</th>' for column in columns]
+    )
+    html.append("</tr></thead><tbody>")
+    for page in pages:
+        totals = page.totals
+        html.append(
+            ('<tr class="error">' if totals.error_count else "<tr>")
+            + f'<td class="action"><a href="{page.filename}">'
+            f"{region_title(page)}</a></td>"
+            f"<td>{totals.steps}</td><td>{totals.optional_steps}</td>"
+            f"<td>{totals.error_count}</td><td>{totals.souls:+}</td>"
+            f"<td>{page.end.souls}</td><td>{page.end.humanity}</td>"
+            + (
+                f'<td class="time">'
+                f"{duration(page.end.seconds - page.start.seconds)}</td>"
+                if timed
+                else ""
+            )
+            + "</tr>"
+        )
+    html.append("</tbody></table>")
+    return "".join(html)
+
+
+def items_page(
+    route: Route, acquisitions: Sequence[Acquisition], route_filename: str
+) -> str:
+    html: list[str] = []
+    html.append(
+        f'<span class="route display_name">{route.name}</span>'
+        f'<p class="route"><a href="{route_filename}">All steps</a></p>'
+        '<table class="route"><thead><tr><th title="Step">Step</th>'
+        '<th title="Item">Item</th><th title="Count">Count</th>'
+        '<th title="How">How</th><th title="Region">Region</th>'
+        "</tr></thead><tbody>"
+    )
+    for acquisition in acquisitions:
+        html.append(
+            f"<tr><td>{acquisition.step}</td>"
+            f'<td class="action">{acquisition.item}</td>'
+            f"<td>{acquisition.count}</td><td>{acquisition.action}</td>"
+            f'<td class="action">{acquisition.region}</td></tr>'
+        )
+    html.append("</tbody></table>")
     return "".join(html)
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import re
+from dataclasses import dataclass, field, fields, is_dataclass
 from enum import Enum, unique
-from typing import Callable, Generator, Optional
+from types import CodeType, FunctionType, MethodType
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+)
 
-from .action import Event, State, Step
+from .action import Action, Event, State, StateSnapshot, Step
+from .columns import MetricsColumns
+from .timing import TimeModel
+from .travel import TravelGraph
+from .upgrades import UpgradeGoal
+
+# function reprs include their address, which differs between loads
+_ADDRESS_PATTERN = re.compile(r" at 0x[0-9a-fA-F]+")
 
 
 @dataclass
@@ -118,11 +136,49 @@ class DamageTable:
     hit_types: list[HitType] = field(default_factory=lambda: list(HitType))
 
 
+def always(state: State) -> bool:
+    """The default condition callback, which Route.finalize can rely on."""
+    return True
+
+
+@dataclass
+class AddNotes:  # is a 'action.Step'
+    """The notes of a segment inlined by Route.finalize, in their place."""
+
+    notes: list[str]
+
+    def generate_events(self, state: State) -> Generator[Event, None, None]:
+        state.notes.extend(self.notes)
+        yield from ()
+
+
+@dataclass
+class LazySteps:  # is a 'action.Step'
+    """
+    Steps made by a factory the first time they are needed, so branches a
+    variant never takes cost nothing to construct; see Route.finalize.
+    """
+
+    factory: Callable[[], Sequence[Step]]
+    _steps: Optional[list[Step]] = field(default=None, init=False, repr=False)
+
+    @property
+    def steps(self) -> list[Step]:
+        if self._steps is None:
+            self._steps = list(self.factory())
+        return self._steps
+
+    def generate_events(self, state: State) -> Generator[Event, None, None]:
+        for step in self.steps:
+            yield from step.generate_events(state)
+
+
 @dataclass(kw_only=True)
 class Segment:  # is a 'action.Step'
     notes: list[str] = field(default_factory=list)
+    label: str = ""  # if set, events within are attributed to this segment
     condition: bool = True
-    condition_callback: Callable[[State], bool] = lambda state: True
+    condition_callback: Callable[[State], bool] = always
     # not in init to force using the varargs add_steps, so call sites are less
     # indented by not having to specify the nested list.
     steps: list[Step] = field(default_factory=list, init=False)
@@ -139,6 +195,19 @@ class Segment:  # is a 'action.Step'
         self.else_steps.extend(steps)
         return self
 
+    def add_step_factory(
+        self, factory: Callable[[], Sequence[Step]]
+    ) -> Segment:
+        """adds steps that are only made if they could be taken."""
+        self.steps.append(LazySteps(factory))
+        return self
+
+    def else_add_step_factory(
+        self, factory: Callable[[], Sequence[Step]]
+    ) -> Segment:
+        self.else_steps.append(LazySteps(factory))
+        return self
+
     def generate_events(self, state: State) -> Generator[Event, None, None]:
         steps: list[Step] = []
         if self.condition and self.condition_callback(state):
@@ -146,14 +215,127 @@ class Segment:  # is a 'action.Step'
             steps = self.steps
         else:
             steps = self.else_steps
+        outer_segment = state.segment
+        if self.label:
+            state.segment = self.label
         for step in steps:
             yield from step.generate_events(state)
+        state.segment = outer_segment
+
+
+def finalize_steps(steps: Sequence[Step]) -> list[Step]:
+    """
+    The steps with everything decided at construction taken out: actions and
+    branches whose condition is false are dropped, and unlabelled segments
+    that are always taken are replaced by their notes and steps, so only
+    condition callbacks are left to decide anything as a route runs.  Step
+    factories are only called for branches that can be taken.
+    """
+    finalized: list[Step] = []
+
+    def add_notes(notes: list[str]) -> None:
+        if not notes:
+            return
+        if finalized and isinstance(finalized[-1], AddNotes):
+            finalized[-1] = AddNotes(finalized[-1].notes + notes)
+        else:
+            finalized.append(AddNotes(list(notes)))
+
+    def inline(steps: Sequence[Step]) -> None:  # already finalized
+        for step in steps:
+            if isinstance(step, AddNotes):
+                add_notes(step.notes)
+            else:
+                finalized.append(step)
+
+    for step in steps:
+        if isinstance(step, Action):
+            if step.condition:
+                finalized.append(step)
+        elif isinstance(step, AddNotes):
+            add_notes(step.notes)
+        elif isinstance(step, LazySteps):
+            inline(finalize_steps(step.steps))
+        elif isinstance(step, Segment):
+            if step.condition and step.condition_callback is not always:
+                step.steps = finalize_steps(step.steps)
+                step.else_steps = finalize_steps(step.else_steps)
+                finalized.append(step)  # decided by the state as it runs
+                continue
+            if step.condition:
+                notes, taken = step.notes, finalize_steps(step.steps)
+                step.steps, step.else_steps = taken, []
+            else:
+                notes, taken = [], finalize_steps(step.else_steps)
+                step.steps, step.else_steps = [], taken
+            if not notes and not taken:
+                continue
+            if step.label:  # kept to attribute its events
+                finalized.append(step)
+            else:
+                add_notes(notes)
+                inline(taken)
+        else:
+            finalized.append(step)
+    return finalized
+
+
+def _code_description(code: CodeType) -> str:
+    constants = [
+        _code_description(constant)
+        if isinstance(constant, CodeType)
+        else repr(constant)
+        for constant in code.co_consts
+    ]
+    return repr((code.co_code, code.co_names, constants))
+
+
+def _functions(value: Any, seen: set[int]) -> Iterator[FunctionType]:
+    """every function the value holds, along with those they close over"""
+    if isinstance(value, (str, bytes, int, float, Enum, type)):
+        return
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+    if isinstance(value, MethodType):
+        yield from _functions(value.__func__, seen)
+        yield from _functions(value.__self__, seen)
+    elif isinstance(value, FunctionType):
+        yield value
+        for cell in value.__closure__ or ():
+            yield from _functions(cell.cell_contents, seen)
+        yield from _functions(value.__defaults__, seen)
+    elif is_dataclass(value):
+        for entry in fields(value):
+            yield from _functions(getattr(value, entry.name, None), seen)
+    elif isinstance(value, Mapping):
+        for entry in value.values():
+            yield from _functions(entry, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for entry in value:
+            yield from _functions(entry, seen)
+
+
+def _function_description(function: FunctionType) -> str:
+    """the code of a function and the values it closes over"""
+    closure = [cell.cell_contents for cell in function.__closure__ or ()]
+    return _code_description(function.__code__) + repr(
+        (function.__defaults__, closure)
+    )
 
 
 @dataclass(kw_only=True)
 class RouteData:
     events: list[Event] = field(default_factory=list)
     notes: list[str] = field(default_factory=list)
+    columns: MetricsColumns = field(default_factory=MetricsColumns)
+
+    def state_at(self, index: int) -> StateSnapshot:
+        """the state as of an event, if the route was run with snapshots."""
+        snapshot = self.events[index].snapshot
+        if snapshot is None:
+            raise ValueError("the route was not run with snapshots")
+        return snapshot
 
 
 @dataclass
@@ -162,12 +344,51 @@ class Route:
     segment: Segment
     damage_tables: list[DamageTable] = field(default_factory=list)
     hit_lookup: Optional[dict[str, dict[Enemy, dict[HitType, Hit]]]] = None
+    time_model: Optional[TimeModel] = None
+    travel_graph: Optional[TravelGraph] = None
+    upgrade_goals: list[UpgradeGoal] = field(default_factory=list)
+
+    def generate_events(self, state: State) -> Generator[Event, None, None]:
+        yield from self.segment.generate_events(state)
 
-    def run(self, *, state: Optional[State] = None) -> RouteData:
+    def finalize(self) -> Route:
+        """Prunes the route for running; see finalize_steps."""
+        self.segment.steps = finalize_steps(self.segment.steps)
+        self.segment.else_steps = finalize_steps(self.segment.else_steps)
+        return self
+
+    def fingerprint(self) -> str:
+        """
+        A digest of everything the route is built from, including the code
+        of its condition callbacks and step factories and what they close
+        over, which their reprs leave out.
+        """
+        description = [repr(self)] + [
+            _function_description(function)
+            for function in _functions(self, set())
+        ]
+        return hashlib.sha256(
+            _ADDRESS_PATTERN.sub("", "\n".join(description)).encode()
+        ).hexdigest()
+
+    def run(
+        self,
+        *,
+        state: Optional[State] = None,
+        listeners: Sequence[Callable[[Event], None]] = (),
+        snapshots: bool = False,
+    ) -> RouteData:
         if not state:
-            state = State()
+            state = State(
+                time_estimator=self.time_model,
+                travel_estimator=self.travel_graph,
+                snapshots=snapshots,
+            )
         route_data = RouteData()
-        for event in self.segment.generate_events(state):
+        for event in self.generate_events(state):
             route_data.events.append(event)
+            route_data.columns.append(event.metrics)
+            for listener in listeners:
+                listener(event)
         route_data.notes = state.notes
         return route_data
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tomllib
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from .action import (
+    Action,
+    Activate,
+    AutoBonfire,
+    AutoEquip,
+    AutoKill,
+    BonfireSit,
+    Buy,
+    DowngradeItem,
+    Equip,
+    FallDamage,
+    Heal,
+    Jump,
+    Kill,
+    Loot,
+    Perform,
+    Receive,
+    Region,
+    RunTo,
+    Step,
+    TalkTo,
+    UnEquip,
+    UpgradeItem,
+    Use,
+    UseMenu,
+    WaitFor,
+    WarpTo,
+)
+from .route import DamageTable, Enemy, Hit, HitType, Route, Segment
+from .sl1 import SL1_HIT_LOOKUP
+
+# Routes declared in TOML rather than built by a Python module:
+#
+#   [options]                  # defaults, read as {name} or in "if"
+#   early_weapon = "Club"
+#
+#   [[routes]]                 # one per variant, overriding the defaults
+#   name = "Any% with {early_weapon}"
+#   options = { kill_oswald = true }
+#
+#   [[steps]]
+#   Kill = "Asylum Demon"      # the action type, and its positional args
+#   souls = 2000               # and any of its keyword args
+#
+#   [[steps]]
+#   label = "Kill Oswald"      # a segment; "if" decides which steps are
+#   if = "kill_oswald and early_weapon != 'Dagger'"          # taken
+#   steps = [{ Kill = "{oswald}", souls = 2000 }]
+#   else = [{ TalkTo = "{oswald}" }]
+#
+# A file is compiled into the arguments of every action and segment of every
+# route, and that compiled form can be kept on disk by a digest of the file,
+# so loading an unchanged file only constructs the routes.
+SUFFIX = ".toml"
+# changing how files are compiled must change this, to invalidate caches
+FORMAT_VERSION = 1
+
+ACTIONS: dict[str, type[Action]] = {
+    kind.__name__: kind
+    for kind in (
+        Activate,
+        AutoBonfire,
+        AutoEquip,
+        AutoKill,
+        BonfireSit,
+        Buy,
+        DowngradeItem,
+        Equip,
+        FallDamage,
+        Heal,
+        Jump,
+        Kill,
+        Loot,
+        Perform,
+        Receive,
+        Region,
+        RunTo,
+        TalkTo,
+        UnEquip,
+        UpgradeItem,
+        Use,
+        UseMenu,
+        WaitFor,
+        WarpTo,
+    )
+}
+HIT_LOOKUPS: dict[str, dict[str, dict[Enemy, dict[HitType, Hit]]]] = {
+    "sl1": SL1_HIT_LOOKUP
+}
+SEGMENT_KEYS = frozenset(["label", "notes", "if", "steps", "else"])
+
+_REFERENCE_PATTERN = re.compile(r"\{\{|\}\}|\{([\w.]+)\}")
+# TOML string literals in conditions, taken out before they are split up
+_LITERAL_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\'[^\']*\'')
+_PLACEHOLDER_PATTERN = re.compile(r"\x00(\d+)\x00")
+
+
+def _option(options: Mapping[str, Any], name: str) -> Any:
+    value: Any = options
+    for part in name.split("."):
+        if not isinstance(value, Mapping) or part not in value:
+            raise RuntimeError(f"Unknown option: {name}")
+        value = value[part]
+    return value
+
+
+def _substituted(value: Any, options: Mapping[str, Any]) -> Any:
+    """
+    The value with {option} references replaced, keeping the option's type
+    if the reference is the whole string; {{ and }} stand for braces.
+    """
+    if isinstance(value, list):
+        return [_substituted(entry, options) for entry in value]
+    if isinstance(value, dict):
+        return {
+            key: _substituted(entry, options) for key, entry in value.items()
+        }
+    if not isinstance(value, str):
+        return value
+    whole = _REFERENCE_PATTERN.fullmatch(value)
+    if whole and whole.group(1):
+        return _option(options, whole.group(1))
+
+    def replace(match: re.Match[str]) -> str:
+        if match.group(1) is None:
+            return match.group(0)[0]
+        return str(_option(options, match.group(1)))
+
+    return _REFERENCE_PATTERN.sub(replace, value)
+
+
+def _term(term: str, options: Mapping[str, Any], literals: list[str]) -> bool:
+    term = term.strip()
+    if term.startswith("not "):
+        return not _term(term[4:], options, literals)
+    for operator in ("==", "!="):
+        if operator in term:
+            name, literal = term.split(operator, 1)
+            literal = _PLACEHOLDER_PATTERN.sub(
+                lambda match: literals[int(match.group(1))], literal.strip()
+            )
+            value = tomllib.loads(f"value = {literal}")["value"]
+            equal = bool(_option(options, name.strip()) == value)
+            return equal if operator == "==" else not equal
+    return bool(_option(options, term))
+
+
+def evaluate_condition(expression: Any, options: Mapping[str, Any]) -> bool:
+    """
+    Decides an "if": a boolean, or terms joined by "or" and then "and", each
+    an option, optionally compared to a TOML literal and preceded by "not".
+    Every term is evaluated, so any unknown option is reported.
+    """
+    if isinstance(expression, bool):
+        return expression
+    if not isinstance(expression, str):
+        raise RuntimeError(f"Not a condition: {expression!r}")
+    literals: list[str] = []
+
+    def hold(match: re.Match[str]) -> str:
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    held = _LITERAL_PATTERN.sub(hold, expression)
+    clauses = [
+        [_term(term, options, literals) for term in clause.split(" and ")]
+        for clause in held.split(" or ")
+    ]
+    return any(all(terms) for terms in clauses)
+
+
+def _condition(
+    expression: Any, options: Mapping[str, Any], where: str
+) -> bool:
+    try:
+        return evaluate_condition(expression, options)
+    except (RuntimeError, tomllib.TOMLDecodeError) as error:
+        raise RuntimeError(
+            f"Bad condition in {where}: {expression!r}: {error}"
+        ) from error
+
+
+def _compile_step(
+    step: Mapping[str, Any], options: Mapping[str, Any], where: str
+) -> Any:
+    kinds = [key for key in step if key in ACTIONS]
+    if len(kinds) > 1:
+        raise RuntimeError(f"More than one action in {where}: {kinds}")
+    if not kinds:
+        unknown = set(step) - SEGMENT_KEYS
+        if unknown or "steps" not in step:
+            raise RuntimeError(
+                f"Neither an action nor a segment in {where}: {dict(step)}"
+            )
+        return {
+            "label": _substituted(step.get("label", ""), options),
+            "notes": _substituted(step.get("notes", []), options),
+            "condition": _condition(step.get("if", True), options, where),
+            "steps": _compile_steps(step["steps"], options, f"{where}.steps"),
+            "else_steps": _compile_steps(
+                step.get("else", []), options, f"{where}.else"
+            ),
+        }
+    kind = kinds[0]
+    arguments = _substituted(step[kind], options)
+    keywords = {
+        key: _substituted(value, options)
+        for key, value in step.items()
+        if key not in (kind, "if")
+    }
+    if "if" in step:
+        keywords["condition"] = _condition(step["if"], options, where)
+    return [
+        kind,
+        arguments if isinstance(arguments, list) else [arguments],
+        keywords,
+    ]
+
+
+def _compile_steps(
+    steps: list[Mapping[str, Any]], options: Mapping[str, Any], where: str
+) -> list[Any]:
+    return [
+        _compile_step(step, options, f"{where}[{index}]")
+        for index, step in enumerate(steps)
+    ]
+
+
+def _merged(
+    defaults: Mapping[str, Any], overrides: Mapping[str, Any]
+) -> dict[str, Any]:
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
+            merged[key] = _merged(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def compile_route_file(
+    text: str, *, source: str = "<string>"
+) -> dict[str, Any]:
+    """
+    Parses a route file into the JSON form its routes are made from; errors
+    name the source and where in it they are.
+    """
+    document = tomllib.loads(text)
+    defaults = document.get("options", {})
+    compiled = []
+    for index, variant in enumerate(document.get("routes", [{}])):
+        options = _merged(defaults, variant.get("options", {}))
+        compiled.append(
+            {
+                "name": _substituted(
+                    variant.get("name", document.get("name", "")), options
+                ),
+                "enabled": _condition(
+                    variant.get("enabled", True),
+                    options,
+                    f"{source} routes[{index}].enabled",
+                ),
+                "notes": _substituted(
+                    document.get("notes", []) + variant.get("notes", []),
+                    options,
+                ),
+                "damage_tables": _substituted(
+                    document.get("damage_tables", [])
+                    + variant.get("damage_tables", []),
+                    options,
+                ),
+                "hit_lookup": document.get("hit_lookup"),
+                "steps": _compile_steps(
+                    document.get("steps", []), options, f"{source} steps"
+                ),
+            }
+        )
+    return {"routes": compiled}
+
+
+def _step(compiled: Any) -> Step:
+    if isinstance(compiled, list):
+        kind, arguments, keywords = compiled
+        return ACTIONS[kind](*arguments, **keywords)
+    return (
+        Segment(
+            notes=compiled["notes"],
+            label=compiled["label"],
+            condition=compiled["condition"],
+        )
+        .add_steps(*map(_step, compiled["steps"]))
+        .else_add_steps(*map(_step, compiled["else_steps"]))
+    )
+
+
+def routes_from_compiled(compiled: Mapping[str, Any]) -> list[Route]:
+    """Makes the routes of a compiled file, without any parsing."""
+    routes: list[Route] = []
+    for entry in compiled["routes"]:
+        routes.append(
+            Route(
+                entry["name"],
+                Segment(
+                    notes=entry["notes"], condition=entry["enabled"]
+                ).add_steps(*map(_step, entry["steps"])),
+                damage_tables=[
+                    DamageTable(
+                        weapon=table["weapon"],
+                        enemies=[Enemy[name] for name in table["enemies"]],
+                        hit_types=[
+                            HitType[name]
+                            for name in table.get(
+                                "hit_types", [kind.name for kind in HitType]
+                            )
+                        ],
+                    )
+                    for table in entry["damage_tables"]
+                ],
+                hit_lookup=(
+                    HIT_LOOKUPS[entry["hit_lookup"]]
+                    if entry["hit_lookup"]
+                    else None
+                ),
+            )
+        )
+    return routes
+
+
+def digest(content: bytes) -> str:
+    return hashlib.sha256(
+        FORMAT_VERSION.to_bytes(4, "little") + content
+    ).hexdigest()
+
+
+def load_route_file(
+    file: Path, *, cache_directory: Optional[Path] = None
+) -> list[Route]:
+    """
+    The routes a file declares.  With a cache directory, they are made from
+    the compiled form kept there if the file has been compiled before, and
+    any earlier compiled form of a file of the same name is replaced.  One
+    that can't be read back is compiled again.
+    """
+    content = file.read_bytes()
+    if cache_directory is None:
+        return routes_from_compiled(
+            compile_route_file(content.decode(), source=str(file))
+        )
+    cache_path = cache_directory / f"{file.stem}-{digest(content)[:32]}.json"
+    if cache_path.is_file():
+        try:
+            return routes_from_compiled(json.loads(cache_path.read_text()))
+        except (UnicodeDecodeError, json.JSONDecodeError, KeyError):
+            pass  # cut short or corrupted; written again below
+    compiled = compile_route_file(content.decode(), source=str(file))
+    cache_directory.mkdir(parents=True, exist_ok=True)
+    # only this file's, not those of files whose names start the same
+    compiled_name = re.compile(rf"{re.escape(file.stem)}-[0-9a-f]{{32}}\.json")
+    for stale in cache_directory.iterdir():
+        if compiled_name.fullmatch(stale.name):
+            stale.unlink(missing_ok=True)
+    temporary_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    temporary_path.write_text(json.dumps(compiled, separators=(",", ":")))
+    temporary_path.replace(cache_path)
+    return routes_from_compiled(compiled)
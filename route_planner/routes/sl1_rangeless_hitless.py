@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import functools
+import re
 from collections import Counter
+from copy import copy
 from dataclasses import dataclass, field
 from enum import StrEnum, unique
+from typing import Any, Callable, Optional, cast
 
 from ..action import (
     Activate,
@@ -31,8 +35,10 @@ from ..action import (
     WaitFor,
     WarpTo,
 )
-from ..route import DamageTable, Enemy, HitType, Route, Segment
+from ..memo import ConstructionCache, Reads, RecordingProxy
+from ..route import DamageTable, Enemy, HitType, Route, Segment, finalize_steps
 from ..sl1 import SL1_HIT_LOOKUP, sl1_ordered_by_melee_damage
+from ..upgrades import Shop, UpgradeGoal
 
 rtsr_ladder = "climbing ladder to RTSR"
 new_londo_elevator = "elevator to New Londo Ruins"
@@ -51,6 +57,10 @@ four_kings = "The Four Kings"
 priscilla = "Crossbreed Priscilla"
 slumbering = "Slumbering Dragoncrest Ring"
 
+ANDRE_SHOP = Shop(
+    region="Undead Parish", vendor=andre, prices={Item.TITANITE_SHARD: 800}
+)
+
 MELEE_HIT_TYPES = sl1_ordered_by_melee_damage(HitType.melee_types())
 BASE_MELEE_HIT_TYPES = sl1_ordered_by_melee_damage(HitType.base_melee_types())
 MELEE_HIT_TYPES_2H = sl1_ordered_by_melee_damage(
@@ -148,6 +158,18 @@ class Options:
             name += f" +{self.initial_upgrade}"
         return name
 
+    @property
+    def upgrade_goals(self) -> list[UpgradeGoal]:
+        if not self.initial_upgrade:
+            return []
+        return [
+            UpgradeGoal(
+                weapon=self.early_weapon,
+                shops=(ANDRE_SHOP,),
+                target=self.initial_upgrade,
+            )
+        ]
+
 
 @dataclass
 class SegmentOptions:
@@ -171,17 +193,52 @@ class SegmentOptions:
         return self.options.damage_tables + self.run_options.damage_tables
 
 
+# What each kind of segment built, for reuse by later variants whose options
+# agree on every field it read; see TunableSegment.__init_subclass__.  Only
+# the steps are reused, so the other fields are those the segment was given.
+_BUILT_SEGMENTS: ConstructionCache[dict[str, Any]] = ConstructionCache()
+_BUILT_FIELDS = ("steps", "else_steps")
+
+
 @dataclass(kw_only=True)
 class TunableSegment(Segment):
     segment_options: SegmentOptions
+    # the options read so far, while the segment is being built
+    _reads: Optional[Reads] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        build = cls.__dict__.get("__post_init__")
+        if build:
+            setattr(cls, "__post_init__", _memoized(build))
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if not self.label:  # "KillSif" -> "Kill Sif"
+            self.label = re.sub(
+                r"(?<=[a-z])(?=[A-Z])", " ", type(self).__name__
+            )
+
+    def _recorded(self, name: str, value: Any) -> Any:
+        if self._reads is None:
+            return value
+        return RecordingProxy(value, (name,), self._reads)
 
+    # Options must only be read through these two, so they are recorded.
     @property
     def options(self) -> Options:
-        return self.segment_options.options
+        return cast(
+            Options, self._recorded("options", self.segment_options.options)
+        )
 
     @property
     def run_options(self) -> RunOptions:
-        return self.segment_options.run_options
+        return cast(
+            RunOptions,
+            self._recorded("run_options", self.segment_options.run_options),
+        )
 
     @property
     def humanity(self) -> HumanityOptions:
@@ -224,6 +281,45 @@ class TunableSegment(Segment):
         )
 
 
+def _memoized(
+    build: Callable[[TunableSegment], None]
+) -> Callable[[TunableSegment], None]:
+    """
+    Wraps a segment's __post_init__ so the steps it builds are reused by any
+    later segment of the same kind whose options agree on what was read.
+    The steps are finalized while still recording, so the options that step
+    factories read are recorded too, and only for the branches taken.
+    """
+
+    @functools.wraps(build)
+    def post_init(self: TunableSegment) -> None:
+        roots = {
+            "options": self.segment_options.options,
+            "run_options": self.segment_options.run_options,
+        }
+        built = _BUILT_SEGMENTS.get(type(self).__name__, roots)
+        if built is not None:
+            TunableSegment.__post_init__(self)  # the label, if not given
+            for name, value in built.items():
+                setattr(self, name, copy(value))
+            return
+        reads: Reads = {}
+        self._reads = reads
+        try:
+            build(self)
+            self.steps = finalize_steps(self.steps)
+            self.else_steps = finalize_steps(self.else_steps)
+        finally:
+            self._reads = None
+        _BUILT_SEGMENTS.add(
+            type(self).__name__,
+            reads,
+            {name: copy(getattr(self, name)) for name in _BUILT_FIELDS},
+        )
+
+    return post_init
+
+
 @dataclass
 class StartToAfterGargoylesInFirelink(TunableSegment):
     def __post_init__(self) -> None:
@@ -270,86 +366,96 @@ class StartToAfterGargoylesInFirelink(TunableSegment):
                 condition=self.loots_firelink_at_start,
                 notes=["Firelink is looted upon arrival."],
             )
-            .add_steps(
-                Loot(
-                    Item.HUMANITY,
-                    count=3,
-                    humanities=1,
-                    detail="side of well, get during Firelink loot route.",
-                    condition=(
-                        self.options.loot_firelink_well_humanity
-                        and not self.uses_reinforced_club
+            .add_step_factory(
+                lambda: [
+                    Loot(
+                        Item.HUMANITY,
+                        count=3,
+                        humanities=1,
+                        detail="side of well, get during Firelink loot route.",
+                        condition=(
+                            self.options.loot_firelink_well_humanity
+                            and not self.uses_reinforced_club
+                        ),
+                        notes=[
+                            "3 humanities at Firelink well looted immediately."
+                        ],
                     ),
-                    notes=[
-                        "3 humanities at Firelink well looted immediately."
-                    ],
-                ),
-                Loot(
-                    "Soul of a Lost Undead",
-                    souls=200,
-                    detail="upper elevator",
-                    condition=self.options.loot_firelink_elevator_soul,
-                ),
-                Jump(
-                    "off ledge to hidden chests",
-                    condition=self.options.loot_firelink_homeward_bones,
-                ),
-                Loot(
-                    Item.BONE,
-                    count=6,
-                    detail="hidden chest",
-                    condition=self.options.loot_firelink_homeward_bones,
-                ),
-                Equip(
-                    Item.BONE,
-                    "Item 5",
-                    detail="immediately",
-                    condition=self.options.loot_firelink_homeward_bones,
-                ),
-                Loot(
-                    "Large Soul of a Lost Undead",
-                    souls=400,
-                    detail="middle of graveyard",
-                    condition=self.options.loot_firelink_graveyard_souls,
-                ),
-                Loot(
-                    "Large Soul of a Lost Undead",
-                    souls=400,
-                    detail="start of graveyard",
-                    condition=self.options.loot_firelink_graveyard_souls,
-                ),
-                Use(
-                    Item.BONE,
-                    condition=self.options.loot_firelink_graveyard_souls,
-                ),
+                    Loot(
+                        "Soul of a Lost Undead",
+                        souls=200,
+                        detail="upper elevator",
+                        condition=self.options.loot_firelink_elevator_soul,
+                    ),
+                    Jump(
+                        "off ledge to hidden chests",
+                        condition=self.options.loot_firelink_homeward_bones,
+                    ),
+                    Loot(
+                        Item.BONE,
+                        count=6,
+                        detail="hidden chest",
+                        condition=self.options.loot_firelink_homeward_bones,
+                    ),
+                    Equip(
+                        Item.BONE,
+                        "Item 5",
+                        detail="immediately",
+                        condition=self.options.loot_firelink_homeward_bones,
+                    ),
+                    Loot(
+                        "Large Soul of a Lost Undead",
+                        souls=400,
+                        detail="middle of graveyard",
+                        condition=self.options.loot_firelink_graveyard_souls,
+                    ),
+                    Loot(
+                        "Large Soul of a Lost Undead",
+                        souls=400,
+                        detail="start of graveyard",
+                        condition=self.options.loot_firelink_graveyard_souls,
+                    ),
+                    Use(
+                        Item.BONE,
+                        condition=self.options.loot_firelink_graveyard_souls,
+                    ),
+                ]
             )
-            .else_add_steps(
-                Segment(
-                    notes=[
-                        "Firelink <b>IS NOT</b> looted at start;"
-                        f" goes straight to {andre}."
-                    ]
-                )
-            ),
-            Segment(condition=self.uses_reinforced_club).add_steps(
-                Region("Firelink Shrine"),
-                Loot(
-                    Item.HUMANITY,
-                    count=3,
-                    humanities=1,
-                    detail=("side of well, get on way to get Reinforced Club"),
-                    condition=self.options.loot_firelink_well_humanity,
-                    notes=[
-                        (
-                            "3 humanities at Firelink well looted on way to"
-                            " get Reinforced Club."
-                        )
-                    ],
-                ),
-                RunTo("Undead Burg"),
-                Region("Undead Burg"),
-                Buy("Reinforced Club", souls=350, detail="Undead Merchant"),
-                Use(Item.BONE),
+            .else_add_step_factory(
+                lambda: [
+                    Segment(
+                        notes=[
+                            "Firelink <b>IS NOT</b> looted at start;"
+                            f" goes straight to {andre}."
+                        ]
+                    )
+                ]
+            ),
+            Segment(condition=self.uses_reinforced_club).add_step_factory(
+                lambda: [
+                    Region("Firelink Shrine"),
+                    Loot(
+                        Item.HUMANITY,
+                        count=3,
+                        humanities=1,
+                        detail=(
+                            "side of well, get on way to get Reinforced Club"
+                        ),
+                        condition=self.options.loot_firelink_well_humanity,
+                        notes=[
+                            (
+                                "3 humanities at Firelink well looted on way"
+                                " to get Reinforced Club."
+                            )
+                        ],
+                    ),
+                    RunTo("Undead Burg"),
+                    Region("Undead Burg"),
+                    Buy(
+                        "Reinforced Club", souls=350, detail="Undead Merchant"
+                    ),
+                    Use(Item.BONE),
+                ]
             ),
             Region("Firelink Shrine"),
             RunTo(new_londo_elevator),
@@ -419,48 +525,53 @@ class StartToAfterGargoylesInFirelink(TunableSegment):
             Loot("Grass Crest Shield"),
             Equip("Grass Crest Shield", "Left Hand", detail="immediately"),
             Segment(condition=self.options.kill_darkroot_basin_black_knight)
-            .add_steps(
-                Kill(
-                    "Black Knight",
-                    souls=1800,
-                    detail=(
-                        "by Grass Crest Shield."
-                        + (
-                            (
-                                '<br/><span class="warning">SKIPPING THIS'
-                                " MEANS ONLY HAVING A +3 WEAPON</span>"
+            .add_step_factory(
+                lambda: [
+                    Kill(
+                        "Black Knight",
+                        souls=1800,
+                        detail=(
+                            "by Grass Crest Shield."
+                            + (
+                                (
+                                    '<br/><span class="warning">SKIPPING THIS'
+                                    " MEANS ONLY HAVING A +3 WEAPON</span>"
+                                )
+                                if self.options.initial_upgrade == 4
+                                else ""
                             )
-                            if self.options.initial_upgrade == 4
-                            else ""
-                        )
-                    ),
-                    optional=self.options.initial_upgrade == 4,
-                    notes=(
-                        [
+                        ),
+                        optional=self.options.initial_upgrade == 4,
+                        notes=(
+                            [
+                                (
+                                    "Black Knight in Darkroot Basin"
+                                    " <b>PRECISELY</b> determines whether you"
+                                    " can afford upgrading your"
+                                    f" {self.options.early_weapon}"
+                                    " to +3 or +4."
+                                )
+                                if self.options.initial_upgrade == 4
+                                else (
+                                    "Black Knight in Darkroot Basin"
+                                    " <b>MUST</b> be killed."
+                                )
+                            ]
+                        ),
+                    )
+                ]
+            )
+            .else_add_step_factory(
+                lambda: [
+                    Segment(
+                        notes=[
                             (
                                 "Black Knight in Darkroot Basin"
-                                " <b>PRECISELY</b> determines whether you can"
-                                " afford upgrading your"
-                                f" {self.options.early_weapon} to +3 or +4."
-                            )
-                            if self.options.initial_upgrade == 4
-                            else (
-                                "Black Knight in Darkroot Basin"
-                                " <b>MUST</b> be killed."
+                                " <b>DOES NOT</b> need killed."
                             )
                         ]
-                    ),
-                )
-            )
-            .else_add_steps(
-                Segment(
-                    notes=[
-                        (
-                            "Black Knight in Darkroot Basin"
-                            " <b>DOES NOT</b> need killed."
-                        )
-                    ]
-                )
+                    )
+                ]
             ),
             RunTo(
                 "Undead Parish",
@@ -477,26 +588,32 @@ class StartToAfterGargoylesInFirelink(TunableSegment):
                 detail=andre,
                 condition=self.uses_battle_axe,
             ),
-            Segment(condition=self.options.initial_upgrade > 0).add_steps(
-                Buy(
-                    Item.TITANITE_SHARD,
-                    count=early_weapon_shards,
-                    souls=800,
-                    detail=andre,
-                ),
-                UpgradeItem(
-                    self.options.early_weapon,
-                    new_item=self.options.early_upgraded_weapon,
-                    souls=200 * self.options.initial_upgrade,
-                    items=Counter({Item.TITANITE_SHARD: early_weapon_shards}),
-                    detail=andre,
-                ),
-                Equip(
-                    self.options.early_upgraded_weapon,
-                    "Right Hand 1",
-                    detail=andre,
-                    condition=self.uses_battle_axe,
-                ),
+            Segment(
+                condition=self.options.initial_upgrade > 0
+            ).add_step_factory(
+                lambda: [
+                    Buy(
+                        Item.TITANITE_SHARD,
+                        count=early_weapon_shards,
+                        souls=800,
+                        detail=andre,
+                    ),
+                    UpgradeItem(
+                        self.options.early_weapon,
+                        new_item=self.options.early_upgraded_weapon,
+                        souls=200 * self.options.initial_upgrade,
+                        items=Counter(
+                            {Item.TITANITE_SHARD: early_weapon_shards}
+                        ),
+                        detail=andre,
+                    ),
+                    Equip(
+                        self.options.early_upgraded_weapon,
+                        "Right Hand 1",
+                        detail=andre,
+                        condition=self.uses_battle_axe,
+                    ),
+                ]
             ),
             Loot(
                 "Fire Keeper Soul",
@@ -619,21 +736,23 @@ class FirelinkToSensFortress(TunableSegment):
             UseMenu("Soul of Quelaag", detail=parish_elevator),
             Segment(
                 condition=self.needs_to_save_bone_at_occult_club
-            ).add_steps(
-                Equip(
-                    Item.DARKSIGN,
-                    "Item 4",
-                    detail=(
-                        f"{parish_elevator}, to save a bone later"
-                        " when getting Occult Club"
-                    ),
-                    notes=[
-                        (
-                            f"{Item.DARKSIGN} equipped early to save a bone"
-                            " at the Occult Club"
-                        )
-                    ],
-                )
+            ).add_step_factory(
+                lambda: [
+                    Equip(
+                        Item.DARKSIGN,
+                        "Item 4",
+                        detail=(
+                            f"{parish_elevator}, to save a bone later"
+                            " when getting Occult Club"
+                        ),
+                        notes=[
+                            (
+                                f"{Item.DARKSIGN} equipped early to save a"
+                                " bone at the Occult Club"
+                            )
+                        ],
+                    )
+                ]
             ),
             Region("Undead Parish"),
             BonfireSit(
@@ -647,24 +766,28 @@ class FirelinkToSensFortress(TunableSegment):
             RunTo("top of ramp", detail="must go IMMEDIATELY after boulder"),
             RunTo("fog gate at top of Sen's Fortress"),
             Segment(condition=self.equipment.slumbering_dragoncrest_ring)
-            .add_steps(
-                BonfireSit(
-                    "Sen's Fortress",
-                    detail=f"to bone back after getting {slumbering}",
-                ),
-                RunTo(
-                    "hole at dead end below bonfire and to the right",
-                    detail="fall down it",
-                ),
-                Loot(slumbering),
-                Use(Item.BONE),
+            .add_step_factory(
+                lambda: [
+                    BonfireSit(
+                        "Sen's Fortress",
+                        detail=f"to bone back after getting {slumbering}",
+                    ),
+                    RunTo(
+                        "hole at dead end below bonfire and to the right",
+                        detail="fall down it",
+                    ),
+                    Loot(slumbering),
+                    Use(Item.BONE),
+                ]
             )
-            .else_add_steps(
-                BonfireSit(
-                    "Sen's Fortress",
-                    detail="safety for Iron Golem",
-                    optional=True,
-                )
+            .else_add_step_factory(
+                lambda: [
+                    BonfireSit(
+                        "Sen's Fortress",
+                        detail="safety for Iron Golem",
+                        optional=True,
+                    )
+                ]
             ),
         )
 
@@ -690,15 +813,22 @@ class SensFortressToAnorLondoResidence(TunableSegment):
             Receive(Item.HUMANITY, humanities=1, detail="Iron Golem"),
             Region("Anor Londo"),
             Segment(condition=self.run_type.is_all_bosses)
-            .add_steps(
-                BonfireSit(
-                    "Anor Londo", detail="safety for rafters", optional=True
-                )
+            .add_step_factory(
+                lambda: [
+                    BonfireSit(
+                        "Anor Londo",
+                        detail="safety for rafters",
+                        optional=True,
+                    )
+                ]
             )
-            .else_add_steps(
-                BonfireSit(
-                    "Anor Londo", detail=f"so you can warp back for {seath}"
-                )
+            .else_add_step_factory(
+                lambda: [
+                    BonfireSit(
+                        "Anor Londo",
+                        detail=f"so you can warp back for {seath}",
+                    )
+                ]
             ),
             RunTo("elevator"),
             UseMenu("Core of an Iron Golem", detail="elevator"),
@@ -710,17 +840,20 @@ class SensFortressToAnorLondoResidence(TunableSegment):
                 detail="while pushing bridge lever",
                 condition=self.equipment.slumbering_dragoncrest_ring,
             ),
-            Segment(condition=self.run_type.is_all_bosses).add_steps(
-                Activate("Bridge lever (2nd time for Darkmoon Tomb)"),
-                RunTo("bottom of the stairs"),
-                BonfireSit(
-                    "Darkmoon Tomb",
-                    detail=(
-                        f"so you can warp back for {gwyndolin} and {priscilla}"
+            Segment(condition=self.run_type.is_all_bosses).add_step_factory(
+                lambda: [
+                    Activate("Bridge lever (2nd time for Darkmoon Tomb)"),
+                    RunTo("bottom of the stairs"),
+                    BonfireSit(
+                        "Darkmoon Tomb",
+                        detail=(
+                            f"so you can warp back for {gwyndolin}"
+                            f" and {priscilla}"
+                        ),
                     ),
-                ),
-                RunTo("top of the stairs"),
-                Activate("Bridge lever (3rd time to re-level)"),
+                    RunTo("top of the stairs"),
+                    Activate("Bridge lever (3rd time to re-level)"),
+                ]
             ),
             RunTo("sniper ledge"),
             Kill(
@@ -766,31 +899,36 @@ class AnorLondoResidenceToLordvessel(TunableSegment):
         super().__post_init__()
 
         self.add_steps(
-            Segment(condition=self.equipment.occult_club).add_steps(
-                RunTo(
-                    "door past Silver Knight, through fireplace",
-                    detail="through illusory wall",
-                ),
-                Kill("Mimic", souls=2000),
-                Loot("Occult Club", detail="Mimic"),
-                Segment(
-                    condition_callback=lambda state: (
-                        state.metrics().homeward_bones < 2
+            Segment(condition=self.equipment.occult_club).add_step_factory(
+                lambda: [
+                    RunTo(
+                        "door past Silver Knight, through fireplace",
+                        detail="through illusory wall",
                     ),
-                    notes=[
-                        (
-                            f"{Item.DARKSIGN} MUST be used to save a"
-                            f" {Item.BONE} after looting the Occult Club."
+                    Kill("Mimic", souls=2000),
+                    Loot("Occult Club", detail="Mimic"),
+                    Segment(
+                        condition_callback=lambda state: (
+                            state.metrics().homeward_bones < 2
+                        ),
+                        notes=[
+                            (
+                                f"{Item.DARKSIGN} MUST be used to save a"
+                                f" {Item.BONE} after looting the Occult Club."
+                            )
+                        ],
+                    )
+                    .add_steps(
+                        Use(
+                            Item.DARKSIGN,
+                            detail=(
+                                f"CAREFUL: use {Item.DARKSIGN}"
+                                " to save a bone"
+                            ),
                         )
-                    ],
-                )
-                .add_steps(
-                    Use(
-                        Item.DARKSIGN,
-                        detail=f"CAREFUL: use {Item.DARKSIGN} to save a bone",
                     )
-                )
-                .else_add_steps(Use(Item.BONE)),
+                    .else_add_steps(Use(Item.BONE)),
+                ]
             ),
             RunTo("Spiral Stairs and jump out for shortcut"),
             FallDamage(
@@ -831,12 +969,14 @@ class AnorLondoResidenceToLordvessel(TunableSegment):
             #    condition=self.humanity.kill_smough_first,
             # ),
             Activate("Door to Gwynevere"),
-            Segment(condition=self.equipment.occult_club).add_steps(
-                Equip(
-                    "Occult Club",
-                    "Right Hand 2",
-                    detail="(2nd slot) while door is opening",
-                )
+            Segment(condition=self.equipment.occult_club).add_step_factory(
+                lambda: [
+                    Equip(
+                        "Occult Club",
+                        "Right Hand 2",
+                        detail="(2nd slot) while door is opening",
+                    )
+                ]
             ),
             TalkTo("Gwynevere"),
             Receive("Lordvessel", detail="Gwynevere"),
@@ -857,15 +997,21 @@ class KillNito(TunableSegment):
                 condition=self.humanity.wait_for_nito_drops,
                 notes=[f"wait for 1 slow {Item.HUMANITY} from {nito}."],
             )
-            .add_steps(
-                Receive(
-                    Item.HUMANITY,
-                    humanities=1,
-                    detail=f"{nito} (slow to receive it)",
-                )
+            .add_step_factory(
+                lambda: [
+                    Receive(
+                        Item.HUMANITY,
+                        humanities=1,
+                        detail=f"{nito} (slow to receive it)",
+                    )
+                ]
             )
-            .else_add_steps(
-                Segment(notes=[f"1 slow {Item.HUMANITY} skipped from {nito}."])
+            .else_add_step_factory(
+                lambda: [
+                    Segment(
+                        notes=[f"1 slow {Item.HUMANITY} skipped from {nito}."]
+                    )
+                ]
             ),
             UseMenu(Item.DARKSIGN),
         )
@@ -878,13 +1024,15 @@ class KillSif(TunableSegment):
         self.add_steps(
             WarpTo("Undead Parish"),
             Buy("Crest of Artorias", souls=20000, detail=andre),
-            Segment(condition=self.equipment.occult_club).add_steps(
-                DowngradeItem(
-                    "Occult Club",
-                    souls=200,
-                    new_item="Divine Club +5",
-                    detail=andre,
-                )
+            Segment(condition=self.equipment.occult_club).add_step_factory(
+                lambda: [
+                    DowngradeItem(
+                        "Occult Club",
+                        souls=200,
+                        new_item="Divine Club +5",
+                        detail=andre,
+                    )
+                ]
             ),
             RunTo("Darkroot Garden door"),
             Region("Darkroot Garden"),
@@ -911,13 +1059,15 @@ class KillSif(TunableSegment):
             Segment(
                 condition=self.humanity.wait_for_sif_drops,
                 notes=[f"wait for 1 slow {Item.HUMANITY} from {sif}."],
-            ).add_steps(
-                Receive(
-                    Item.HUMANITY,
-                    humanities=1,
-                    detail=f"{sif} (slow to receive it)",
-                ),
-                Receive(Item.BONE, detail=f"{sif} (slow to receive it)"),
+            ).add_step_factory(
+                lambda: [
+                    Receive(
+                        Item.HUMANITY,
+                        humanities=1,
+                        detail=f"{sif} (slow to receive it)",
+                    ),
+                    Receive(Item.BONE, detail=f"{sif} (slow to receive it)"),
+                ]
             ),
             Use(Item.DARKSIGN),
         )
@@ -974,12 +1124,14 @@ class ToDoSegment(TunableSegment):
             Segment(
                 condition=self.humanity.wait_for_seath_drops,
                 notes=[f"wait for 1 slow humanity from {seath}."],
-            ).add_steps(
-                Receive(
-                    Item.HUMANITY,
-                    humanities=1,
-                    detail=f"{seath} (slow to receive it)",
-                )
+            ).add_step_factory(
+                lambda: [
+                    Receive(
+                        Item.HUMANITY,
+                        humanities=1,
+                        detail=f"{seath} (slow to receive it)",
+                    )
+                ]
             ),
             Kill(
                 "Patches",
@@ -1053,6 +1205,7 @@ class SL1RangelessHitless(Route):
             ),
             damage_tables=segment_options.damage_tables,
             hit_lookup=SL1_HIT_LOOKUP,
+            upgrade_goals=segment_options.options.upgrade_goals,
         )
 
         self.segment.add_steps(
@@ -1275,7 +1428,9 @@ def exported_routes() -> list[Route]:
 
 # TODO:
 # - determine when to loot Lautrec, or how to replace him (quitoutless)
-# - add ability to estimate time for a segment
+# - time the routes with a TimeModel once the timings below are measured
+# - give the routes a TravelGraph of measured running times between the
+#   places their RunTo steps go
 # - fix RTSR setup for gargoyles
 
 # Data to get:
@@ -0,0 +1,71 @@
+// Searches every route from the index in search.json (see search.py) as the
+// query is typed.  Each word of the query must be the start of a word in a
+// step; the index is only fetched once the search box is first used.
+(function () {
+    var MAX_RESULTS = 50;
+    var input = document.querySelector("input.search");
+    var results = document.querySelector("ul.search-results");
+    var index = null;
+    var words = [];
+
+    function tokenize(text) {
+        return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+    }
+
+    function matches(query) {
+        // the "route,step" pairs whose step has a word starting with query
+        var found = new Set();
+        words.forEach(function (word) {
+            if (word.startsWith(query)) {
+                var postings = index.postings[word];
+                for (var i = 0; i < postings.length; i += 2) {
+                    found.add(postings[i] + "," + postings[i + 1]);
+                }
+            }
+        });
+        return found;
+    }
+
+    function show() {
+        results.replaceChildren();
+        var queries = tokenize(input.value);
+        if (!index || !queries.length) {
+            return;
+        }
+        var found = queries.map(matches).reduce(function (all, some) {
+            return new Set(Array.from(all).filter(function (pair) {
+                return some.has(pair);
+            }));
+        });
+        Array.from(found).map(function (pair) {
+            return pair.split(",").map(Number);
+        }).sort(function (a, b) {
+            return a[0] - b[0] || a[1] - b[1];
+        }).slice(0, MAX_RESULTS).forEach(function (pair) {
+            var route = index.routes[pair[0]];
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = route[1];
+            link.textContent = route[0];
+            item.append(link, pair[1]
+                ? " step " + pair[1] + ": "
+                    + (index.steps[pair[0]][pair[1] - 1] || "")
+                : " notes");
+            results.append(item);
+        });
+    }
+
+    input.addEventListener("input", function () {
+        if (index) {
+            show();
+            return;
+        }
+        fetch("search.json").then(function (response) {
+            return response.json();
+        }).then(function (loaded) {
+            index = loaded;
+            words = Object.keys(index.postings);
+            show();
+        });
+    });
+}());
@@ -0,0 +1,33 @@
+// Sorts a table.sortable by a column when its header is clicked; clicking
+// again reverses the order.  Cells sort by their data-value if they have one,
+// numerically when both values are numbers and as text otherwise.
+document.querySelectorAll("table.sortable").forEach(function (table) {
+    table.querySelectorAll("thead th").forEach(function (header, column) {
+        header.addEventListener("click", function () {
+            var descending = header.dataset.order === "ascending";
+            table.querySelectorAll("thead th").forEach(function (other) {
+                delete other.dataset.order;
+            });
+            header.dataset.order = descending ? "descending" : "ascending";
+            var key = function (row) {
+                var cell = row.cells[column];
+                return cell.dataset.value !== undefined
+                    ? cell.dataset.value
+                    : cell.textContent.trim();
+            };
+            var body = table.tBodies[0];
+            var rows = Array.from(body.rows);
+            rows.sort(function (a, b) {
+                var x = key(a);
+                var y = key(b);
+                var order = isNaN(x) || isNaN(y) || x === "" || y === ""
+                    ? x.localeCompare(y)
+                    : x - y;
+                return descending ? -order : order;
+            });
+            rows.forEach(function (row) {
+                body.appendChild(row);
+            });
+        });
+    });
+});
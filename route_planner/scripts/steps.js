@@ -0,0 +1,162 @@
+// Fills in each table.route.virtual from the JSON in the script after it (see
+// report.steps_data), keeping only the rows near the screen in the document.
+// Rows are grouped into tbody chunks per region, like the static table, and
+// chunks away from the screen are swapped for a spacer of the same height.
+(function () {
+    var CHUNK_ROWS = 32;  // even, so row striping carries across chunks
+    var ESTIMATED_ROW_HEIGHT = 48;
+    var OPTIONAL = 1;
+    var ERROR = 2;
+    var REGION = 4;
+
+    function roundHalfEven(value) {  // as python's round does
+        var rounded = Math.round(value);
+        if (Math.abs(value % 1) === 0.5 && rounded % 2) {
+            rounded -= 1;
+        }
+        return rounded;
+    }
+
+    function pad(value) {
+        return (value < 10 ? "0" : "") + value;
+    }
+
+    function duration(seconds) {
+        var total = roundHalfEven(seconds);
+        var minutes = Math.floor(total / 60);
+        var hours = Math.floor(minutes / 60);
+        if (hours) {
+            return hours + ":" + pad(minutes % 60) + ":" + pad(total % 60);
+        }
+        return minutes + ":" + pad(total % 60);
+    }
+
+    function valueCell(title, oldValue, newValue) {
+        var name = title.toLowerCase();
+        var html = '<td class="' + name.replace(/ /g, "_") + '" title="'
+            + newValue + " " + name + '">';
+        if (newValue !== oldValue) {
+            var change = newValue - oldValue;
+            html += '<span class="' + (change < 0 ? "subtract" : "add")
+                + '">' + (change < 0 ? "" : "+") + change + "</span><br/>"
+                + newValue;
+        }
+        return html + "</td>";
+    }
+
+    function timeCell(oldSeconds, newSeconds) {
+        var html = '<td class="time" title="' + duration(newSeconds)
+            + ' elapsed">';
+        if (newSeconds !== oldSeconds) {
+            html += '<span class="add">+' + duration(newSeconds - oldSeconds)
+                + "</span><br/>" + duration(newSeconds);
+        }
+        return html + "</td>";
+    }
+
+    function buildGroups(data, titles) {
+        // returns the html of each row, grouped by region
+        var strings = data.strings;
+        var slackColumn = titles.indexOf("Slack") >= 0;
+        // all but the slack and the action
+        var valueCount = titles.length - (slackColumn ? 2 : 1);
+        var textEnd = valueCount + 5;  // after the name, display, detail, hint
+        var rowEnd = textEnd + (slackColumn ? 1 : 0);
+        var values = new Array(valueCount).fill(0);
+        var groups = [[]];
+        var regionCount = 0;
+        data.rows.forEach(function (row) {
+            if (row[0] & REGION) {
+                regionCount += 1;
+                groups.push(
+                    ['<tr><td colspan="' + titles.length + '" class="region">'
+                        + pad(regionCount) + ". " + strings[row[1]]
+                        + "</td></tr>"],
+                    []
+                );
+                return;
+            }
+            var oldValues = row.length > rowEnd ? row[rowEnd] : values;
+            values = values.map(function (value, index) {
+                return value + row[index + 1];
+            });
+            var rowClass = row[0] & ERROR
+                ? "error"
+                : (row[0] & OPTIONAL ? "optional" : "");
+            var html = rowClass ? '<tr class="' + rowClass + '">' : "<tr>";
+            titles.slice(0, valueCount).forEach(function (title, index) {
+                html += title === "Time"
+                    ? timeCell(oldValues[index], values[index])
+                    : valueCell(title, oldValues[index], values[index]);
+            });
+            var text = row.slice(valueCount + 1, textEnd).map(
+                function (index) { return strings[index]; }
+            );
+            if (slackColumn) {
+                var slack = row[textEnd];
+                html += slack
+                    ? '<td class="slack" title="' + strings[slack[1]] + '">'
+                        + slack[0] + "</td>"
+                    : '<td class="slack"></td>';
+            }
+            html += '<td class="action"><span class="name">' + text[0]
+                + '</span> <span class="display">' + text[1]
+                + '</span><br/><span class="detail">' + text[2] + "</span>"
+                + (text[3] ? '<br/><span class="hint">' + text[3] + "</span>"
+                    : "")
+                + "</td></tr>";
+            groups[groups.length - 1].push(html);
+        });
+        return groups.filter(function (group) { return group.length; });
+    }
+
+    document.querySelectorAll("table.route.virtual").forEach(function (table) {
+        var data = JSON.parse(table.nextElementSibling.textContent);
+        var titles = Array.from(table.querySelectorAll("thead th")).map(
+            function (header) { return header.title; }
+        );
+        var chunks = [];
+
+        function spacer(height) {
+            return '<tr class="spacer"><td colspan="' + titles.length
+                + '" style="height: ' + height + 'px"></td></tr>';
+        }
+
+        buildGroups(data, titles).forEach(function (group) {
+            for (var start = 0; start < group.length; start += CHUNK_ROWS) {
+                var body = table.createTBody();
+                var rows = group.slice(start, start + CHUNK_ROWS);
+                if (start + CHUNK_ROWS < group.length) {
+                    body.className = "continued";
+                }
+                body.dataset.chunk = chunks.length;
+                chunks.push({
+                    body: body,
+                    rows: rows,
+                    height: rows.length * ESTIMATED_ROW_HEIGHT,
+                    shown: false
+                });
+            }
+        });
+        chunks.forEach(function (chunk) {
+            chunk.body.innerHTML = spacer(chunk.height);
+        });
+
+        var observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                var chunk = chunks[entry.target.dataset.chunk];
+                if (entry.isIntersecting && !chunk.shown) {
+                    chunk.body.innerHTML = chunk.rows.join("");
+                    chunk.shown = true;
+                } else if (!entry.isIntersecting && chunk.shown) {
+                    chunk.height = chunk.body.offsetHeight;
+                    chunk.body.innerHTML = spacer(chunk.height);
+                    chunk.shown = false;
+                }
+            });
+        }, {rootMargin: "100% 0px"});
+        chunks.forEach(function (chunk) {
+            observer.observe(chunk.body);
+        });
+    });
+}());
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import IO, Iterable, Sequence
+
+from .action import Event
+from .symbols import NOTHING, symbol_name
+
+_TAG = re.compile(r"<[^>]*>")
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def text(html: str) -> str:
+    return " ".join(_TAG.sub(" ", html).split())
+
+
+def tokenize(html: str) -> list[str]:
+    """the distinct lowercase words of the text, ignoring any tags."""
+    return list(dict.fromkeys(_TOKEN.findall(text(html).lower())))
+
+
+class RouteIndexer:
+    """
+    A listener for Route.run adding a route's steps to a search index as they
+    stream by.  Steps are numbered from 1 as rows of the steps table are, and
+    step 0 stands for the route's notes.
+    """
+
+    def __init__(self, index: SearchIndex, route_number: int) -> None:
+        self._index = index
+        self._route_number = route_number
+        self._steps = index.steps[route_number]
+        self._region = NOTHING
+
+    def _add(self, words: Iterable[str], step: int) -> None:
+        postings = self._index.postings
+        for token in words:
+            entries = postings.setdefault(token, [])
+            if entries[-2:] != [self._route_number, step]:
+                entries.extend([self._route_number, step])
+
+    def __call__(self, event: Event) -> None:
+        action = event.action
+        if event.output:
+            self._steps.append(text(f"{action.name} {event.display}"))
+            step = len(self._steps)
+            for field in (event.target, event.display, action.detail):
+                self._add(tokenize(field), step)
+        if event.metrics.region != self._region:
+            self._region = event.metrics.region
+            # found at the first step in the region
+            self._add(
+                tokenize(symbol_name(self._region)), len(self._steps) + 1
+            )
+
+    def finish(self, notes: Sequence[str]) -> None:
+        for note in notes:
+            self._add(tokenize(note), 0)
+
+
+class SearchIndex:
+    """
+    An inverted index from each word to the (route, step) pairs it appears
+    in, stored flattened, along with the text of every step to show in
+    results.
+    """
+
+    def __init__(self) -> None:
+        self.routes: list[tuple[str, str]] = []  # name and page filename
+        self.steps: list[list[str]] = []
+        self.postings: dict[str, list[int]] = {}
+
+    def route_indexer(self, name: str, filename: str) -> RouteIndexer:
+        self.routes.append((name, filename))
+        self.steps.append([])
+        return RouteIndexer(self, len(self.routes) - 1)
+
+    @classmethod
+    def merged(cls, indexes: Iterable[SearchIndex]) -> SearchIndex:
+        """one index of the routes of every index, in order."""
+        merged = cls()
+        for index in indexes:
+            offset = len(merged.routes)
+            merged.routes.extend(index.routes)
+            merged.steps.extend(index.steps)
+            for token, entries in index.postings.items():
+                renumbered = entries.copy()
+                renumbered[::2] = [route + offset for route in entries[::2]]
+                merged.postings.setdefault(token, []).extend(renumbered)
+        return merged
+
+    def write(self, stream: IO[str]) -> None:
+        json.dump(
+            {
+                "routes": self.routes,
+                "steps": self.steps,
+                "postings": dict(sorted(self.postings.items())),
+            },
+            stream,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
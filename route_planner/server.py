@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from . import report
+from .route import Route
+
+CHUNK_SIZE = 1 << 16
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_html(cls, html: str) -> RenderedPage:
+        body = html.encode()
+        return cls(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class PageCache:
+    """
+    A thread-safe LRU cache of rendered pages.  Concurrent requests for a page
+    that isn't cached yet wait on a single render rather than each rendering
+    it themselves.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._pages: OrderedDict[str, RenderedPage] = OrderedDict()
+        self._lock = threading.Lock()
+        self._render_locks: dict[str, threading.Lock] = {}
+
+    def get(self, key: str, render: Callable[[], str]) -> RenderedPage:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        with render_lock:
+            try:
+                with self._lock:  # may have been rendered while waiting
+                    page = self._pages.get(key)
+                if page is None:
+                    page = RenderedPage.from_html(render())
+                with self._lock:
+                    self._pages[key] = page
+                    self._pages.move_to_end(key)
+                    while len(self._pages) > self._capacity:
+                        self._pages.popitem(last=False)
+            finally:  # also when rendering raises, so it isn't left behind
+                with self._lock:
+                    if self._render_locks.get(key) is render_lock:
+                        del self._render_locks[key]
+        return page
+
+
+class RoutePageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        routes: dict[str, Route],
+        *,
+        cache_size: int = 64,
+    ) -> None:
+        """routes maps the filename of each page to the route it shows."""
+        super().__init__(address, RoutePageRequestHandler)
+        self.routes = routes
+        self.fingerprints = {
+            filename: route.fingerprint() for filename, route in routes.items()
+        }
+        self.page_cache = PageCache(cache_size)
+        self.index = RenderedPage.from_html(
+            "<h1>Route Index</h1><ul>"
+            + "".join(
+                f'<li><a href="{filename}">{route.name}</a></li>\n'
+                for filename, route in routes.items()
+            )
+            + "</ul>"
+        )
+
+    def page(self, path: str) -> Optional[RenderedPage]:
+        filename = path.split("?", 1)[0].lstrip("/")
+        if filename in ("", "index.html"):
+            return self.index
+        route = self.routes.get(filename)
+        if route is None:
+            return None
+        return self.page_cache.get(
+            self.fingerprints[filename],
+            lambda: report.page(report.route(route), title=route.name),
+        )
+
+
+class RoutePageRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server: RoutePageServer
+
+    def _send_page(self, *, include_body: bool) -> None:
+        page = self.server.page(self.path)
+        if page is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        if_none_match = self.headers.get("If-None-Match", "")
+        if page.etag in (tag.strip() for tag in if_none_match.split(",")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", page.etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page.body)))
+        self.send_header("ETag", page.etag)
+        self.send_header("Cache-Control", "no-cache")  # always revalidate
+        self.end_headers()
+        if include_body:
+            with memoryview(page.body) as body:
+                for offset in range(0, len(body), CHUNK_SIZE):
+                    self.wfile.write(body[offset : offset + CHUNK_SIZE])
+
+    def do_GET(self) -> None:
+        self._send_page(include_body=True)
+
+    def do_HEAD(self) -> None:
+        self._send_page(include_body=False)
+
+
+def serve(
+    routes: dict[str, Route],
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    cache_size: int = 64,
+) -> None:
+    with RoutePageServer(
+        (host, port), routes, cache_size=cache_size
+    ) as server:
+        print(f"Serving route pages on http://{host}:{server.server_port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
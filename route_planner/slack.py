@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from math import inf
+from typing import Optional, Sequence
+
+from .action import Buy, DowngradeItem, Event, UpgradeItem, Use, UseMenu
+
+# the balances a purchase can be short of
+SLACK_FIELDS = ("souls", "item_souls", "humanity")
+# by name, so that actions read back from a route data cache count too
+SPENDING_ACTIONS = frozenset(
+    kind.__name__ for kind in (Buy, UpgradeItem, DowngradeItem, UseMenu, Use)
+)
+
+
+class MinTree:
+    """
+    The minimum of any range of values, with an amount added to any range,
+    each in O(log n).  A segment tree where an amount added to a whole node
+    stays at that node, counted in its minimum and in every query through
+    it, so nothing is ever pushed down to its children.
+    """
+
+    def __init__(self, values: Sequence[int]) -> None:
+        self._size = len(values)
+        self._minimum = [0] * (4 * max(self._size, 1))
+        self._added = [0] * (4 * max(self._size, 1))
+        if values:
+            self._build(1, 0, self._size, values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build(
+        self, node: int, start: int, stop: int, values: Sequence[int]
+    ) -> None:
+        if stop - start == 1:
+            self._minimum[node] = values[start]
+            return
+        middle = (start + stop) // 2
+        self._build(2 * node, start, middle, values)
+        self._build(2 * node + 1, middle, stop, values)
+        self._minimum[node] = min(
+            self._minimum[2 * node], self._minimum[2 * node + 1]
+        )
+
+    def add(self, start: int, stop: int, amount: int) -> None:
+        """adds the amount to every value in [start, stop)"""
+        if start < stop:
+            self._add(1, 0, self._size, start, stop, amount)
+
+    def _add(
+        self,
+        node: int,
+        node_start: int,
+        node_stop: int,
+        start: int,
+        stop: int,
+        amount: int,
+    ) -> None:
+        if stop <= node_start or node_stop <= start:
+            return
+        if start <= node_start and node_stop <= stop:
+            self._added[node] += amount
+            self._minimum[node] += amount
+            return
+        middle = (node_start + node_stop) // 2
+        self._add(2 * node, node_start, middle, start, stop, amount)
+        self._add(2 * node + 1, middle, node_stop, start, stop, amount)
+        self._minimum[node] = (
+            min(self._minimum[2 * node], self._minimum[2 * node + 1])
+            + self._added[node]
+        )
+
+    def minimum(self, start: int, stop: int) -> float:
+        """the least value in [start, stop), or inf if it is empty"""
+        return self._minimum_of(1, 0, self._size, start, stop)
+
+    def _minimum_of(
+        self, node: int, node_start: int, node_stop: int, start: int, stop: int
+    ) -> float:
+        if stop <= node_start or node_stop <= start:
+            return inf
+        if start <= node_start and node_stop <= stop:
+            return self._minimum[node]
+        middle = (node_start + node_stop) // 2
+        return (
+            min(
+                self._minimum_of(2 * node, node_start, middle, start, stop),
+                self._minimum_of(2 * node + 1, middle, node_stop, start, stop),
+            )
+            + self._added[node]
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
+class Slack:
+    """How much of each could be lost at a step without breaking the route."""
+
+    souls: int
+    item_souls: int
+    humanity: int
+
+
+class SlackIndex:
+    """
+    The least of each balance from every event until the route next resets
+    it on purpose (as using the Darksign does to souls and humanity), or to
+    its end, kept in a MinTree per balance so it can be asked about any
+    event, and edits made to the route reflected, without going over the
+    events again.  What is lost before a reset is lost with it anyway.
+    """
+
+    def __init__(self, events: Sequence[Event]) -> None:
+        self._trees = {
+            name: MinTree([getattr(event.metrics, name) for event in events])
+            for name in SLACK_FIELDS
+        }
+        # the events resetting each balance, in order
+        self._resets: dict[str, list[int]] = {
+            name: [] for name in SLACK_FIELDS
+        }
+        for position, event in enumerate(events):
+            for name in event.action.resets(event):
+                if name in self._resets:
+                    self._resets[name].append(position)
+
+    def _window_end(self, name: str, index: int) -> int:
+        """the next event after the event resetting the balance, if any"""
+        resets = self._resets[name]
+        next_reset = bisect_right(resets, index)
+        if next_reset < len(resets):
+            return resets[next_reset]
+        return len(self._trees[name])
+
+    def slack(self, index: int) -> Slack:
+        """what could be lost by the event without anything going short"""
+        return Slack(
+            **{
+                name: int(tree.minimum(index, self._window_end(name, index)))
+                for name, tree in self._trees.items()
+            }
+        )
+
+    def spend(
+        self,
+        index: int,
+        *,
+        souls: int = 0,
+        item_souls: int = 0,
+        humanity: int = 0,
+    ) -> None:
+        """notes that much more is spent at the event, as if it were edited"""
+        for name, amount in [
+            ("souls", souls),
+            ("item_souls", item_souls),
+            ("humanity", humanity),
+        ]:
+            if amount:
+                self._trees[name].add(
+                    index, self._window_end(name, index), -amount
+                )
+
+
+def route_slack(events: Sequence[Event]) -> list[Optional[Slack]]:
+    """the slack at every purchase or use of an item, and None elsewhere"""
+    index = SlackIndex(events)
+    return [
+        (
+            index.slack(position)
+            if event.action.name.removeprefix("Optional") in SPENDING_ACTIONS
+            else None
+        )
+        for position, event in enumerate(events)
+    ]
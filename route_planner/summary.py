@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from .action import Error, Event, Metrics
+from .symbols import Symbol
+
+
+@dataclass
+class RegionTotals:
+    steps: int = 0
+    optional_steps: int = 0
+    error_count: int = 0
+    souls: int = 0  # net souls gained, after any spent
+
+    def add(self, event: Event, last_souls: int) -> None:
+        self.souls += event.metrics.souls - last_souls
+        if isinstance(event.action, Error):
+            self.error_count += 1
+        elif event.output:
+            self.steps += 1
+            if event.action.optional:
+                self.optional_steps += 1
+
+
+@dataclass
+class RouteSummary:
+    name: str
+    filename: str
+    ran: bool = False
+    souls: int = 0
+    humanity: int = 0
+    homeward_bones: int = 0
+    error_count: int = 0
+    steps: int = 0
+    optional_steps: int = 0
+    regions: dict[Symbol, RegionTotals] = field(default_factory=dict)
+
+
+class RouteSummarizer:
+    """
+    A listener for Route.run that totals up a route as its events stream by,
+    so the dashboard never needs the events kept around or re-simulated.
+    """
+
+    def __init__(self, name: str, filename: str) -> None:
+        self.summary = RouteSummary(name, filename)
+        self._last_souls = 0
+
+    def __call__(self, event: Event) -> None:
+        summary = self.summary
+        metrics = event.metrics
+        action = event.action
+        summary.ran = True
+        region = summary.regions.get(metrics.region)
+        if region is None:
+            region = summary.regions[metrics.region] = RegionTotals()
+        region.add(event, self._last_souls)
+        self._last_souls = metrics.souls
+        if event.output and not isinstance(action, Error):
+            summary.steps += 1
+            if action.optional:
+                summary.optional_steps += 1
+        summary.souls = metrics.souls
+        summary.humanity = metrics.humanity
+        summary.homeward_bones = metrics.homeward_bones
+        summary.error_count = metrics.error_count
+
+
+@dataclass
+class RegionPage:
+    """One visit to a region, as shown on its own page."""
+
+    number: int
+    region: Symbol
+    filename: str
+    start: Metrics  # as of just before the first step
+    end: Metrics
+    totals: RegionTotals = field(default_factory=RegionTotals)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import NewType
+
+# A small integer standing in for an item, bonfire or region name.  IDs are
+# only meaningful within the process that interned them.
+Symbol = NewType("Symbol", int)
+
+
+class SymbolTable:
+    def __init__(self) -> None:
+        self._symbols: dict[str, Symbol] = {}
+        self._names: list[str] = []
+        self.intern("")  # so the default of 0 means "nothing"
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> Symbol:
+        symbol = self._symbols.get(name)
+        if symbol is None:
+            symbol = self._symbols[name] = Symbol(len(self._names))
+            self._names.append(name)
+        return symbol
+
+    def name(self, symbol: Symbol) -> str:
+        return self._names[symbol]
+
+
+SYMBOLS = SymbolTable()
+NOTHING = SYMBOLS.intern("")
+symbol = SYMBOLS.intern
+symbol_name = SYMBOLS.name
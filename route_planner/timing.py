@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from .action import Action, Event
+from .symbols import symbol_name
+
+
+@dataclass(kw_only=True)
+class TimeModel:
+    """
+    Estimates how many seconds an action takes.  The event's 'seconds', the
+    action's own or worked out as it ran, wins, then an entry for its type
+    and target, then one for just its type.  Types are looked up along the
+    class hierarchy, so an entry for Kill also covers AutoKill unless AutoKill
+    has its own.
+    """
+
+    by_type: dict[type[Action], float] = field(default_factory=dict)
+    by_target: dict[tuple[type[Action], str], float] = field(
+        default_factory=dict
+    )
+
+    def estimate(self, event: Event) -> float:
+        if event.seconds is not None:
+            return event.seconds
+        action_types = [
+            action_type
+            for action_type in type(event.action).__mro__
+            if issubclass(action_type, Action)
+        ]
+        for action_type in action_types:
+            seconds = self.by_target.get((action_type, event.target))
+            if seconds is not None:
+                return seconds
+        for action_type in action_types:
+            seconds = self.by_type.get(action_type)
+            if seconds is not None:
+                return seconds
+        return 0.0
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    start: int  # index of the first event
+    end: int  # index one past the last event
+
+
+def _spans(names: list[str]) -> list[Span]:
+    """Splits a run of names into spans of consecutive equal names."""
+    spans: list[Span] = []
+    start = 0
+    for index in range(1, len(names) + 1):
+        if index == len(names) or names[index] != names[start]:
+            spans.append(Span(names[start], start, index))
+            start = index
+    return spans
+
+
+class Timeline:
+    """
+    Cumulative estimated time over a route's events, built in linear time
+    so that any step range, region or segment can then be timed in O(1).
+    """
+
+    def __init__(self, events: Sequence[Event]) -> None:
+        # _elapsed[i] is the time before event i, and _elapsed[-1] the total
+        self._elapsed: list[float] = [0.0]
+        self._elapsed.extend(event.metrics.seconds for event in events)
+        self.region_spans = _spans(
+            [symbol_name(event.metrics.region) for event in events]
+        )
+        self.segment_spans = _spans(
+            [event.metrics.segment for event in events]
+        )
+        self._region_totals = self._totals(self.region_spans)
+        self._segment_totals = self._totals(self.segment_spans)
+
+    def _totals(self, spans: list[Span]) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for span in spans:
+            totals[span.name] = totals.get(span.name, 0.0) + self.span(span)
+        return totals
+
+    @property
+    def total(self) -> float:
+        return self._elapsed[-1]
+
+    def elapsed(self, index: int) -> float:
+        """Time elapsed once the event at index is complete."""
+        return self._elapsed[index + 1]
+
+    def steps(self, start: int, end: int) -> float:
+        """Time taken by the events in [start, end)."""
+        return self._elapsed[end] - self._elapsed[start]
+
+    def span(self, span: Span) -> float:
+        return self.steps(span.start, span.end)
+
+    def region(self, name: str) -> float:
+        """Total time spent in a region, across every visit to it."""
+        return self._region_totals.get(name, 0.0)
+
+    def segment(self, name: str) -> float:
+        return self._segment_totals.get(name, 0.0)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from math import inf
+from pathlib import Path
+from typing import Container, Optional, Sequence
+
+from .symbols import Symbol, symbol
+
+
+@dataclass(frozen=True)
+class Leg:
+    source: str
+    target: str
+    seconds: float
+    one_way: bool = field(default=False, kw_only=True)
+
+
+class TravelGraph:
+    """
+    Travel times between bonfires, regions and named RunTo targets.  Shortest
+    paths between every pair of places are computed once (Floyd-Warshall) and
+    cached on disk by a digest of the legs, after which any travel time or
+    nearest-bonfire question is a table lookup.
+    """
+
+    def __init__(
+        self,
+        legs: Sequence[Leg],
+        *,
+        bonfires: Sequence[str],
+        warp_seconds: float,
+        cache_directory: Optional[Path] = None,
+    ) -> None:
+        self.legs = list(legs)
+        self.bonfires = list(bonfires)
+        self.warp_seconds = warp_seconds
+        self.cache_directory = cache_directory
+        places = dict.fromkeys(
+            [*self.bonfires]
+            + [
+                place
+                for leg in self.legs
+                for place in (leg.source, leg.target)
+            ]
+        )
+        self._places = list(places)
+        self._index = {
+            symbol(place): index for index, place in enumerate(places)
+        }
+        self._costs: Optional[list[list[float]]] = None
+        self._nearest_bonfires: dict[Symbol, list[tuple[float, Symbol]]] = {}
+
+    @property
+    def places(self) -> list[str]:
+        return list(self._places)
+
+    def digest(self) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                [self.bonfires, [asdict(leg) for leg in self.legs]],
+                separators=(",", ":"),
+            ).encode()
+        ).hexdigest()
+
+    def _compute_costs(self) -> list[list[float]]:
+        size = len(self._index)
+        costs = [[inf] * size for _ in range(size)]
+        for index in range(size):
+            costs[index][index] = 0.0
+        for leg in self.legs:
+            source = self._index[symbol(leg.source)]
+            target = self._index[symbol(leg.target)]
+            costs[source][target] = min(costs[source][target], leg.seconds)
+            if not leg.one_way:
+                costs[target][source] = min(costs[target][source], leg.seconds)
+        for middle in range(size):
+            middle_row = costs[middle]
+            for row in costs:
+                to_middle = row[middle]
+                if to_middle == inf:
+                    continue
+                for target in range(size):
+                    through_middle = to_middle + middle_row[target]
+                    if through_middle < row[target]:
+                        row[target] = through_middle
+        return costs
+
+    def _cache_path(self) -> Optional[Path]:
+        if self.cache_directory is None:
+            return None
+        return self.cache_directory / f"travel-{self.digest()[:32]}.json"
+
+    def _load_costs(self) -> list[list[float]]:
+        cache_path = self._cache_path()
+        if cache_path is not None and cache_path.is_file():
+            stored = json.loads(cache_path.read_text())
+            if stored["places"] == self.places:
+                return [
+                    [inf if cost is None else cost for cost in row]
+                    for row in stored["costs"]
+                ]
+        costs = self._compute_costs()
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            temporary_path.write_text(
+                json.dumps(
+                    {
+                        "places": self.places,
+                        "costs": [
+                            [None if cost == inf else cost for cost in row]
+                            for row in costs
+                        ],
+                    }
+                )
+            )
+            temporary_path.replace(cache_path)
+        return costs
+
+    def cost(self, source: Symbol, target: Symbol) -> float:
+        """Seconds to travel from source to target; inf if unknown."""
+        source_index = self._index.get(source)
+        target_index = self._index.get(target)
+        if source_index is None or target_index is None:
+            return inf
+        if self._costs is None:
+            self._costs = self._load_costs()
+        return self._costs[source_index][target_index]
+
+    def cheapest_warp(
+        self, target: Symbol, bonfires: Container[Symbol]
+    ) -> Optional[tuple[Symbol, float]]:
+        """
+        The bonfire among the given ones that is quickest to warp to and then
+        travel to the target from, with the total seconds that takes.
+        """
+        nearest = self._nearest_bonfires.get(target)
+        if nearest is None:
+            nearest = self._nearest_bonfires[target] = [
+                (seconds, bonfire)
+                for seconds, _, bonfire in sorted(
+                    (self.cost(symbol(name), target), name, symbol(name))
+                    for name in self.bonfires
+                )
+            ]
+        for seconds, bonfire in nearest:
+            if seconds == inf:
+                break
+            if bonfire in bonfires:
+                return bonfire, self.warp_seconds + seconds
+        return None
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Optional, Sequence
+
+from .action import Action, Buy, Event, Item, Loot, UpgradeItem
+from .symbols import symbol_name
+
+
+@dataclass(frozen=True, kw_only=True)
+class UpgradeLevel:
+    """What it costs to take a weapon up one level."""
+
+    souls: int
+    items: Mapping[str, int] = field(default_factory=dict)
+
+
+# from +0 to +5, as Andre does it
+REGULAR_UPGRADES = tuple(
+    UpgradeLevel(souls=200, items={Item.TITANITE_SHARD: shards})
+    for shards in (1, 1, 2, 2, 3)
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Shop:
+    """Someone in a region who sells items, and may also upgrade."""
+
+    region: str
+    vendor: str
+    prices: Mapping[str, int] = field(default_factory=dict)
+    upgrades: bool = True
+
+
+@dataclass(frozen=True, kw_only=True)
+class Placement:
+    after_event: int  # the index of the event the step goes after
+    step: Action
+
+
+@dataclass(frozen=True, kw_only=True)
+class UpgradePlan:
+    placements: tuple[Placement, ...]
+    spent: int
+    # by level gained, the first event after which it could be had, if any
+    earliest: tuple[Optional[int], ...]
+
+    def suggestions(self, events: Sequence[Event]) -> list[str]:
+        return [
+            f"after {events[entry.after_event].display}"
+            f" (#{entry.after_event}): {entry.step.name} {entry.step.display}"
+            for entry in self.placements
+        ]
+
+
+@dataclass(frozen=True, kw_only=True)
+class UpgradeGoal:
+    """
+    A route's upgrades of a weapon, to suggest where they could be done.
+    The route's own purchases of the items they take, and its upgrades of
+    the weapon, are planned again as if the souls were never spent on them.
+    """
+
+    weapon: str
+    shops: tuple[Shop, ...]
+    levels: tuple[UpgradeLevel, ...] = REGULAR_UPGRADES
+    start: int = 0
+    target: Optional[int] = None
+
+    def _replanned(self, action: Action) -> bool:
+        if isinstance(action, UpgradeItem):
+            return action.target == _level_name(self.weapon, self.start)
+        return any(action.target in level.items for level in self.levels)
+
+    def plan(self, events: Sequence[Event]) -> Optional[UpgradePlan]:
+        held = _level_name(self.weapon, self.start)
+        held_from = next(
+            (
+                index
+                for index, event in enumerate(events)
+                if isinstance(event.action, (Buy, Loot))
+                and event.target == held
+                and event.count
+            ),
+            0,
+        )
+        return UpgradePlanner(self.shops, levels=self.levels).plan(
+            soul_income(events, excluding=self._replanned),
+            event_regions(events),
+            weapon=self.weapon,
+            start=self.start,
+            target=self.target,
+            held_from=held_from,
+        )
+
+    def suggestions(self, events: Sequence[Event]) -> list[str]:
+        """the plan for the route's events as lines of text"""
+        target = len(self.levels) if self.target is None else self.target
+        heading = (
+            f"{_level_name(self.weapon, self.start)}"
+            f" to {_level_name(self.weapon, target)}"
+        )
+        plan = self.plan(events)
+        if plan is None:
+            return [f"{heading}: never affordable"]
+        return [f"{heading}, for {plan.spent} souls:"] + [
+            f"  {suggestion}" for suggestion in plan.suggestions(events)
+        ]
+
+
+def soul_income(
+    events: Sequence[Event], *, excluding: Callable[[Action], bool]
+) -> list[int]:
+    """
+    The souls held after each event, as if the excluded actions were never
+    taken, so the souls they were spent on are free to be planned again.
+    """
+    balances: list[int] = []
+    refunded = 0
+    for event in events:
+        action = event.action
+        if isinstance(action, (Buy, UpgradeItem)) and excluding(action):
+            refunded -= event.souls * event.count
+        balances.append(event.metrics.souls + refunded)
+    return balances
+
+
+# the steps taken so far, newest first, as a linked list shared by the
+# plans they lead to: (after_event, level, bought rather than upgraded, rest)
+_History = Optional[tuple[int, int, bool, "_History"]]
+
+
+class UpgradePlanner:
+    """
+    Places the purchases and upgrades taking a weapon from one level to
+    another into a route's event stream, as cheaply as it can be done.
+
+    A DP runs over the events, keeping for every (levels bought, levels
+    upgraded) the least that can have been spent on getting there, as long
+    as the souls held never go negative.  Spending less always leaves at
+    least as many options later, so the cheapest way into a state is the
+    only one worth keeping.
+    """
+
+    def __init__(
+        self,
+        shops: Sequence[Shop],
+        *,
+        levels: Sequence[UpgradeLevel] = REGULAR_UPGRADES,
+    ) -> None:
+        self.shops = {shop.region: shop for shop in shops}
+        self.levels = list(levels)
+
+    def _price(self, level: UpgradeLevel, shop: Optional[Shop]) -> int:
+        """what the items for a level cost, or -1 if they aren't sold"""
+        if not level.items:
+            return 0
+        if shop is None or not set(level.items) <= set(shop.prices):
+            return -1
+        return sum(
+            shop.prices[item] * count for item, count in level.items.items()
+        )
+
+    def _step(
+        self,
+        state: tuple[int, int],
+        states: dict[tuple[int, int], tuple[int, _History]],
+        levels: Sequence[UpgradeLevel],
+        shop: Optional[Shop],
+        upgrading: Optional[Shop],
+        index: int,
+        balance: int,
+    ) -> None:
+        """adds what can be done from a state after an event to the states"""
+        spent, history = states[state]
+        bought, upgraded = state
+        moves: list[tuple[tuple[int, int], int, bool]] = []
+        if bought < len(levels):
+            price = self._price(levels[bought], shop)
+            if price >= 0:
+                moves.append(((bought + 1, upgraded), price, True))
+        if upgraded < bought and upgrading and upgrading.upgrades:
+            moves.append(
+                ((bought, upgraded + 1), levels[upgraded].souls, False)
+            )
+        for next_state, cost, buying in moves:
+            if spent + cost > balance:
+                continue
+            known = states.get(next_state)
+            if known is None or spent + cost < known[0]:
+                level = next_state[0] if buying else next_state[1]
+                states[next_state] = (
+                    spent + cost,
+                    (index, level - 1, buying, history),
+                )
+
+    def plan(
+        self,
+        balances: Sequence[int],
+        regions: Sequence[str],
+        *,
+        weapon: str,
+        start: int = 0,
+        target: Optional[int] = None,
+        held_from: int = 0,
+    ) -> Optional[UpgradePlan]:
+        """
+        The cheapest plan taking the weapon from the start level to the
+        target, given the souls held and the region after every event, and
+        the first event after which the weapon is held; the earliest of the
+        plans that are cheapest, or None if none is affordable.
+        """
+        levels = self.levels[start:target]
+        goal = (len(levels), len(levels))
+        earliest: list[Optional[int]] = [None] * len(levels)
+        states: dict[tuple[int, int], tuple[int, _History]] = {
+            (0, 0): (0, None)
+        }
+        for index, (balance, region) in enumerate(zip(balances, regions)):
+            states = {
+                state: value
+                for state, value in states.items()
+                if value[0] <= balance
+            }
+            shop = self.shops.get(region)
+            upgrading = shop if shop and index >= held_from else None
+            # a step only ever adds one to one of the two, so going by their
+            # total, a state is done with before anything is done from it
+            for total in range(sum(goal)):
+                layer = [state for state in states if sum(state) == total]
+                for state in layer:
+                    self._step(
+                        state, states, levels, shop, upgrading, index, balance
+                    )
+            for _, upgraded in states:
+                for level in range(upgraded):
+                    if earliest[level] is None:
+                        earliest[level] = index
+        if goal not in states:
+            return None
+        spent, history = states[goal]
+        steps: list[tuple[int, int, bool]] = []
+        while history is not None:
+            after_event, level, buying, history = history
+            steps.append((after_event, level, buying))
+        return UpgradePlan(
+            placements=tuple(
+                self._placements(
+                    steps[::-1], levels, regions, weapon=weapon, start=start
+                )
+            ),
+            spent=spent,
+            earliest=tuple(earliest),
+        )
+
+    def _placements(
+        self,
+        steps: Sequence[tuple[int, int, bool]],
+        levels: Sequence[UpgradeLevel],
+        regions: Sequence[str],
+        *,
+        weapon: str,
+        start: int,
+    ) -> list[Placement]:
+        """steps as actions, with those of a kind at one event combined"""
+        runs: list[tuple[int, bool, list[int]]] = []
+        for after_event, level, buying in steps:
+            if runs and runs[-1][:2] == (after_event, buying):
+                runs[-1][2].append(level)
+            else:
+                runs.append((after_event, buying, [level]))
+        placements: list[Placement] = []
+        for after_event, buying, run in runs:
+            items: Counter[str] = Counter()
+            for level in run:
+                items.update(levels[level].items)
+            shop = self.shops.get(regions[after_event])
+            vendor = shop.vendor if shop else ""
+            if buying:
+                placements.extend(
+                    Placement(
+                        after_event=after_event,
+                        step=Buy(
+                            item,
+                            count=count,
+                            souls=shop.prices[item] if shop else 0,
+                            detail=vendor,
+                        ),
+                    )
+                    for item, count in items.items()
+                )
+                continue
+            placements.append(
+                Placement(
+                    after_event=after_event,
+                    step=UpgradeItem(
+                        _level_name(weapon, start + run[0]),
+                        new_item=_level_name(weapon, start + run[-1] + 1),
+                        souls=sum(levels[level].souls for level in run),
+                        items=items,
+                        detail=vendor,
+                    ),
+                )
+            )
+        return placements
+
+
+def _level_name(weapon: str, level: int) -> str:
+    return f"{weapon} +{level}" if level else weapon
+
+
+def event_regions(events: Sequence[Event]) -> list[str]:
+    return [symbol_name(event.metrics.region) for event in events]
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import ast
+import importlib
+import sys
+import time
+import traceback
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+from . import application, routefile
+from .route import Route
+
+# modules that can't be reloaded while watching, since they are running it
+UNRELOADABLE_MODULES = frozenset(
+    ["__init__", "__main__", "application", "watch"]
+)
+
+
+def _package_imports(file: Path, *, level: int) -> set[str]:
+    """
+    The names of the package's modules a file imports, where level is how
+    many dots a relative import from the file needs to reach the package.
+    """
+    names: set[str] = set()
+    for node in ast.walk(ast.parse(file.read_text(), str(file))):
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        module = node.module or ""
+        if node.level == 0 and module.startswith(f"{__package__}."):
+            module = module.removeprefix(f"{__package__}.")
+        elif node.level != level:
+            continue
+        if module:
+            names.add(module.split(".")[0])
+        else:
+            names.update(alias.name for alias in node.names)
+    return names
+
+
+def module_files() -> list[Path]:
+    """the package's modules that can be reloaded"""
+    return [
+        file
+        for file in application.CURRENT_FILE_DIRECTORY.glob("*.py")
+        if file.stem not in UNRELOADABLE_MODULES
+    ]
+
+
+def module_imports() -> dict[str, set[str]]:
+    """each reloadable module of the package, with those of them it imports"""
+    files = {file.stem: file for file in module_files()}
+    return {
+        name: _package_imports(file, level=1) & files.keys()
+        for name, file in files.items()
+    }
+
+
+def data_modules(imports: dict[str, set[str]]) -> set[str]:
+    """
+    The modules routes are built from, which are every module the route
+    modules import, and the route file loader, along with what they import;
+    changing one means simulating everything again.
+    """
+    pending = {routefile.__name__.rsplit(".", 1)[1]}
+    for file in application.route_module_files():
+        if file.suffix == ".py":
+            pending |= _package_imports(file, level=2) & imports.keys()
+    found: set[str] = set()
+    while pending:
+        name = pending.pop()
+        if name not in found:
+            found.add(name)
+            pending |= imports[name]
+    return found
+
+
+def dependents(names: set[str], imports: dict[str, set[str]]) -> list[str]:
+    """
+    The modules and every module importing them, directly or not, in an
+    order where each comes after the modules it imports, to reload them in.
+    """
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, imported in imports.items():
+            if name not in affected and imported & affected:
+                affected.add(name)
+                changed = True
+    return [
+        name
+        for name in TopologicalSorter(imports).static_order()
+        if name in affected
+    ]
+
+
+class RouteWatcher:
+    """
+    Keeps the pages in an output directory up to date as the sources change,
+    writing each route as a build does, and doing as little work as each
+    change allows:
+    - a route module: re-executes only that module and re-simulates and
+      re-renders only the routes it exports.
+    - styles, scripts or a module routes aren't built from (report.py and
+      such): reloads the module and those importing it, and re-renders every
+      page from the route data kept in memory, without re-simulating.
+    - a module routes are built from: reloads it and those importing it,
+      and builds everything again.
+    Which modules are which is worked out from their imports.
+    """
+
+    def __init__(
+        self,
+        output_directory: Path,
+        *,
+        virtualize: bool = False,
+        paginate: bool = False,
+    ) -> None:
+        self.output_directory = output_directory
+        self.virtualize = virtualize
+        self.paginate = paginate
+        self._route_file_cache_directory = (
+            output_directory / application.ROUTE_FILE_CACHE_SUBDIRECTORY
+        )
+        self._module_routes: dict[Path, list[Route]] = {}
+        self._outputs: dict[str, application.RouteOutput] = {}
+        self._modification_times: dict[Path, int] = {}
+
+    @staticmethod
+    def _package_file(name: str) -> Path:
+        return application.CURRENT_FILE_DIRECTORY / name
+
+    def _watched_files(self) -> list[Path]:
+        return [
+            *application.route_module_files(),
+            *self._package_file("styles").glob("*.css"),
+            *self._package_file("scripts").glob("*.js"),
+            *module_files(),
+        ]
+
+    def _routes(self) -> list[Route]:
+        return sorted(
+            (
+                route
+                for routes in self._module_routes.values()
+                for route in routes
+            ),
+            key=lambda route: route.name,
+        )
+
+    def _changed_files(self) -> set[Path]:
+        modification_times: dict[Path, int] = {}
+        for file in self._watched_files():
+            try:
+                modification_times[file] = file.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass  # removed between listing and stat
+        changed = {
+            file
+            for file in modification_times.keys()
+            | self._modification_times.keys()
+            if modification_times.get(file)
+            != self._modification_times.get(file)
+        }
+        self._modification_times = modification_times
+        return changed
+
+    def _write_route(self, route: Route, *, render_only: bool) -> None:
+        previous = self._outputs.get(route.name)
+        self._outputs[route.name] = application.write_route(
+            self.output_directory,
+            route,
+            route_data=previous.route_data if previous else None,
+            render_only=render_only,
+            virtualize=self.virtualize,
+            paginate=self.paginate,
+        )
+
+    def _remove_module_routes(self, file: Path) -> None:
+        for route in self._module_routes.pop(file, []):
+            paths = self._outputs.pop(route.name).paths
+            # not among the paths if the route was last only re-rendered
+            paths.append(
+                application.route_cache_path(self.output_directory, route)
+            )
+            for path in paths:
+                path.unlink(missing_ok=True)
+
+    def _load_module(self, file: Path) -> None:
+        self._remove_module_routes(file)
+        if not file.exists():
+            return
+        routes = application.load_route_module(
+            file, cache_directory=self._route_file_cache_directory
+        )
+        application.check_route_names([*self._routes(), *routes])
+        self._module_routes[file] = routes
+        for route in routes:
+            self._write_route(route, render_only=False)
+
+    def _write_site_pages(self) -> None:
+        routes = self._routes()
+        application.write_site_pages(
+            self.output_directory,
+            routes,
+            [self._outputs[route.name] for route in routes],
+        )
+
+    def _render_all(self) -> None:
+        for route in self._routes():
+            self._write_route(route, render_only=True)
+
+    def rebuild(self) -> None:
+        self._module_routes.clear()
+        self._outputs.clear()
+        application.clean_output_directory(
+            self.output_directory, keep=[self._route_file_cache_directory]
+        )
+        (self.output_directory / application.CACHE_SUBDIRECTORY).mkdir()
+        self._changed_files()  # record the current state
+        for file in application.route_module_files():
+            self._load_module(file)
+        self._write_site_pages()
+
+    def update(self) -> set[Path]:
+        """Applies any changes since the last call, returning the files."""
+        changed = self._changed_files()
+        if not changed:
+            return changed
+        imports = module_imports()
+        changed_modules = {
+            file.stem
+            for file in changed
+            if file.parent == application.CURRENT_FILE_DIRECTORY
+        }
+        reloaded = dependents(changed_modules & imports.keys(), imports)
+        for name in reloaded:
+            if f"{__package__}.{name}" in sys.modules:
+                importlib.reload(sys.modules[f"{__package__}.{name}"])
+        if set(reloaded) & data_modules(imports):
+            self.rebuild()
+            return changed
+        route_files = [
+            file
+            for file in changed
+            if file.parent.name == application.ROUTES_SUBDIRECTORY.name
+        ]
+        if len(route_files) != len(changed):  # styles, scripts or modules
+            self._render_all()
+        for file in route_files:
+            self._load_module(file)
+        self._write_site_pages()
+        return changed
+
+    def run(self, *, interval: float = 0.2) -> None:
+        self.rebuild()
+        print(f"Watching for changes; pages are in {self.output_directory}")
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            try:
+                changed = self.update()
+            except Exception:
+                traceback.print_exc()  # keep watching; the next save may fix
+                continue
+            if changed:
+                names = ", ".join(sorted(file.name for file in changed))
+                elapsed = time.perf_counter() - start
+                print(f"Updated for {names} in {elapsed * 1000:.0f}ms")
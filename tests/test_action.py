@@ -0,0 +1,167 @@
+from collections import Counter
+
+import pytest
+
+from route_planner.action import (
+    BonfireSit,
+    Buy,
+    Item,
+    Kill,
+    Loot,
+    OverdraftCounter,
+    Receive,
+    Region,
+    SnapshotCounter,
+    State,
+    UseMenu,
+)
+from route_planner.route import Route, Segment
+from route_planner.symbols import symbol, symbol_name
+
+
+def test_overdrafts_are_reported_once_per_change() -> None:
+    state = State(inventory=Counter({symbol("Ember"): -1}))
+    assert state.errors() == ["insufficent amount: Ember(-1)"]
+    assert state.errors() == ()
+    state.inventory[symbol("Ember")] += 1
+    state.souls = -5
+    assert state.errors() == ["insufficent amount: souls(-5)"]
+    state.humanity = 3  # unrelated changes don't repeat the error
+    state.inventory[symbol("Moss")] += 2
+    assert state.errors() == ()
+    state.souls -= 5
+    assert state.errors() == ["insufficent amount: souls(-10)"]
+    state.souls = 0
+    assert state.errors() == ()
+    assert state.error_count == 3
+
+
+def test_replacing_the_inventory_forgets_its_overdrafts() -> None:
+    state = State()
+    state.inventory[symbol("Ember")] -= 1
+    assert state.errors() == ["insufficent amount: Ember(-1)"]
+    state.inventory = Counter({symbol("Moss"): 1})
+    assert state.errors() == ()
+    assert not state.last_overdrafts
+    state.inventory[symbol("Ember")] -= 1
+    assert state.errors() == ["insufficent amount: Ember(-1)"]
+
+
+@pytest.mark.parametrize("kind", [OverdraftCounter, SnapshotCounter])
+def test_overdrafts_follow_every_way_of_changing_counts(
+    kind: type[OverdraftCounter],
+) -> None:
+    ember, moss = symbol("Ember"), symbol("Moss")
+
+    def overdrafts(counter: OverdraftCounter) -> dict[str, int]:
+        assert counter.overdrafts == {
+            key: value for key, value in counter.items() if value < 0
+        }
+        return {
+            symbol_name(key): value
+            for key, value in counter.overdrafts.items()
+        }
+
+    counter = kind()
+    counter.update({ember: -2})  # dict.update when empty
+    assert overdrafts(counter) == {"Ember": -2} and counter.overdrafts_changed
+    counter.subtract({ember: -2, moss: 1})
+    assert overdrafts(counter) == {"Moss": -1}
+    counter.pop(moss)
+    assert overdrafts(counter) == {}
+    assert counter.setdefault(symbol("Bone")) == 0
+    counter.setdefault(moss, -3)
+    counter.subtract([ember, ember, ember])
+    assert overdrafts(counter) == {"Ember": -3, "Moss": -3}
+    counter.popitem()
+    assert len(overdrafts(counter)) == 1
+    counter.clear()
+    assert overdrafts(counter) == {}
+    assert kind({ember: -1}).overdrafts == {ember: -1}
+
+
+def test_route_overdraft_errors_match_a_full_scan() -> None:
+    route = Route(
+        "Overdrafts",
+        Segment().add_steps(
+            Kill("Hollow", souls=100),
+            Buy("Ember", souls=300),
+            Loot("Soul", souls=50),
+            UseMenu("Soul", count=2),
+            Kill("Hollow", souls=300),
+        ),
+    )
+    state = State()
+    scanned: list[set[str]] = []
+    for event in route.generate_events(state):
+        if type(event.action).__name__ == "Error":
+            scanned.append(
+                {
+                    f"{key}({value})"
+                    for key, value in [
+                        *[
+                            (symbol_name(item), count)
+                            for item, count in state.inventory.items()
+                        ],
+                        ("souls", state.souls),
+                        ("item_souls", state.item_souls),
+                    ]
+                    if value < 0
+                }
+            )
+            prefix = "insufficent amount: "
+            assert event.action.target.startswith(prefix)
+            overdrafts = event.action.target.removeprefix(prefix).split(" ")
+            assert set(overdrafts) == scanned[-1]
+    assert scanned == [
+        {"souls(-200)"},
+        {"souls(-100)", "item_souls(-50)", "Soul(-1)"},
+        {"item_souls(-50)", "Soul(-1)"},
+    ]
+    state = State()
+    state.inventory = Counter(
+        {symbol("Soul"): -1}
+    )  # still tracked when replaced
+    assert state.errors() == ["insufficent amount: Soul(-1)"]
+
+
+def test_state_is_keyed_by_interned_symbols() -> None:
+    route = Route(
+        "Symbols",
+        Segment().add_steps(
+            Region("Asylum"),
+            BonfireSit("Cell"),
+            Receive(Item.BONE, count=2),
+            UseMenu(Item.BONE),
+        ),
+    )
+    state = State()
+    events = list(route.generate_events(state))
+    assert state.count(Item.BONE) == 1
+    assert state.region == symbol("Asylum")
+    assert symbol_name(state.bonfire) == "Cell"
+    assert symbol_name(events[-1].metrics.region) == "Asylum"
+    assert symbol("Asylum") == symbol("Asylum")
+
+
+def test_actions_are_worked_out_per_run_without_changing() -> None:
+    buy = Buy(Item.BONE, souls=500, count=3)
+    loot = Loot("Soul", souls=200)
+    route = Route(
+        "Resolved",
+        Segment().add_steps(
+            Kill("Hollow", souls=2000),
+            Receive(Item.BONE),
+            buy,
+            loot,
+            Loot("Soul"),  # souls come from the lookup
+        ),
+    )
+    for _ in range(2):
+        _, _, bought, looted, looked_up = route.run().events
+        assert bought.action is buy and bought.count == 2
+        assert bought.display == f"{Item.BONE} (x2)"
+        assert buy.count == 3 and buy.display == f"{Item.BONE} (x3)"
+        assert looted.action is loot and looted.souls == 200
+        assert looked_up.souls == 200 and looked_up.action == Loot("Soul")
+    assert Kill("Hollow", souls=20).notes is loot.notes
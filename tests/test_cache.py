@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from route_planner import application, report
+from route_planner.action import (
+    Kill,
+    Loot,
+    Receive,
+    Region,
+    UpgradeItem,
+    UseMenu,
+)
+from route_planner.cache import read_route_cache, write_route_cache
+from route_planner.route import DamageTable, Enemy, HitType, Route, Segment
+from route_planner.sl1 import SL1_HIT_LOOKUP
+
+
+def _route() -> Route:
+    return Route(
+        "Test Route",
+        Segment(notes=["a note"]).add_steps(
+            Region("Firelink Shrine"),
+            Kill("Hollow", souls=20, count=2, detail="by the well"),
+            Loot("Soul of a Lost Undead", souls=200, optional=True),
+            UseMenu("Soul of a Lost Undead", count=2),  # errors
+            Receive("Club"),
+            UpgradeItem("Club", "Club +1", souls=20),
+        ),
+        damage_tables=[
+            DamageTable(
+                weapon="Hand Axe +0",
+                enemies=[Enemy.BLACK_KNIGHT_DARKROOT_BASIN],
+                hit_types=[HitType.WEAK_1H, HitType.RIPOSTE_2H],
+            )
+        ],
+        hit_lookup=SL1_HIT_LOOKUP,
+    )
+
+
+def test_cached_route_renders_identically(tmp_path: Path) -> None:
+    route = _route()
+    route_data = route.run()
+    path = tmp_path / "route.rpd"
+    write_route_cache(path, route, route_data)
+    cached_route, cached_route_data = read_route_cache(path)
+    assert cached_route_data is not None
+    assert cached_route_data.notes == route_data.notes
+    assert [event.metrics for event in cached_route_data.events] == [
+        event.metrics for event in route_data.events
+    ]
+    assert report.route(
+        cached_route, route_data=cached_route_data
+    ) == report.route(route, route_data=route_data)
+
+
+def test_render_only_does_not_load_routes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(application, "load_routes", lambda **_: [_route()])
+    application.build(tmp_path)
+    page = (tmp_path / "TestRoute.html").read_text()
+
+    def fail(**_: object) -> list[Route]:
+        raise AssertionError("routes were loaded")
+
+    monkeypatch.setattr(application, "load_routes", fail)
+    application.build(tmp_path, render_only=True)
+    assert (tmp_path / "TestRoute.html").read_text() == page
+
+
+def test_render_only_keeps_the_items(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(application, "load_routes", lambda **_: [_route()])
+    application.build(tmp_path)
+    names = [application.ITEMS_INDEX_FILENAME, "TestRoute-items.html"]
+    built = {name: (tmp_path / name).read_text() for name in names}
+    assert '"item": "Club +1"' in built[application.ITEMS_INDEX_FILENAME]
+    application.build(tmp_path, render_only=True)
+    assert {name: (tmp_path / name).read_text() for name in names} == built
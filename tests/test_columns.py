@@ -0,0 +1,51 @@
+import ast
+import io
+import struct
+
+from route_planner import report
+from route_planner.action import Kill, Region
+from route_planner.route import Route, Segment
+
+ROUTE = Route(
+    "Columns",
+    Segment(label="Only").add_steps(
+        Region("Asylum"),
+        Kill("Hollow", souls=20),
+        Region("Firelink"),
+        Kill("Hollow", souls=30),
+    ),
+)
+
+
+def test_columns_are_built_during_simulation() -> None:
+    route_data = ROUTE.run()
+    columns = route_data.columns
+    assert len(columns) == len(route_data.events) == 4
+    assert list(columns.columns["souls"]) == [0, 20, 20, 50]
+    assert columns.names("region") == ["Asylum"] * 2 + ["Firelink"] * 2
+    html = report.route(ROUTE, route_data=route_data)
+    assert '<svg class="sparkline"' in html
+    assert "<title>Firelink</title>" in html
+
+
+def test_npy_export_layout() -> None:
+    stream = io.BytesIO()
+    ROUTE.run().columns.write_npy(stream)
+    data = stream.getvalue()
+    assert data[:8] == b"\x93NUMPY\x01\x00"
+    (header_size,) = struct.unpack("<H", data[8:10])
+    assert (10 + header_size) % 64 == 0
+    header = ast.literal_eval(data[10 : 10 + header_size].decode("latin1"))
+    assert header["shape"] == (4,) and not header["fortran_order"]
+    descr = dict(header["descr"])
+    assert descr["souls"] == "<i4"
+    assert descr["region"] == "<U8"  # len("Firelink")
+    assert descr["seconds"] == "<f8"
+    record_size = sum(
+        int(kind[2:]) * 4 if kind.startswith("<U") else int(kind[2:])
+        for kind in descr.values()
+    )
+    assert len(data) == 10 + header_size + 4 * record_size
+    first = data[10 + header_size :][:record_size]
+    assert struct.unpack_from("<i", first)[0] == 0
+    assert "Asylum".encode("utf-32-le") in first
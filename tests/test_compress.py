@@ -0,0 +1,74 @@
+import gzip
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from route_planner import application
+from route_planner.action import Kill, Loot, Region
+from route_planner.compress import GzipPool, gzip_file, write_zip_bundle
+from route_planner.route import Route, Segment
+
+
+def test_outputs_are_deterministic(tmp_path: Path) -> None:
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    for directory, mtime in [(first, 1), (second, 2_000_000_000)]:
+        (directory / "nested").mkdir(parents=True)
+        for name in ["index.html", "nested/page.html"]:
+            (directory / name).write_text(f"<h1>{name}</h1>" * 100)
+            os.utime(directory / name, (mtime, mtime))
+    with GzipPool(level=6) as pool:
+        pool.submit(first / "index.html")
+    assert (
+        gzip_file(second / "index.html", level=6).read_bytes()
+        == (first / "index.html.gz").read_bytes()
+    )
+    assert (
+        gzip.decompress((first / "index.html.gz").read_bytes())
+        == (first / "index.html").read_bytes()
+    )
+
+    for directory in [first, second]:
+        write_zip_bundle(
+            directory.with_suffix(".zip"),
+            directory,
+            [directory / "nested/page.html", directory / "index.html"],
+        )
+    bundle = first.with_suffix(".zip").read_bytes()
+    assert bundle == second.with_suffix(".zip").read_bytes()
+    with zipfile.ZipFile(first.with_suffix(".zip")) as archive:
+        assert archive.namelist() == ["index.html", "nested/page.html"]
+        assert (
+            archive.read("nested/page.html")
+            == (first / "nested/page.html").read_bytes()
+        )
+
+
+def test_bundles_and_gzips_hold_the_indexes_pages_fetch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    route = Route(
+        "Test Route",
+        Segment().add_steps(
+            Region("Firelink Shrine"), Kill("X", souls=1), Loot("Ember")
+        ),
+    )
+    monkeypatch.setattr(application, "load_routes", lambda **_: [route])
+    output_directory = tmp_path / "site"
+    application.build(
+        output_directory, gzip_level=6, bundle_path=tmp_path / "site.zip"
+    )
+    with zipfile.ZipFile(tmp_path / "site.zip") as archive:
+        names = archive.namelist()
+    assert names == [
+        "TestRoute-items.html",
+        "TestRoute.html",
+        "dashboard.html",
+        "index.html",
+        "items.json",
+        "search.json",
+    ]
+    for name in names:
+        assert (output_directory / f"{name}.gz").is_file()
@@ -0,0 +1,58 @@
+from route_planner.damage import DamageModel, defended, layered
+from route_planner.route import Enemy, Hit, HitType
+
+MODEL = DamageModel.from_toml(
+    """
+rtsr_multiplier = 2
+
+[motion]
+WEAK_1H = 100
+HEAVY_1H = 150
+
+[defense]
+OSWALD = 100
+
+[weapons.Club]
+attack = [100, 200]
+motion = { HEAVY_1H = 200 }
+"""
+)
+
+
+def test_defense_lets_more_through_as_attack_grows() -> None:
+    assert defended(10, 100) == 1
+    assert defended(900, 100) == defended(900, 0) == 810
+    shares = [defended(attack, 100) / attack for attack in range(1, 1000)]
+    assert all(b - a > -1e-9 for a, b in zip(shares, shares[1:]))
+
+
+def test_model_covers_every_level_enemy_and_hit() -> None:
+    lookup = MODEL.hit_lookup()
+    assert list(lookup) == ["Club +0", "Club +1"]
+    assert lookup["Club +0"][Enemy.OSWALD] == {
+        HitType.WEAK_1H: Hit(40, with_rtsr=133),
+        HitType.HEAVY_1H: Hit(133, with_rtsr=318),
+    }
+
+
+def test_measured_hits_override_the_model_and_are_flagged() -> None:
+    measured = {
+        "Club +0": {
+            Enemy.OSWALD: {
+                HitType.WEAK_1H: Hit(42, with_rtsr=0),  # ring unmeasured
+                HitType.HEAVY_1H: Hit(200, with_rtsr=150),
+            }
+        },
+        "Dagger +0": {Enemy.OSWALD: {HitType.WEAK_1H: Hit(5, with_rtsr=9)}},
+    }
+    lookup, disagreements = layered(MODEL.hit_lookup(), measured)
+    assert lookup["Club +0"][Enemy.OSWALD] == {
+        HitType.WEAK_1H: Hit(42, with_rtsr=133),
+        HitType.HEAVY_1H: Hit(200, with_rtsr=150),
+    }
+    assert lookup["Club +1"] == MODEL.hit_lookup()["Club +1"]
+    assert lookup["Dagger +0"] == measured["Dagger +0"]
+    assert [
+        (entry.weapon, entry.hit_type, entry.modelled)
+        for entry in disagreements
+    ] == [("Club +0", HitType.HEAVY_1H, Hit(133, with_rtsr=318))]
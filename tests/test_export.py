@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from route_planner import application
+from route_planner.action import BonfireSit, Kill, Region, RunTo
+from route_planner.export import COLUMNS, EventExporter, ExportFormat
+from route_planner.route import Route, Segment
+from route_planner.timing import TimeModel
+from route_planner.travel import Leg, TravelGraph
+
+
+def _route() -> Route:
+    return Route(
+        "Test Route",
+        Segment().add_steps(
+            Region("Firelink Shrine"),
+            BonfireSit("Firelink Shrine"),
+            Kill("Hollow", souls=20, count=2, detail="by the well"),
+            RunTo("Parish"),
+        ),
+        time_model=TimeModel(by_type={Kill: 5}),
+        travel_graph=TravelGraph(
+            [Leg("Firelink Shrine", "Parish", 60)],
+            bonfires=[],
+            warp_seconds=10,
+        ),
+    )
+
+
+def _export(
+    routes: list[Route], export_format: ExportFormat, **kwargs: int
+) -> str:
+    stream = io.StringIO()
+    with EventExporter(stream, export_format, **kwargs) as exporter:
+        for route in routes:
+            route.run(listeners=[exporter.route_listener(route.name)])
+    return stream.getvalue()
+
+
+def test_ndjson_export_streams_every_event() -> None:
+    route = _route()
+    exported = _export([route, _route()], ExportFormat.NDJSON)
+    rows = [json.loads(line) for line in exported.splitlines()]
+    assert len(rows) == 8
+    assert list(rows[2]) == COLUMNS
+    assert rows[2]["type"] == "Kill"
+    assert rows[2]["display"] == "Hollow (x2)"
+    assert rows[2]["souls"] == 40
+    assert rows[2]["region"] == "Firelink Shrine"
+    assert [row["step"] for row in rows] == [0, 1, 2, 3, 0, 1, 2, 3]
+    # the rows are those of Route.run, with its time model and travel graph
+    assert [row["seconds"] for row in rows[:4]] == [0, 0, 5, 65]
+    assert [row["seconds"] for row in rows[:4]] == [
+        event.metrics.seconds for event in route.run().events
+    ]
+
+
+def test_csv_export_matches_ndjson() -> None:
+    ndjson_rows = [
+        {key: str(value) for key, value in json.loads(line).items()}
+        for line in _export([_route()], ExportFormat.NDJSON).splitlines()
+    ]
+    csv_rows = list(
+        csv.DictReader(
+            io.StringIO(_export([_route()], ExportFormat.CSV, batch_size=1))
+        )
+    )
+    assert csv_rows == ndjson_rows
+
+
+def test_build_exports_every_format(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(application, "load_routes", lambda **_: [_route()])
+    application.build(
+        tmp_path, export_formats=[ExportFormat.CSV, ExportFormat.NDJSON]
+    )
+    for export_format in ExportFormat:
+        assert (tmp_path / f"events.{export_format}").read_text() == (
+            _export([_route()], export_format)
+        )
@@ -0,0 +1,126 @@
+from itertools import product
+
+import pytest
+
+from route_planner import report
+from route_planner.kills import (
+    HIT_SECONDS,
+    KillLimits,
+    KillPlanner,
+    Objective,
+    planner_for,
+)
+from route_planner.route import DamageTable, Enemy, Hit, HitType
+from route_planner.sl1 import SL1_HIT_LOOKUP
+
+GARGOYLES = Enemy.BELL_GARGOYLES
+LOOKUP = {
+    "Club": {
+        GARGOYLES: {
+            HitType.WEAK_1H: Hit(70, with_rtsr=90),
+            HitType.HEAVY_2H: Hit(130, with_rtsr=150),
+            HitType.RIPOSTE_2H: Hit(300, with_rtsr=390),
+            HitType.BACKSTAB_1H: Hit(250, with_rtsr=0),
+        }
+    }
+}
+
+
+def brute_force(
+    health: int, rtsr: bool, objective: Objective, limits: KillLimits
+) -> tuple[float, float]:
+    hits = LOOKUP["Club"][GARGOYLES]
+    best = (float("inf"), float("inf"))
+    for weak, heavy, ripostes, backstabs in product(
+        range(16), range(9), range(limits.ripostes + 1), range(2)
+    ):
+        if backstabs > limits.backstabs or (rtsr and backstabs):
+            continue
+        counts = {
+            HitType.WEAK_1H: weak,
+            HitType.HEAVY_2H: heavy,
+            HitType.RIPOSTE_2H: ripostes,
+            HitType.BACKSTAB_1H: backstabs,
+        }
+        damage = sum(
+            (hits[hit].with_rtsr if rtsr else hits[hit].damage) * count
+            for hit, count in counts.items()
+        )
+        if damage < health:
+            continue
+        seconds = sum(HIT_SECONDS[hit] * n for hit, n in counts.items())
+        cost = (sum(counts.values()), seconds)
+        best = min(
+            best, cost if objective is Objective.FEWEST_HITS else cost[::-1]
+        )
+    return best
+
+
+def test_plans_are_the_cheapest_within_the_limits() -> None:
+    for limits in (KillLimits(), KillLimits(ripostes=1, backstabs=0)):
+        planner = KillPlanner(LOOKUP, limits=limits)
+        for health, rtsr, objective in product(
+            GARGOYLES.info.form_health_lookup.values(),
+            (False, True),
+            Objective,
+        ):
+            plan = planner.plan(
+                "Club", GARGOYLES, health, rtsr=rtsr, objective=objective
+            )
+            assert plan is not None and plan.damage >= health
+            best = brute_force(health, rtsr, objective, limits)
+            if objective is Objective.FASTEST:
+                assert plan.seconds == pytest.approx(best[0])
+            else:
+                assert plan.hit_count == best[0]
+            assert (
+                dict(plan.hits).get(HitType.RIPOSTE_2H, 0) <= limits.ripostes
+            )
+
+
+def test_plans_only_use_the_hits_allowed() -> None:
+    planner = KillPlanner(LOOKUP)
+    plan = planner.plan("Club", GARGOYLES, 480, hit_types=[HitType.WEAK_1H])
+    assert plan is not None and plan.describe() == "7 Weak(1H)"
+    assert planner.plan("Club", GARGOYLES, 480, hit_types=[]) is None
+    assert planner.plan("Dagger", GARGOYLES, 480) is None
+
+
+def test_black_knight_takes_three_ripostes_and_a_hit_with_rtsr() -> None:
+    plan = KillPlanner(SL1_HIT_LOOKUP).plan(
+        "Hand Axe +0", Enemy.BLACK_KNIGHT_DARKROOT_BASIN, 603, rtsr=True
+    )
+    assert plan is not None
+    assert plan.describe() == "3 Riposte(2H) + 1 Weak(2H)"
+    table = DamageTable(
+        weapon="Hand Axe +0", enemies=[Enemy.BLACK_KNIGHT_DARKROOT_BASIN]
+    )
+    html = report.kill_plans_table(table, hit_lookup=SL1_HIT_LOOKUP)
+    assert html.count("3 Riposte(2H) + 1 Weak(2H)") == 1
+    assert "Fewest hits with RTSR" in html and "Fastest" not in html
+
+
+def test_shared_planners_are_precomputed_for_the_tables_shown() -> None:
+    lookup = dict(LOOKUP)
+    table = DamageTable(
+        weapon="Club",
+        enemies=[GARGOYLES],
+        hit_types=[HitType.WEAK_1H, HitType.HEAVY_2H],
+    )
+    planner = planner_for(lookup, [table])
+    health = max(GARGOYLES.info.form_health_lookup.values())
+    sizes = {
+        key: len(health_table.costs)
+        for key, health_table in planner._tables.items()
+    }
+    assert {(key[2], key[3]) for key in sizes} == {
+        (False, Objective.FEWEST_HITS),
+        (True, Objective.FEWEST_HITS),
+    }
+    assert all(size > health for size in sizes.values())
+    assert planner_for(lookup) is planner
+    report.kill_plans_table(table, hit_lookup=lookup)
+    assert {  # every form was planned from the tables as they were
+        key: len(health_table.costs)
+        for key, health_table in planner._tables.items()
+    } == sizes
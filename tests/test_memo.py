@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from route_planner.memo import ConstructionCache, Reads, RecordingProxy
+from route_planner.routes import sl1_rangeless_hitless
+
+
+@dataclass
+class Inner:
+    flag: bool = False
+
+
+@dataclass
+class Outer:
+    count: int = 0
+    names: list[str] = field(default_factory=list)
+    inner: Inner = field(default_factory=Inner)
+
+
+def build(options: Any) -> str:
+    if options.inner.flag:
+        return f"flagged {options.names}"
+    return f"counted {options.count}"
+
+
+def test_builds_are_reused_when_the_fields_read_agree() -> None:
+    cache: ConstructionCache[str] = ConstructionCache()
+
+    def cached_build(options: Outer) -> str:
+        built = cache.get("build", {"options": options})
+        if built is None:
+            reads: Reads = {}
+            built = build(RecordingProxy(options, ("options",), reads))
+            cache.add("build", reads, built)
+        return built
+
+    flagged = Outer(names=["a"], inner=Inner(flag=True))
+    assert cached_build(flagged) == "flagged ['a']"
+    assert cached_build(replace(flagged, count=5)) == "flagged ['a']"
+    assert (
+        cache.get("build", {"options": replace(flagged, names=["b"])}) is None
+    )
+    assert cached_build(Outer(count=2)) == "counted 2"
+    assert cached_build(Outer(count=2, names=["c"])) == "counted 2"
+    assert cache.get("build", {"options": Outer(count=3)}) is None
+
+
+def test_variants_share_segments_that_read_the_same_options() -> None:
+    route = sl1_rangeless_hitless.exported_routes()[0]
+    segment_options = next(
+        step.segment_options
+        for step in route.segment.steps
+        if isinstance(step, sl1_rangeless_hitless.TunableSegment)
+    )
+    other = replace(
+        segment_options,
+        options=replace(segment_options.options, initial_upgrade=0),
+    )
+    first = sl1_rangeless_hitless.KillSif(segment_options=segment_options)
+    second = sl1_rangeless_hitless.KillSif(segment_options=other)
+    assert first.steps == second.steps
+    assert all(a is b for a, b in zip(first.steps, second.steps))
+    start = sl1_rangeless_hitless.StartToAfterGargoylesInFirelink
+    assert (
+        start(segment_options=segment_options).steps
+        != start(segment_options=other).steps
+    )
+
+
+def test_shared_segments_keep_the_fields_they_were_given() -> None:
+    route = sl1_rangeless_hitless.exported_routes()[0]
+    segment_options = next(
+        step.segment_options
+        for step in route.segment.steps
+        if isinstance(step, sl1_rangeless_hitless.TunableSegment)
+    )
+    kill_sif = sl1_rangeless_hitless.KillSif
+    built = kill_sif(segment_options=segment_options)
+    given = kill_sif(
+        segment_options=segment_options,
+        condition=False,
+        notes=["first"],
+        label="Sif",
+    )
+    assert given.steps == built.steps
+    assert (given.condition, given.notes, given.label) == (
+        False,
+        ["first"],
+        "Sif",
+    )
+    assert kill_sif(segment_options=segment_options).label == "Kill Sif"
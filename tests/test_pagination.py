@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from route_planner.action import Kill, Region, State, UseMenu
+from route_planner.pagination import RegionPageWriter
+from route_planner.route import Route, Segment
+
+
+def test_region_pages_are_written_while_streaming(tmp_path: Path) -> None:
+    route = Route(
+        "Paged",
+        Segment().add_steps(
+            Region("Asylum"),
+            Kill("Hollow", souls=20),
+            Region("Firelink"),
+            Kill("Hollow", souls=30),
+            UseMenu("Soul", optional=True),
+            Region("Parish"),
+            Kill("Hollow", souls=40),
+        ),
+    )
+    written: list[str] = []
+    writer = RegionPageWriter(
+        tmp_path,
+        route,
+        "Paged",
+        on_page=lambda path: written.append(path.name),
+    )
+    events = route.generate_events(State())
+    for event in events:
+        writer(event)
+        if event.action.target == "Parish":
+            break
+    assert written == ["Paged-01.html", "Paged-02.html"]
+    for event in events:
+        writer(event)
+    writer.finish("Paged.html")
+    assert written[2:] == ["Paged-03.html", "Paged-regions.html"]
+
+    firelink = (tmp_path / "Paged-02.html").read_text()
+    assert "02. Firelink" in firelink
+    assert 'class="region"' not in firelink
+    assert "Paged-01.html" in firelink and "Paged-03.html" in firelink
+    assert "1 errors present" in firelink
+    assert [page.totals.steps for page in writer.pages] == [1, 2, 1]
+    assert writer.pages[1].totals.optional_steps == 1
+    assert writer.pages[2].totals.souls == 40
+    overview = (tmp_path / "Paged-regions.html").read_text()
+    assert "03. Parish" in overview and "Paged.html" in overview
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from route_planner.action import Equip, Loot, Receive, Region, UseMenu
+from route_planner.persistent import PersistentMap, SnapshotDict
+from route_planner.route import Route, Segment
+
+
+class Colliding:
+    """Distinct keys that all hash the same, as the trie has to cope."""
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __hash__(self) -> int:
+        return 7
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Colliding) and other.value == self.value
+
+
+def test_persistent_map_matches_a_dict_and_keeps_old_versions() -> None:
+    rng = random.Random(41)
+    expected: dict[object, int] = {}
+    versions = [(PersistentMap[object, int](), dict(expected))]
+    for _ in range(2000):
+        key = rng.choice(
+            [rng.randrange(200), f"key{rng.randrange(50)}", Colliding(1)]
+            + [Colliding(rng.randrange(3))]
+        )
+        mapping = versions[-1][0]
+        if key in expected and rng.random() < 0.3:
+            del expected[key]
+            mapping = mapping.delete(key)
+        else:
+            expected[key] = rng.randrange(100)
+            mapping = mapping.set(key, expected[key])
+        versions.append((mapping, dict(expected)))
+    for mapping, contents in versions:
+        assert len(mapping) == len(contents)
+        assert dict(mapping) == contents
+    assert versions[0][0].get(3) is None
+    with pytest.raises(KeyError):
+        versions[0][0][3]
+
+
+def test_snapshot_dict_snapshots_do_not_change() -> None:
+    mapping = SnapshotDict[str, int]({"a": 1})
+    first = mapping.snapshot()
+    mapping["b"] = 2
+    mapping.setdefault("c", 3)
+    assert mapping.pop("a") == 1
+    second = mapping.snapshot()
+    mapping.update(d=4)
+    mapping.clear()
+    assert dict(first) == {"a": 1}
+    assert dict(second) == {"b": 2, "c": 3}
+    assert dict(mapping.snapshot()) == {}
+
+
+def test_state_at_gives_the_state_as_of_each_event() -> None:
+    route = Route(
+        "Snapshots",
+        Segment().add_steps(
+            Region("Undead Asylum"),
+            Receive("Club"),
+            Equip("Club", "Right Hand"),
+            Loot("Firebomb", count=2),
+            UseMenu("Firebomb"),
+            UseMenu("Firebomb"),
+            UseMenu("Firebomb"),  # an overdraft, so there's an error event
+        ),
+    )
+    route_data = route.run(snapshots=True)
+    assert [route_data.state_at(i).count("Firebomb") for i in range(7)] == [
+        0,
+        0,
+        0,
+        2,
+        1,
+        0,
+        -1,
+    ]
+    assert route_data.state_at(1).equipped() == {}
+    assert route_data.state_at(2).equipped() == {"Right Hand": "Club"}
+    assert route_data.state_at(7).count("Firebomb") == -1
+    assert route_data.state_at(7).metrics.error_count == 1
+    with pytest.raises(ValueError):
+        route.run().state_at(0)
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from route_planner import application
+from route_planner.action import (
+    Buy,
+    Item,
+    Kill,
+    Loot,
+    Receive,
+    Region,
+    UpgradeItem,
+)
+from route_planner.provenance import ProvenanceIndex
+from route_planner.route import Route, Segment
+
+
+def test_items_index_is_queried_from_its_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    route = Route(
+        "Provenance",
+        Segment().add_steps(
+            Region("Undead Parish"),
+            Kill("Hollow", souls=2000),
+            Buy(Item.BONE, souls=500, count=2),
+            Buy(Item.BONE, souls=500, count=2),  # already have them
+            Loot(Item.TWINKLING_TITANITE, count=2),
+            Receive("Club"),
+            UpgradeItem("Club", "Club +1", souls=200),
+        ),
+    )
+    items_index = ProvenanceIndex()
+    route.run(listeners=[items_index.route_indexer(route.name)])
+    assert [
+        (acquisition.step, acquisition.action, acquisition.item)
+        for acquisition in items_index.acquisitions
+    ] == [
+        (2, "Buy", Item.BONE),
+        (3, "Loot", Item.TWINKLING_TITANITE),
+        (4, "Receive", "Club"),
+        (5, "UpgradeItem", "Club +1"),
+    ]
+    application.write_items_index(tmp_path, items_index)
+
+    application.main(
+        ["items", "twinkling", "--output-directory", str(tmp_path)]
+    )
+    assert capsys.readouterr().out == (
+        "Provenance: step 3 Loot Twinkling Titanite (x2) in Undead Parish\n"
+    )
+    assert (
+        application.main(
+            [
+                "items",
+                "club",
+                "--route",
+                "other",
+                "--output-directory",
+                str(tmp_path),
+            ]
+        )
+        == 0
+    )
+    assert capsys.readouterr().out == ""
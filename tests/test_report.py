@@ -0,0 +1,50 @@
+import json
+
+from route_planner import report
+from route_planner.action import Action, Buy, Event, Kill, Region, State
+from route_planner.route import Route, Segment
+from route_planner.slack import route_slack
+
+
+class Hidden(Action):
+    def apply(self, state: State, event: Event) -> None:
+        state.souls += 5
+        event.output = False
+
+
+def test_steps_data_rows() -> None:
+    route = Route(
+        "Compact",
+        Segment().add_steps(
+            Region("Asylum"),
+            Kill("Hollow", souls=20, detail="<b>first</b>"),
+            Hidden("souls"),
+            Region("Firelink"),
+            Buy("Ember", souls=100, optional=True),
+        ),
+    )
+    route_data = route.run()
+    data = report.steps_data(route_data)
+    strings = data["strings"]
+    assert not data["timed"]
+    regions, kill, region, buy, error = data["rows"]
+    assert strings[regions[1]] == "Asylum" and regions[0] == 4
+    assert kill[:8] == [0, 20, 0, 0, 0, 0, 0, 0]
+    assert [strings[index] for index in kill[8:]] == [
+        "Kill",
+        "Hollow",
+        "<b>first</b>",
+        "",
+    ]
+    assert strings[region[1]] == "Firelink"
+    # shown as -100 from the hidden step's 25, so those values are included
+    assert buy[:2] == [1, -95] and buy[-1] == [25, 0, 0, 0, 0, 0, 0]
+    assert error[0] == 2
+
+    html = report.route(route, route_data=route_data, virtualize=True)
+    assert '<table class="route virtual">' in html
+    assert "<b>first<\\/b>" in html
+    embedded = html.split('class="steps">', 1)[1].split("</script>", 1)[0]
+    slack = route_slack(route_data.events)
+    assert json.loads(embedded) == report.steps_data(route_data, slack=slack)
+    assert json.loads(embedded)["rows"][3][12][0] == -75  # the buy
@@ -0,0 +1,90 @@
+from typing import Callable
+
+from route_planner.action import Loot, Receive, Region, State, Step
+from route_planner.route import AddNotes, Route, Segment
+from route_planner.routes import sl1_rangeless_hitless
+
+
+def test_finalize_keeps_only_what_can_change_as_a_route_runs() -> None:
+    dynamic = Segment(
+        condition_callback=lambda state: state.souls > 0, notes=["rich"]
+    ).add_steps(Loot("Firebomb", condition=False), Loot("Black Firebomb"))
+    labelled = Segment(label="Labelled").add_steps(Loot("Dagger"))
+    route = Route(
+        "Finalize",
+        Segment(notes=["first"]).add_steps(
+            Region("Firelink Shrine"),
+            Loot("Club", condition=False),
+            Segment(condition=False, notes=["not taken"])
+            .add_steps(Receive("Zweihander"))
+            .else_add_steps(
+                Segment(notes=["else"]), Receive("Bandit's Knife")
+            ),
+            Segment(notes=["inlined"]).add_steps(
+                Segment(notes=["nested"]), Receive("Estus Flask")
+            ),
+            Segment(condition=False),
+            dynamic,
+            labelled,
+        ),
+    )
+    before = route.run()
+    route.finalize()
+    assert route.segment.steps == [
+        Region("Firelink Shrine"),
+        AddNotes(["else"]),
+        Receive("Bandit's Knife"),
+        AddNotes(["inlined", "nested"]),
+        Receive("Estus Flask"),
+        dynamic,
+        labelled,
+    ]
+    assert dynamic.steps == [Loot("Black Firebomb")]
+    after = route.run()
+    assert (
+        after.notes == before.notes == ["first", "else", "inlined", "nested"]
+    )
+    assert [event.action for event in after.events] == [
+        event.action for event in before.events
+    ]
+    assert route.run(state=State(souls=1)).notes[-1] == "rich"
+
+
+def test_finalized_routes_produce_identical_events() -> None:
+    for route in sl1_rangeless_hitless.exported_routes():
+        before = route.run()
+        after = route.finalize().run()
+        assert after.notes == before.notes
+        assert [(event.metrics, event.action) for event in after.events] == [
+            (event.metrics, event.action) for event in before.events
+        ]
+
+
+def test_step_factories_only_run_for_branches_that_can_be_taken() -> None:
+    made: list[str] = []
+
+    def factory(name: str) -> Callable[[], list[Step]]:
+        def make() -> list[Step]:
+            made.append(name)
+            return [Receive(name)]
+
+        return make
+
+    route = Route(
+        "Lazy",
+        Segment().add_steps(
+            Segment(condition=False)
+            .add_step_factory(factory("not taken"))
+            .else_add_step_factory(factory("else")),
+            Segment(condition_callback=lambda state: False).add_step_factory(
+                factory("dynamic")
+            ),
+            Segment().add_step_factory(factory("taken")),
+        ),
+    )
+    unfinalized = route.run()
+    assert made == ["else", "taken"]
+    made.clear()
+    route.finalize()
+    assert made == ["dynamic"]  # the others were made by the run
+    assert route.run().events == unfinalized.events
@@ -0,0 +1,190 @@
+import json
+import re
+import tomllib
+from pathlib import Path
+
+import pytest
+
+from route_planner import routefile
+from route_planner.action import Buy, Kill, Region, TalkTo, UpgradeItem
+from route_planner.route import Route, Segment
+
+ROUTE_FILE = """
+name = "Club"
+notes = ["Uses a {weapon}."]
+
+[options]
+weapon = "Club"
+humanity = { kill_oswald = false, bones = 2 }
+
+[[routes]]
+name = "{weapon} killing Oswald"
+options = { humanity = { kill_oswald = true } }
+
+[[routes]]
+
+[[steps]]
+Region = "Firelink Shrine"
+
+[[steps]]
+Kill = "Asylum Demon"
+souls = 2000
+
+[[steps]]
+label = "Kill Oswald"
+if = "humanity.kill_oswald and weapon != 'Dagger'"
+steps = [
+  { Buy = "Homeward Bone", count = "{humanity.bones}", souls = 500 },
+  { Kill = "Oswald of Carim", souls = 2000, if = "not humanity.kill_oswald" },
+]
+else = [{ TalkTo = "Oswald of Carim", detail = "{{ignored}}" }]
+
+[[steps]]
+UpgradeItem = ["{weapon}", "{weapon} +1"]
+souls = 200
+items = { "Titanite Shard" = 1 }
+"""
+
+
+def test_compiles_to_the_same_tree(tmp_path: Path) -> None:
+    (file := tmp_path / "club.toml").write_text(ROUTE_FILE)
+    killing, talking = routefile.load_route_file(
+        file, cache_directory=tmp_path
+    )
+
+    def expected(name: str, kill_oswald: bool) -> Route:
+        return Route(
+            name,
+            Segment(notes=["Uses a Club."]).add_steps(
+                Region("Firelink Shrine"),
+                Kill("Asylum Demon", souls=2000),
+                Segment(label="Kill Oswald", condition=kill_oswald)
+                .add_steps(
+                    Buy("Homeward Bone", count=2, souls=500),
+                    Kill(
+                        "Oswald of Carim",
+                        souls=2000,
+                        condition=not kill_oswald,
+                    ),
+                )
+                .else_add_steps(TalkTo("Oswald of Carim", detail="{ignored}")),
+                UpgradeItem(
+                    "Club", "Club +1", souls=200, items={"Titanite Shard": 1}
+                ),
+            ),
+        )
+
+    assert (
+        killing.fingerprint()
+        == expected("Club killing Oswald", True).fingerprint()
+    )
+    assert talking.fingerprint() == expected("Club", False).fingerprint()
+    names = [event.action.name for event in killing.finalize().run().events]
+    assert names == ["Region", "Kill", "Buy", "UpgradeItem", "Error"]
+
+
+def test_cached_routes_skip_parsing(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (file := tmp_path / "club.toml").write_text(ROUTE_FILE)
+    first = routefile.load_route_file(file, cache_directory=tmp_path)
+
+    def compile_route_file(text: str, **_: object) -> None:
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(routefile, "compile_route_file", compile_route_file)
+    monkeypatch.setattr(tomllib, "loads", compile_route_file)
+    second = routefile.load_route_file(file, cache_directory=tmp_path)
+    assert [route.fingerprint() for route in second] == [
+        route.fingerprint() for route in first
+    ]
+    file.write_text(ROUTE_FILE + "\n")  # a new digest, so it is compiled
+    with pytest.raises(AssertionError):
+        routefile.load_route_file(file, cache_directory=tmp_path)
+
+
+def test_unknown_options_are_reported() -> None:
+    with pytest.raises(RuntimeError, match="Unknown option: kill_sif"):
+        routefile.compile_route_file(
+            "[options]\nsif = true\n"
+            '[[steps]]\nlabel = "Sif"\nif = "sif or kill_sif"\nsteps = []'
+        )
+    with pytest.raises(RuntimeError, match="Neither an action"):
+        routefile.compile_route_file('[[steps]]\nKil = "Sif"')
+
+
+def test_literals_in_conditions_are_not_split() -> None:
+    options = {"weapon": "Sword and Shield"}
+    assert routefile.evaluate_condition(
+        "weapon == 'Sword and Shield'", options
+    )
+    assert routefile.evaluate_condition(
+        'weapon != "Axe or Club" and not weapon == "a==b"', options
+    )
+    compiled = routefile.compile_route_file(
+        '[options]\nweapon = "Sword and Shield"\n'
+        '[[steps]]\nKill = "X"\nsouls = 1\n'
+        "if = \"weapon == 'Sword and Shield' or weapon == 'Club'\""
+    )
+    assert compiled["routes"][0]["steps"][0][2]["condition"]
+
+
+def test_bad_conditions_name_the_file_and_step(tmp_path: Path) -> None:
+    (file := tmp_path / "bad.toml").write_text(
+        '[options]\nweapon = "Club"\n'
+        '[[steps]]\nlabel = "A"\n'
+        'steps = [{ Kill = "X", souls = 1, if = "weapon == \'Club" }]'
+    )
+    with pytest.raises(
+        RuntimeError,
+        match=re.escape(f"Bad condition in {file} steps[0].steps[0]: "),
+    ):
+        routefile.load_route_file(file)
+
+
+def test_unreadable_caches_are_compiled_again(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (file := tmp_path / "club.toml").write_text(ROUTE_FILE)
+    cache_directory = tmp_path / "cache"
+    first = routefile.load_route_file(file, cache_directory=cache_directory)
+    (cache_path,) = cache_directory.iterdir()
+    compiled = cache_path.read_text()
+    for corrupted in (compiled[:100], '{"routes": [{}]}'):
+        cache_path.write_text(corrupted)
+        again = routefile.load_route_file(
+            file, cache_directory=cache_directory
+        )
+        assert [route.fingerprint() for route in again] == [
+            route.fingerprint() for route in first
+        ]
+        assert json.loads(cache_path.read_text()) == json.loads(compiled)
+    file.write_text(ROUTE_FILE + "\n")  # replaces the earlier compiled form
+    routefile.load_route_file(file, cache_directory=cache_directory)
+    assert len(list(cache_directory.iterdir())) == 1
+    # nothing is kept anywhere without a cache directory
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user"))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    routefile.load_route_file(file)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "cache",
+        "club.toml",
+    ]
+
+
+def test_files_sharing_a_prefix_keep_their_compiled_forms(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_directory = tmp_path / "cache"
+    files = [tmp_path / "any-glitchless.toml", tmp_path / "any.toml"]
+    for file in files:
+        file.write_text(ROUTE_FILE)
+        routefile.load_route_file(file, cache_directory=cache_directory)
+    assert len(list(cache_directory.iterdir())) == 2
+
+    def compile_route_file(text: str, **_: object) -> None:
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(routefile, "compile_route_file", compile_route_file)
+    for file in files:
+        routefile.load_route_file(file, cache_directory=cache_directory)
@@ -0,0 +1,43 @@
+import io
+import json
+
+from route_planner.action import Kill, Region, TalkTo
+from route_planner.route import Route, Segment
+from route_planner.search import SearchIndex, tokenize
+
+
+def test_tokenize_ignores_tags_and_repeats() -> None:
+    assert tokenize("Oswald <b>MUST</b> be visited; oswald's bones") == [
+        "oswald",
+        "must",
+        "be",
+        "visited",
+        "s",
+        "bones",
+    ]
+
+
+def test_index_is_built_from_the_event_stream() -> None:
+    route = Route(
+        "Searched",
+        Segment(notes=["Bring a Slumbering Dragoncrest Ring"]).add_steps(
+            Region("Undead Parish"),
+            Kill("Hollow", souls=20, detail="by the <b>stairs</b>"),
+            TalkTo("Oswald of Carim", detail="Oswald sells bones"),
+        ),
+    )
+    search_index = SearchIndex()
+    indexer = search_index.route_indexer(route.name, "Searched.html")
+    route_data = route.run(listeners=[indexer])
+    indexer.finish(route_data.notes)
+    stream = io.StringIO()
+    search_index.write(stream)
+    data = json.loads(stream.getvalue())
+    postings = data["postings"]
+    assert data["routes"] == [["Searched", "Searched.html"]]
+    assert data["steps"] == [["Kill Hollow", "TalkTo Oswald of Carim"]]
+    assert postings["oswald"] == [0, 2]
+    assert postings["stairs"] == [0, 1]
+    assert postings["parish"] == [0, 1]
+    assert postings["dragoncrest"] == [0, 0]
+    assert list(postings) == sorted(postings)
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+import pytest
+
+from route_planner.action import Kill, Region
+from route_planner.route import Route, Segment
+from route_planner.server import PageCache, RoutePageServer
+
+
+def test_page_cache_evicts_least_recently_used() -> None:
+    renders: list[str] = []
+
+    def render(key: str) -> str:
+        renders.append(key)
+        return key
+
+    cache = PageCache(2)
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        assert cache.get(key, lambda: render(key)).body == key.encode()
+    assert renders == ["a", "b", "c", "b"]
+
+
+def test_concurrent_conditional_gets() -> None:
+    route = Route(
+        "Test Route",
+        Segment().add_steps(Region("Firelink Shrine"), Kill("X", souls=1)),
+    )
+    server = RoutePageServer(("127.0.0.1", 0), {"TestRoute.html": route})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+
+        def get(etag: str = "") -> tuple[int, str, bytes]:
+            connection = HTTPConnection("127.0.0.1", server.server_port)
+            connection.request(
+                "GET",
+                "/TestRoute.html",
+                headers={"If-None-Match": etag} if etag else {},
+            )
+            response = connection.getresponse()
+            result = (
+                response.status,
+                response.getheader("ETag", ""),
+                response.read(),
+            )
+            connection.close()
+            return result
+
+        with ThreadPoolExecutor(16) as executor:
+            results = list(executor.map(lambda _: get(), range(32)))
+        assert {status for status, _, _ in results} == {200}
+        assert len({(etag, body) for _, etag, body in results}) == 1
+        status, etag, body = results[0]
+        assert b"Firelink Shrine" in body
+        assert get(etag)[0] == 304
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_page_cache_forgets_failed_renders() -> None:
+    cache = PageCache(2)
+
+    def fail() -> str:
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError):
+        cache.get("a", fail)
+    assert not cache._render_locks
+    assert cache.get("a", lambda: "fixed").body == b"fixed"
+
+
+def test_fingerprint_covers_callback_code_and_closures() -> None:
+    def route(threshold: int) -> Route:
+        return Route(
+            "Callbacks",
+            Segment().add_steps(
+                Segment(
+                    condition_callback=lambda state: state.humanity < threshold
+                ).add_steps(Kill("X", souls=1))
+            ),
+        )
+
+    assert route(30).fingerprint() == route(30).fingerprint()
+    assert route(30).fingerprint() != route(20).fingerprint()
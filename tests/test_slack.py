@@ -0,0 +1,95 @@
+import random
+from pathlib import Path
+
+from route_planner import report
+from route_planner.action import (
+    BonfireSit,
+    Buy,
+    Item,
+    Kill,
+    Loot,
+    Receive,
+    UseMenu,
+)
+from route_planner.cache import read_route_cache, write_route_cache
+from route_planner.route import Route, Segment
+from route_planner.slack import MinTree, SlackIndex, route_slack
+
+
+def test_min_tree_matches_a_list_through_edits() -> None:
+    generator = random.Random(4)
+    values = [generator.randint(-50, 50) for _ in range(37)]
+    tree = MinTree(values)
+    for _ in range(500):
+        start = generator.randrange(len(values))
+        stop = generator.randint(start + 1, len(values))
+        if generator.random() < 0.5:
+            amount = generator.randint(-20, 20)
+            tree.add(start, stop, amount)
+            for index in range(start, stop):
+                values[index] += amount
+        assert tree.minimum(start, stop) == min(values[start:stop])
+
+
+def test_slack_is_the_least_held_from_a_purchase_on() -> None:
+    route = Route(
+        "Slack",
+        Segment().add_steps(
+            Kill("Hollow", souls=1000),
+            Buy("Firebomb", count=2, souls=100),
+            Loot("Humanity", humanities=1),
+            Buy("Ember", souls=600),
+            Kill("Hollow", souls=500),
+            UseMenu("Humanity"),
+        ),
+    )
+    events = route.run().events
+    slack = route_slack(events)
+    assert slack[0] is None and slack[2] is None
+    assert slack[1] is not None and slack[1].souls == 200
+    assert slack[3] is not None and slack[3].souls == 200
+    assert slack[5] is not None and slack[5].souls == 700
+
+    index = SlackIndex(events)
+    index.spend(4, souls=300)  # a costlier step later leaves less earlier
+    assert index.slack(1).souls == 200 and index.slack(4).souls == 400
+    index.spend(4, souls=300)
+    assert index.slack(1).souls == 100
+
+    html = report.route(route)
+    assert '<th title="Slack">' in html
+    assert '<td class="slack" title="200 souls' in html
+
+
+def test_slack_ends_where_the_darksign_resets_the_balances(
+    tmp_path: Path,
+) -> None:
+    route = Route(
+        "Darksign",
+        Segment().add_steps(
+            BonfireSit("Firelink Shrine"),
+            Receive(Item.DARKSIGN),
+            Kill("Hollow", souls=1150),
+            Loot("Humanity", humanities=1),
+            UseMenu("Humanity"),
+            Buy(Item.TITANITE_SHARD, count=9, souls=100),
+            UseMenu(Item.DARKSIGN),  # souls and humanity back to 0
+            Kill("Hollow", souls=50),
+            Buy("Ember", souls=50),
+        ),
+    )
+    events = route.run().events
+    slack = route_slack(events)
+    assert slack[5] is not None
+    assert (slack[5].souls, slack[5].humanity) == (250, 1)
+    assert slack[6] is not None and slack[6].souls == 0
+    assert slack[8] is not None and slack[8].souls == 0
+
+    index = SlackIndex(events)
+    index.spend(5, souls=100)  # carried as far as the reset, not past it
+    assert index.slack(5).souls == 150 and index.slack(7).souls == 0
+
+    path = tmp_path / "route.rpd"  # as read back for a render-only build
+    write_route_cache(path, route, route.run())
+    _, cached = read_route_cache(path)
+    assert cached is not None and route_slack(cached.events) == slack
@@ -0,0 +1,35 @@
+from route_planner import report
+from route_planner.action import Buy, Kill, Region
+from route_planner.route import Route, Segment
+from route_planner.summary import RouteSummarizer
+from route_planner.symbols import symbol
+
+
+def test_summary_is_totalled_while_streaming() -> None:
+    route = Route(
+        "Summarized",
+        Segment().add_steps(
+            Region("Asylum"),
+            Kill("Hollow", souls=20),
+            Region("Firelink"),
+            Kill("Hollow", souls=20, optional=True),
+            Buy("Ember", souls=100),
+        ),
+    )
+    summarizer = RouteSummarizer(route.name, "Summarized.html")
+    route_data = route.run(listeners=[summarizer])
+    summary = summarizer.summary
+    assert summary.ran
+    assert summary.souls == route_data.events[-1].metrics.souls == -60
+    assert summary.steps == 3
+    assert summary.optional_steps == 1
+    assert summary.error_count == 1
+    assert summary.regions[symbol("Asylum")].steps == 1
+    firelink = summary.regions[symbol("Firelink")]
+    assert (firelink.steps, firelink.optional_steps) == (2, 1)
+    assert (firelink.error_count, firelink.souls) == (1, -80)
+
+    html = report.dashboard([summary])
+    assert '<a href="Summarized.html">Summarized</a>' in html
+    assert '<td data-value="-60">-60</td>' in html
+    assert 'class="route sortable"' in html
@@ -0,0 +1,49 @@
+from route_planner import report
+from route_planner.action import AutoKill, Kill, Region, RunTo
+from route_planner.route import Route, Segment
+from route_planner.timing import Timeline, TimeModel
+
+
+def test_time_model_lookup_order() -> None:
+    model = TimeModel(
+        by_type={RunTo: 20, Kill: 15}, by_target={(Kill, "Asylum Demon"): 60}
+    )
+    assert model.estimate(RunTo("anywhere").event()) == 20
+    assert model.estimate(RunTo("anywhere", seconds=3).event()) == 3
+    assert model.estimate(Kill("Hollow", souls=20).event()) == 15
+    assert model.estimate(Kill("Asylum Demon", souls=2000).event()) == 60
+    assert model.estimate(AutoKill("Asylum Demon", souls=0).event()) == 60
+    assert model.estimate(Region("Firelink Shrine").event()) == 0
+
+
+def test_timeline_range_queries() -> None:
+    route = Route(
+        "Timed",
+        Segment().add_steps(
+            Segment(label="First").add_steps(
+                Region("Asylum"),
+                RunTo("cell"),
+                Region("Firelink"),
+                Kill("Hollow", souls=20),
+            ),
+            Segment(label="Second").add_steps(
+                RunTo("well"), Region("Asylum"), RunTo("cell", seconds=5)
+            ),
+        ),
+        time_model=TimeModel(by_type={RunTo: 20, Kill: 15}),
+    )
+    route_data = route.run()
+    timeline = Timeline(route_data.events)
+    assert timeline.total == 60
+    assert timeline.segment("First") == 35
+    assert timeline.segment("Second") == 25
+    assert timeline.region("Asylum") == 25
+    assert timeline.region("Firelink") == 35
+    assert timeline.steps(1, 4) == 35
+    assert [span.name for span in timeline.region_spans] == [
+        "Asylum",
+        "Firelink",
+        "Asylum",
+    ]
+    assert "1:00" in report.steps_table(route_data)
+    assert "0:25" in report.time_table(route_data)
@@ -0,0 +1,65 @@
+from math import inf
+from pathlib import Path
+
+from route_planner.action import BonfireSit, Item, Receive, RunTo
+from route_planner.route import Route, Segment
+from route_planner.symbols import symbol
+from route_planner.travel import Leg, TravelGraph
+
+LEGS = [
+    Leg("Firelink", "Parish", 60),
+    Leg("Parish", "Fortress", 30),
+    Leg("Firelink", "Basin", 50, one_way=True),
+]
+
+
+def test_all_pairs_costs_are_cached_on_disk(tmp_path: Path) -> None:
+    graph = TravelGraph(
+        LEGS,
+        bonfires=["Firelink", "Parish"],
+        warp_seconds=10,
+        cache_directory=tmp_path,
+    )
+    firelink, parish, fortress = map(
+        symbol, ["Firelink", "Parish", "Fortress"]
+    )
+    assert graph.cost(fortress, firelink) == 90
+    assert graph.cost(firelink, symbol("Basin")) == 50
+    assert graph.cost(symbol("Basin"), firelink) == inf
+    assert graph.cost(firelink, symbol("Nowhere")) == inf
+    assert graph.cheapest_warp(fortress, {firelink}) == (firelink, 100)
+    assert graph.cheapest_warp(fortress, {firelink, parish}) == (parish, 40)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    reloaded = TravelGraph(
+        LEGS,
+        bonfires=["Firelink", "Parish"],
+        warp_seconds=10,
+        cache_directory=tmp_path,
+    )
+    reloaded._compute_costs = None  # type: ignore[assignment, method-assign]
+    assert reloaded.cost(fortress, firelink) == 90
+
+
+def test_run_to_uses_travel_times_and_hints_warps() -> None:
+    route = Route(
+        "Travel",
+        Segment().add_steps(
+            BonfireSit("Parish"),
+            RunTo("Firelink"),
+            Receive(Item.LORDVESSEL),
+            RunTo("Fortress"),
+        ),
+        travel_graph=TravelGraph(
+            LEGS, bonfires=["Firelink", "Parish"], warp_seconds=10
+        ),
+    )
+    route_data = route.run(snapshots=True)
+    events = route_data.events
+    assert route_data.state_at(3).location == symbol("Fortress")
+    assert events[1].seconds == 60
+    assert not events[1].hint
+    assert events[3].seconds == 90
+    assert events[3].hint == (
+        "warping to Parish (~40s) is faster than running (~90s)"
+    )
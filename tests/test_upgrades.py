@@ -0,0 +1,106 @@
+import pytest
+
+from route_planner import application
+from route_planner.action import Buy, Item, UpgradeItem
+from route_planner.routes import sl1_rangeless_hitless
+from route_planner.upgrades import (
+    Shop,
+    UpgradeLevel,
+    UpgradePlanner,
+    event_regions,
+    soul_income,
+)
+
+SHARD = Item.TITANITE_SHARD
+LEVELS = [
+    UpgradeLevel(souls=100, items={SHARD: 1}),
+    UpgradeLevel(souls=100, items={SHARD: 2}),
+]
+
+
+def test_plans_are_the_cheapest_that_stay_affordable() -> None:
+    planner = UpgradePlanner(
+        [
+            Shop(region="Pricey", vendor="A", prices={SHARD: 300}),
+            Shop(region="Cheap", vendor="B", prices={SHARD: 100}),
+            Shop(
+                region="Shards", vendor="C", prices={SHARD: 50}, upgrades=False
+            ),
+        ],
+        levels=LEVELS,
+    )
+    regions = ["Pricey", "Field", "Shards", "Cheap", "Field"]
+    plan = planner.plan([600, 700, 700, 900, 900], regions, weapon="Club")
+    assert plan is not None
+    assert plan.earliest == (0, 3)
+    assert plan.spent == 3 * 50 + 200
+    assert [(entry.after_event, entry.step) for entry in plan.placements] == [
+        (2, Buy(SHARD, count=3, souls=50, detail="C")),
+        (
+            3,
+            UpgradeItem(
+                "Club",
+                new_item="Club +2",
+                souls=200,
+                items={SHARD: 3},
+                detail="B",
+            ),
+        ),
+    ]
+    # anything spent early would leave too little for later
+    plan = planner.plan([600, 0, 0, 900, 900], regions, weapon="Club")
+    assert plan is not None and plan.spent == 3 * 100 + 200
+    assert {entry.after_event for entry in plan.placements} == {3}
+    assert planner.plan([600, 0, 0, 400, 900], regions, weapon="Club") is None
+
+
+def test_sl1_upgrades_are_placed_where_the_route_has_them() -> None:
+    route = sl1_rangeless_hitless.exported_routes()[0]
+    assert route.name.endswith("Reinforced Club +5)")
+    events = route.run().events
+    balances = soul_income(
+        events,
+        excluding=lambda action: action.target in (SHARD, "Reinforced Club"),
+    )
+    planner = UpgradePlanner(
+        [
+            Shop(
+                region="Undead Parish",
+                vendor=sl1_rangeless_hitless.andre,
+                prices={SHARD: 800},
+            )
+        ]
+    )
+    plan = planner.plan(
+        balances, event_regions(events), weapon="Reinforced Club", target=5
+    )
+    assert plan is not None and plan.spent == 9 * 800 + 5 * 200
+    bought, upgraded = plan.placements
+    assert bought.step == Buy(
+        SHARD, count=9, souls=800, detail=sl1_rangeless_hitless.andre
+    )
+    assert upgraded.step.display == "Reinforced Club to Reinforced Club +5"
+    # as soon as it can be afforded, which is just where the route has them
+    assert bought.after_event == upgraded.after_event == plan.earliest[-1]
+    assert events[bought.after_event + 1].action.target == SHARD
+
+
+def test_upgrade_suggestions_are_printed_for_routes_with_goals(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    assert application.main(["upgrades", "--route", "any% with battle"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "SL1 Rangeless Hitless (Any% with Battle Axe +4)",
+        "  Battle Axe to Battle Axe +4, for 5600 souls:",
+        "    after Undead Parish (#53): Buy Titanite Shard (x6)",
+        # not until the axe itself is bought
+        "    after Battle Axe (#54): UpgradeItem Battle Axe to Battle Axe +4",
+    ]
+    assert application.main(["upgrades", "--route", "reinforced"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "SL1 Rangeless Hitless (Any% with Reinforced Club +5)",
+        "  Reinforced Club to Reinforced Club +5, for 8200 souls:",
+        "    after Undead Parish (#70): Buy Titanite Shard (x9)",
+        "    after Undead Parish (#70): UpgradeItem Reinforced Club to"
+        " Reinforced Club +5",
+    ]
@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from route_planner import application, watch
+from route_planner.watch import RouteWatcher
+
+ROUTE_MODULE = """
+from route_planner.action import Kill, Region
+from route_planner.route import Route, Segment
+
+
+def exported_routes() -> list[Route]:
+    return [
+        Route(
+            "{name}",
+            Segment().add_steps(Region("Firelink"), Kill("{target}", souls=1)),
+        )
+    ]
+"""
+
+
+def _write_module(path: Path, name: str, target: str, mtime: int) -> None:
+    path.write_text(ROUTE_MODULE.format(name=name, target=target))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_only_changed_route_module_is_rebuilt(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    routes_directory = tmp_path / "routes"
+    routes_directory.mkdir()
+    first = routes_directory / "first.py"
+    second = routes_directory / "second.py"
+    _write_module(first, "First", "Hollow", 1)
+    _write_module(second, "Second", "Rat", 1)
+    monkeypatch.setattr(
+        application,
+        "route_module_files",
+        lambda: sorted(routes_directory.glob("*.py")),
+    )
+    output_directory = tmp_path / "output"
+    watcher = RouteWatcher(output_directory, paginate=True)
+    watcher.rebuild()
+    first_page = output_directory / "First.html"
+    second_page = output_directory / "Second.html"
+    assert "Hollow" in first_page.read_text()
+    # everything a build writes for a route, and for all of them
+    for name in [
+        "First-items.html",
+        "First-regions.html",
+        "First-01.html",
+        "search.json",
+        "items.json",
+    ]:
+        assert (output_directory / name).exists()
+    assert (
+        'href="First-regions.html"'
+        in (output_directory / "index.html").read_text()
+    )
+    os.utime(second_page, ns=(1, 1))
+
+    _write_module(first, "First", "Skeleton", 2)
+    assert watcher.update() == {first}
+    assert "Skeleton" in first_page.read_text()
+    assert "skeleton" in (output_directory / "search.json").read_text()
+    assert second_page.stat().st_mtime_ns == 1  # not re-rendered
+    assert watcher.update() == set()
+
+    _write_module(second, "Renamed", "Rat", 2)
+    watcher.update()
+    assert not second_page.exists()
+    assert not (output_directory / "Second-items.html").exists()
+    assert not (output_directory / "Second-01.html").exists()
+    assert "Renamed.html" in (output_directory / "index.html").read_text()
+    assert "Renamed.html" in (output_directory / "dashboard.html").read_text()
+
+
+def test_modules_are_sorted_by_what_changing_them_takes() -> None:
+    imports = watch.module_imports()
+    data_modules = watch.data_modules(imports)
+    assert {"action", "route", "symbols", "routefile"} <= data_modules
+    assert not {"report", "slack", "kills", "summary"} & data_modules
+    reloaded = watch.dependents({"slack"}, imports)
+    assert reloaded[0] == "slack" and "report" in reloaded
+    assert "action" not in reloaded